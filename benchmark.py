@@ -0,0 +1,311 @@
+"""
+Micro-benchmarks for the Brand Identity Discovery MCP Server.
+
+Times every chart helper in chart_engine.py and every MCP tool in server.py
+over a seeded, realistic spread of birth dates and times, and reports ops/sec,
+p50/p95/p99 latency and peak traced memory per case. The startup: cases
+cold-import each module in fresh interpreters, tracking serverless cold-start
+time and peak RSS.
+
+Usage:
+    python benchmark.py                                # run and print a table
+    python benchmark.py --save benchmarks.json         # store a JSON baseline
+    python benchmark.py --compare benchmarks.json      # fail on regressions
+    python benchmark.py --filter tool: --iterations 5000
+    python benchmark.py --filter startup: --startup-runs 10
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import chart_engine
+import server
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+STARTUP_MODULES = ("chart_engine", "server")
+
+LOCATIONS = [
+    "Buenos Aires, Argentina", "New York, USA", "London, UK", "Tokyo, Japan",
+    "Lagos, Nigeria", "Mumbai, India", "São Paulo, Brazil", "Sydney, Australia"
+]
+
+
+def _tool(name: str):
+    """The synchronous tool body, without the async offloading and admission layer"""
+    return server.SYNC_TOOLS[name]
+
+
+def make_birth_records(count: int, seed: int = 42) -> list:
+    """Birth records spread over 1940-2010 with uniform times of day"""
+    rng = random.Random(seed)
+    records = []
+    for _ in range(count):
+        year = rng.randint(1940, 2010)
+        month = rng.randint(1, 12)
+        day = rng.randint(1, chart_engine._days_in_month(year, month))
+        records.append({
+            "birth_date": f"{year:04d}-{month:02d}-{day:02d}",
+            "birth_time": f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}",
+            "birth_location": rng.choice(LOCATIONS)
+        })
+    return records
+
+
+def build_cases(records: list) -> dict:
+    """Map case name -> (setup, call) where call(i) runs one operation on record i"""
+    contexts = [chart_engine.build_chart_context(**record) for record in records]
+    hexes = [color for colors in chart_engine.ARCHETYPE_COLORS.values() for color in colors.values()]
+
+    def clear_cache():
+        chart_engine.chart_cache.clear()
+
+    def record_args(i):
+        record = records[i]
+        return record["birth_date"], record["birth_time"], record["birth_location"]
+
+    cases = {
+        "calc:calculate_zodiac_sign": (None, lambda i: chart_engine.calculate_zodiac_sign(contexts[i].day, contexts[i].month)),
+        "calc:calculate_moon_sign": (None, lambda i: chart_engine.calculate_moon_sign(
+            contexts[i].day, contexts[i].month, contexts[i].year)),
+        "calc:calculate_rising_sign": (None, lambda i: chart_engine.calculate_rising_sign(contexts[i].hour, contexts[i].minute)),
+        "calc:calculate_ascendant_sign": (None, lambda i: chart_engine.calculate_ascendant_sign(
+            contexts[i].day, contexts[i].month, contexts[i].year, contexts[i].hour, contexts[i].minute,
+            contexts[i].place)),
+        "calc:calculate_human_design_type": (None, lambda i: chart_engine.calculate_human_design_type(
+            contexts[i].day, contexts[i].month, contexts[i].hour)),
+        "calc:calculate_human_design_authority": (None, lambda i: chart_engine.calculate_human_design_authority(
+            contexts[i].hd_type, contexts[i].day)),
+        "calc:calculate_human_design_profile": (None, lambda i: chart_engine.calculate_human_design_profile(
+            contexts[i].day, contexts[i].month)),
+        "calc:determine_brand_archetype": (None, lambda i: chart_engine.determine_brand_archetype(
+            contexts[i].sun_sign, contexts[i].moon_sign, contexts[i].rising_sign, contexts[i].hd_type)),
+        "calc:hex_to_rgb": (None, lambda i: chart_engine.hex_to_rgb(hexes[i % len(hexes)])),
+        "calc:calculate_chart": (None, lambda i: chart_engine.calculate_chart(
+            contexts[i].day, contexts[i].month, contexts[i].year, contexts[i].hour, contexts[i].minute,
+            contexts[i].place)),
+    }
+    for name in ("generate_brand_identity", "get_color_palette_only", "get_typography_only",
+                 "calculate_birth_chart", "calculate_human_design"):
+        tool = _tool(name)
+        cases[f"tool:{name}:cold"] = (clear_cache, lambda i, tool=tool: tool(*record_args(i)))
+        cases[f"tool:{name}:warm"] = (None, lambda i, tool=tool: tool(*record_args(i)))
+    return cases
+
+
+def _percentile(sorted_values: list, fraction: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _timer_overhead_ns(samples: int = 10000) -> int:
+    clock = time.perf_counter_ns
+    deltas = []
+    for _ in range(samples):
+        start = clock()
+        deltas.append(clock() - start)
+    deltas.sort()
+    return deltas[len(deltas) // 2]
+
+
+def run_case(setup, call, count: int, iterations: int, overhead_ns: int) -> dict:
+    """Time `iterations` calls one by one, then re-run under tracemalloc for peak memory"""
+    clock = time.perf_counter_ns
+    # Warm-up pass (also fills the chart cache for the warm tool cases)
+    for i in range(count):
+        call(i)
+
+    latencies = []
+    for n in range(iterations):
+        i = n % count
+        if setup is not None:
+            setup()
+        start = clock()
+        call(i)
+        latencies.append(max(clock() - start - overhead_ns, 0))
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    for n in range(min(iterations, 1000)):
+        if setup is not None:
+            setup()
+        call(n % count)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    total_ns = sum(latencies) or 1
+    latencies.sort()
+    return {
+        "iterations": iterations,
+        "ops_per_sec": round(iterations / (total_ns / 1e9), 1),
+        "p50_us": round(_percentile(latencies, 0.50) / 1000, 3),
+        "p95_us": round(_percentile(latencies, 0.95) / 1000, 3),
+        "p99_us": round(_percentile(latencies, 0.99) / 1000, 3),
+        "peak_memory_bytes": peak
+    }
+
+
+# Child's own peak RSS in KiB; VmHWM because ru_maxrss carries over the parent's peak across exec
+_STARTUP_PROBE = """import {module}
+try:
+    print(open("/proc/self/status").read().split("VmHWM:")[1].split()[0])
+except (OSError, IndexError):
+    import resource
+    print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def measure_startup(module: str, runs: int) -> dict:
+    """Cold-import `module` in `runs` fresh interpreters; wall time and peak RSS"""
+    latencies = []
+    peak = 0
+    for _ in range(runs):
+        start = time.perf_counter_ns()
+        completed = subprocess.run([sys.executable, "-c", _STARTUP_PROBE.format(module=module)],
+                                   cwd=HERE, capture_output=True, text=True, check=True)
+        latencies.append(time.perf_counter_ns() - start)
+        peak = max(peak, int(completed.stdout.split()[-1]) * 1024)
+    total_ns = sum(latencies) or 1
+    latencies.sort()
+    return {
+        "iterations": runs,
+        "ops_per_sec": round(runs / (total_ns / 1e9), 1),
+        "p50_us": round(_percentile(latencies, 0.50) / 1000, 3),
+        "p95_us": round(_percentile(latencies, 0.95) / 1000, 3),
+        "p99_us": round(_percentile(latencies, 0.99) / 1000, 3),
+        "peak_memory_bytes": peak
+    }
+
+
+def measure_record_memory(records: list) -> dict:
+    """Bytes per chart held in each chart representation, measured with tracemalloc.
+
+    Each form is built twice and only the second build is counted, so caches
+    and free lists filled by the first build don't inflate the figure.
+    Includes the holding list's pointer per item; interned ChartRecords shared
+    by equal charts cost only that pointer.
+    """
+    contexts = [chart_engine.build_chart_context(**record) for record in records]
+    births = [(c.day, c.month, c.year, c.hour, c.minute, c.place) for c in contexts]
+    forms = {
+        "dict": lambda: [chart_engine.calculate_chart(*birth) for birth in births],
+        "ChartContext": lambda: [chart_engine.build_chart_context(**record) for record in records],
+        "ChartRecord": lambda: [chart_engine.calculate_chart_record(*birth) for birth in births],
+        "ChartArray": lambda: chart_engine.calculate_chart_array(births)
+    }
+    per_record = {}
+    for name, build in forms.items():
+        tracemalloc.start()
+        first = build()
+        before = tracemalloc.get_traced_memory()[0]
+        second = build()
+        after = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        per_record[name] = round((after - before) / len(records), 1)
+        del first, second
+    return per_record
+
+
+def run_benchmarks(iterations: int, records: int, name_filter: str = None, seed: int = 42,
+                   startup_runs: int = 5) -> dict:
+    birth_records = make_birth_records(records, seed)
+    cases = build_cases(birth_records)
+    overhead_ns = _timer_overhead_ns()
+    results = {}
+    for module in STARTUP_MODULES:
+        name = f"startup:import {module}"
+        if startup_runs > 0 and (not name_filter or name_filter in name):
+            results[name] = measure_startup(module, startup_runs)
+    for name, (setup, call) in cases.items():
+        if name_filter and name_filter not in name:
+            continue
+        results[name] = run_case(setup, call, len(birth_records), iterations, overhead_ns)
+    memory = measure_record_memory(birth_records) if not name_filter or name_filter in "memory:" else None
+    chart_engine.chart_cache.clear()
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "iterations": iterations,
+            "records": records,
+            "seed": seed,
+            "startup_runs": startup_runs,
+            "timer_overhead_ns": overhead_ns
+        },
+        "results": results,
+        "memory_per_record_bytes": memory
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """Cases whose p50 latency or throughput regressed by more than `threshold` (a fraction)"""
+    regressions = []
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            continue
+        if base["p50_us"] > 0 and result["p50_us"] > base["p50_us"] * (1 + threshold):
+            regressions.append(f"{name}: p50 {base['p50_us']}us -> {result['p50_us']}us")
+        if result["ops_per_sec"] < base["ops_per_sec"] * (1 - threshold):
+            regressions.append(f"{name}: ops/sec {base['ops_per_sec']} -> {result['ops_per_sec']}")
+    return regressions
+
+
+def format_table(report: dict) -> str:
+    lines = [f"{'case':<46} {'ops/sec':>12} {'p50 us':>9} {'p95 us':>9} {'p99 us':>9} {'peak KB':>9}"]
+    for name, result in report["results"].items():
+        lines.append(
+            f"{name:<46} {result['ops_per_sec']:>12,.0f} {result['p50_us']:>9.2f} "
+            f"{result['p95_us']:>9.2f} {result['p99_us']:>9.2f} {result['peak_memory_bytes'] / 1024:>9.1f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmark the brand identity server")
+    parser.add_argument("--iterations", type=int, default=20000, help="timed calls per case")
+    parser.add_argument("--records", type=int, default=2000, help="distinct birth records to cycle through")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--startup-runs", type=int, default=5,
+                        help="fresh interpreters per startup: case (0 skips them)")
+    parser.add_argument("--filter", dest="name_filter", help="only run cases whose name contains this")
+    parser.add_argument("--save", metavar="PATH", help="write results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a saved JSON baseline")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="allowed regression vs. baseline as a fraction (default 0.15)")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.iterations, args.records, args.name_filter, args.seed, args.startup_runs)
+    print(format_table(report))
+    if report["memory_per_record_bytes"]:
+        print("\nMemory per chart (bytes): " + ", ".join(
+            f"{name} {size:,.1f}" for name, size in report["memory_per_record_bytes"].items()))
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved baseline to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"\nRegressions beyond {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\nNo regressions beyond {args.threshold:.0%} against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
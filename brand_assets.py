@@ -0,0 +1,485 @@
+"""
+SVG brand assets: palette swatch sheets, type specimens and a one-page brand board.
+
+Every asset is a pure function of a few inputs (the archetype, plus the chart
+and business name for the board), so it is stored under the SHA-256 of those
+inputs and the renderer version in a content-addressed directory:
+
+    <BRAND_ASSET_CACHE_DIR>/<key[:2]>/<key>.svg
+
+A chart that was rendered before, by any process sharing the directory, is
+served straight from disk; swatches and specimens are shared by every chart
+with the same archetype. Files are written atomically, so concurrent renders
+of the same key are harmless. Batches render their missing assets in a pool
+of worker processes.
+
+The directory is capped at BRAND_ASSET_CACHE_MAX_MB. Every cache hit refreshes
+the file's mtime, and once a process has written enough new assets it sweeps
+the directory and deletes the least recently used files. A swept asset is
+simply rendered again on its next request.
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from xml.sax.saxutils import escape
+
+from chart_engine import (
+    ARCHETYPE_COLORS, ARCHETYPE_FONTS, ARCHETYPE_VOICE, BRAND_ARCHETYPES, LOGO_VARIATIONS, MAX_BATCH_SIZE,
+    NEUTRAL_COLORS, PALETTE_ANALYSES, VISUAL_STYLES, ChartContext, ChartInputError, _error_response,
+    _optional_text, _record_field, get_chart_context
+)
+
+# Bump whenever rendered output changes, so old cache entries are not reused
+RENDER_VERSION = 1
+
+ASSET_KINDS = ("swatches", "type_specimen", "brand_board")
+
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), "brand_identity_assets")
+ASSET_WORKERS = int(os.environ.get("BRAND_ASSET_WORKERS", str(os.cpu_count() or 1)))
+# Fewer missing assets than this are rendered inline; a pool costs more than it saves
+PARALLEL_RENDER_THRESHOLD = 64
+# Size cap of the cache directory (0 = unbounded); a sweep trims it to PRUNE_TARGET of the cap
+ASSET_CACHE_MAX_BYTES = int(float(os.environ.get("BRAND_ASSET_CACHE_MAX_MB", "256")) * 1024 * 1024)
+PRUNE_TARGET = 0.8
+# A temp file this old was left by an interrupted write; sweeps delete it
+STALE_TEMP_SECONDS = 3600
+
+_KEY_PATTERN = re.compile(r"[0-9a-f]{32}")
+
+_SERIF_FAMILIES = ("Merriweather", "Playfair", "Georgia", "Cinzel", "Cormorant", "Lora", "Crimson",
+                   "Philosopher")
+
+_ATTRIBUTE_ENTITIES = {'"': "&quot;"}
+
+_PALETTE_ORDER = ("primary", "secondary", "accent", "neutral_dark", "neutral_medium", "neutral_light")
+
+# ============================================================================
+# RENDERERS - deterministic SVG text from plain inputs
+# ============================================================================
+
+
+def _font_stack(description: str) -> str:
+    """CSS font-family list from a description like "Merriweather, Playfair Display, or Georgia" """
+    families = [part.strip() for part in re.split(r",|\bor\b", description) if part.strip()]
+    generic = "serif" if any(name in description for name in _SERIF_FAMILIES) else "sans-serif"
+    return ", ".join(f"'{family}'" for family in families) + f", {generic}"
+
+
+def _text(x: float, y: float, content: str, size: int, fill: str, family: str = "sans-serif",
+          weight: str = "normal", anchor: str = "start") -> str:
+    return (f'<text x="{x}" y="{y}" font-family="{escape(family, _ATTRIBUTE_ENTITIES)}" font-size="{size}" '
+            f'font-weight="{weight}" fill="{fill}" text-anchor="{anchor}">{escape(content)}</text>')
+
+
+def _svg(width: int, height: int, title: str, body: list) -> str:
+    return "\n".join([
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}">',
+        f"<title>{escape(title)}</title>",
+        f'<rect width="{width}" height="{height}" fill="#FFFFFF"/>',
+        *body,
+        "</svg>",
+        ""
+    ])
+
+
+def _swatch_rows(archetype: str, x: int, y: int, width: int, height: int, ramps: bool) -> list:
+    """One column per palette color: the swatch, its labels and optionally its tint/shade ramp"""
+    colors = PALETTE_ANALYSES[archetype]["colors"]
+    column = width / len(_PALETTE_ORDER)
+    body = []
+    for i, name in enumerate(_PALETTE_ORDER):
+        color = colors[name]
+        left = round(x + i * column, 1)
+        inner = round(column - 12, 1)
+        body.append(f'<rect x="{left}" y="{y}" width="{inner}" height="{height}" rx="8" fill="{color["hex"]}" '
+                    f'stroke="#D0D5D9"/>')
+        body.append(_text(left + 12, y + height - 34, name.replace("_", " ").title(), 14, color["text_color"],
+                          weight="bold"))
+        body.append(_text(left + 12, y + height - 14, f'{color["hex"]} • {color["rgb"]}', 12, color["text_color"]))
+        if ramps:
+            step = inner / (2 * len(color["tints"]) + 1)
+            for j, value in enumerate(list(reversed(color["tints"])) + [color["hex"]] + color["shades"]):
+                body.append(f'<rect x="{round(left + j * step, 1)}" y="{y + height + 10}" width="{round(step, 1)}" '
+                            f'height="28" fill="{value}"/>')
+    return body
+
+
+def render_swatches(archetype: str) -> str:
+    """Swatch sheet: each palette color with hex/RGB labels, its tint-to-shade ramp and top pairings"""
+    pairs = [pair for pair in PALETTE_ANALYSES[archetype]["accessible_pairs"] if pair["level"] in ("AAA", "AA")]
+    colors = PALETTE_ANALYSES[archetype]["colors"]
+    body = [_text(40, 56, f"{archetype} Palette", 30, "#2C3E50", weight="bold")]
+    body += _swatch_rows(archetype, 40, 84, 920, 180, ramps=True)
+    body.append(_text(40, 354, "Accessible pairings (WCAG 2.x contrast)", 18, "#2C3E50", weight="bold"))
+    for i, pair in enumerate(pairs[:4]):
+        foreground, background = (colors[name]["hex"] for name in pair["colors"])
+        left = 40 + i * 230
+        body.append(f'<rect x="{left}" y="372" width="218" height="72" rx="6" fill="{background}" stroke="#D0D5D9"/>')
+        body.append(_text(left + 14, 404, "Aa Sample", 22, foreground, weight="bold"))
+        body.append(_text(left + 14, 430, f'{pair["ratio"]}:1 {pair["level"]}', 13, foreground))
+    return _svg(1000, 480, f"{archetype} palette", body)
+
+
+# (label, font size, which font) for each specimen line
+_SPECIMEN_LINES = (
+    ("H1", 56, "heading"), ("H2", 40, "heading"), ("H3", 28, "heading"),
+    ("Body", 17, "body"), ("Caption", 14, "body")
+)
+
+
+def render_type_specimen(archetype: str) -> str:
+    """Type specimen: heading and body fonts at every size in the typography scale"""
+    fonts = ARCHETYPE_FONTS[archetype]
+    ink = ARCHETYPE_COLORS[archetype]["primary"] if PALETTE_ANALYSES[archetype]["colors"]["primary"][
+        "luminance"] < 0.4 else NEUTRAL_COLORS["dark"]
+    body = [_text(40, 56, f"{archetype} Typography", 30, "#2C3E50", weight="bold"),
+            _text(40, 84, fonts["style"], 15, "#95A5A6")]
+    y = 120
+    for label, size, role in _SPECIMEN_LINES:
+        y += size + 18
+        weight = "bold" if role == "heading" else "normal"
+        sample = BRAND_ARCHETYPES[archetype]["desire"] if role == "heading" else (
+            "The quick brown fox jumps over the lazy dog. 0123456789")
+        body.append(_text(40, y, f"{label} • {size}px", 12, "#95A5A6"))
+        body.append(_text(160, y, sample, size, ink, family=_font_stack(fonts[role]), weight=weight))
+    y += 48
+    body.append(_text(40, y, f"Heading: {fonts['heading']}", 14, "#2C3E50"))
+    body.append(_text(40, y + 22, f"Body: {fonts['body']}", 14, "#2C3E50"))
+    return _svg(1000, y + 50, f"{archetype} typography", body)
+
+
+def render_brand_board(archetype: str, chart: dict, business_name: str = None) -> str:
+    """One-page brand board: identity, chart, palette, type pairing, voice, visual style and logo slots"""
+    colors = ARCHETYPE_COLORS[archetype]
+    fonts = ARCHETYPE_FONTS[archetype]
+    primary = PALETTE_ANALYSES[archetype]["colors"]["primary"]
+    title = business_name or f"{archetype} Brand"
+    body = [
+        f'<rect width="1200" height="150" fill="{colors["primary"]}"/>',
+        _text(48, 78, title, 40, primary["text_color"], family=_font_stack(fonts["heading"]), weight="bold"),
+        _text(48, 118, f'{archetype} • {BRAND_ARCHETYPES[archetype]["desire"]}', 18, primary["text_color"]),
+        _text(48, 196, f'{chart["sun_sign"]} Sun • {chart["moon_sign"]} Moon • {chart["rising_sign"]} Rising', 16,
+              "#2C3E50"),
+        _text(48, 220, f'{chart["hd_type"]} • {chart["hd_authority"]} Authority • {chart["hd_profile"]} Profile', 16,
+              "#2C3E50"),
+        _text(48, 272, "Palette", 20, "#2C3E50", weight="bold")
+    ]
+    body += _swatch_rows(archetype, 48, 288, 1104, 120, ramps=False)
+    body += [
+        _text(48, 462, "Typography", 20, "#2C3E50", weight="bold"),
+        _text(48, 504, "Heading Aa", 34, "#2C3E50", family=_font_stack(fonts["heading"]), weight="bold"),
+        _text(48, 536, fonts["heading"], 13, "#95A5A6"),
+        _text(48, 572, "Body text sets the everyday voice of the brand.", 17, "#2C3E50",
+              family=_font_stack(fonts["body"])),
+        _text(48, 596, fonts["body"], 13, "#95A5A6"),
+        _text(640, 462, "Voice & Visual Style", 20, "#2C3E50", weight="bold"),
+        _text(640, 494, f'Personality: {ARCHETYPE_VOICE[archetype]["personality"]}', 14, "#2C3E50"),
+        _text(640, 518, f'Tone: {ARCHETYPE_VOICE[archetype]["tone"]}', 14, "#2C3E50"),
+        _text(640, 542, f'Aesthetic: {VISUAL_STYLES[archetype]["aesthetic"]}', 14, "#2C3E50"),
+        _text(640, 566, f'Imagery: {VISUAL_STYLES[archetype]["imagery"]}', 14, "#2C3E50"),
+        _text(48, 652, "Logo Variations", 20, "#2C3E50", weight="bold")
+    ]
+    # Placeholder tile per required logo variation, drawn in that variation's colors
+    tiles = {"Single color (black)": ("#FFFFFF", "#000000"), "Single color (white)": ("#000000", "#FFFFFF")}
+    for i, variation in enumerate(LOGO_VARIATIONS):
+        background, ink = tiles.get(variation, ("#FFFFFF", colors["primary"]))
+        left = 48 + i * 186
+        body.append(f'<rect x="{left}" y="668" width="174" height="96" rx="6" fill="{background}" stroke="#D0D5D9"/>')
+        body.append(_text(left + 87, 716, title[:14], 18, ink, family=_font_stack(fonts["heading"]),
+                          weight="bold", anchor="middle"))
+        body.append(_text(left + 87, 748, variation, 11, "#95A5A6", anchor="middle"))
+    return _svg(1200, 800, f"{title} brand board", body)
+
+
+RENDERERS = {
+    "swatches": render_swatches,
+    "type_specimen": render_type_specimen,
+    "brand_board": render_brand_board
+}
+
+# ============================================================================
+# CONTENT-ADDRESSED CACHE
+# ============================================================================
+
+
+def asset_inputs(kind: str, context: ChartContext, business_name: str = None) -> dict:
+    """The only values an asset depends on; together with the kind they form its cache key"""
+    if kind != "brand_board":
+        return {"archetype": context.archetype}
+    chart = {field: getattr(context, field)
+             for field in ("sun_sign", "moon_sign", "rising_sign", "hd_type", "hd_authority", "hd_profile")}
+    return {"archetype": context.archetype, "chart": chart, "business_name": business_name}
+
+
+def asset_key(kind: str, inputs: dict) -> str:
+    canonical = json.dumps([kind, RENDER_VERSION, inputs], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:32]
+
+
+def _write_asset(directory: str, key: str, svg: str) -> int:
+    folder = os.path.join(directory, key[:2])
+    os.makedirs(folder, exist_ok=True)
+    handle, temp_path = tempfile.mkstemp(dir=folder, suffix=".tmp")
+    with os.fdopen(handle, "w", encoding="utf-8") as f:
+        f.write(svg)
+    os.replace(temp_path, os.path.join(folder, f"{key}.svg"))
+    return len(svg)
+
+
+def _render_jobs(directory: str, jobs: list) -> int:
+    """Worker entry point: render and store each (kind, key, inputs); returns bytes written"""
+    return sum(_write_asset(directory, key, RENDERERS[kind](**inputs)) for kind, key, inputs in jobs)
+
+
+class AssetCache:
+    """Directory of rendered SVGs named by the hash of their inputs"""
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, workers: int = ASSET_WORKERS,
+                 max_bytes: int = ASSET_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.workers = workers
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._sweeping = threading.Lock()
+        self._pool = None
+        # Start "due", so the first render also trims whatever earlier runs left behind
+        self._unswept_bytes = max_bytes
+        self.hits = 0
+        self.renders = 0
+        self.evictions = 0
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.svg")
+
+    def _count(self, hits: int, renders: int) -> None:
+        with self._lock:
+            self.hits += hits
+            self.renders += renders
+
+    def _render_pool(self) -> ProcessPoolExecutor:
+        """The long-lived render pool, started on first use.
+
+        Workers are spawned, not forked: ensure() runs on executor threads of
+        a process that is already running an event loop.
+        """
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+            return self._pool
+
+    def _render_parallel(self, missing: list) -> int:
+        pool = self._render_pool()
+        chunks = [missing[i::self.workers * 4] for i in range(self.workers * 4)]
+        try:
+            return sum(pool.map(_render_jobs, [self.directory] * len(chunks), chunks))
+        except BrokenProcessPool:
+            # A worker died; start a fresh pool next time and finish this batch inline
+            with self._lock:
+                if self._pool is pool:
+                    self._pool = None
+            return _render_jobs(self.directory, missing)
+
+    def _is_cached(self, key: str) -> bool:
+        """Whether the asset is on disk; a hit also marks it recently used for the sweep"""
+        try:
+            os.utime(self.path_for(key))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _wrote(self, written: int) -> None:
+        if not self.max_bytes:
+            return
+        with self._lock:
+            self._unswept_bytes += written
+            due = self._unswept_bytes >= self.max_bytes * (1 - PRUNE_TARGET)
+        # One sweep at a time per process; a busy sweeper will cover this write too
+        if due and self._sweeping.acquire(blocking=False):
+            try:
+                with self._lock:
+                    self._unswept_bytes = 0
+                self.prune()
+            finally:
+                self._sweeping.release()
+
+    def prune(self) -> int:
+        """Delete least recently used assets until the directory is within PRUNE_TARGET of max_bytes.
+
+        Also removes temp files older than STALE_TEMP_SECONDS, left by writes
+        that were interrupted. Returns the number of assets removed. Safe to
+        run while other processes read and write the directory.
+        """
+        files = []
+        total = 0
+        stale_before = time.time() - STALE_TEMP_SECONDS
+        try:
+            folders = [entry.path for entry in os.scandir(self.directory) if entry.is_dir()]
+        except FileNotFoundError:
+            return 0
+        for folder in folders:
+            try:
+                entries = list(os.scandir(folder))
+            except FileNotFoundError:
+                continue
+            for entry in entries:
+                if entry.name.endswith(".svg"):
+                    try:
+                        info = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    files.append((info.st_mtime, info.st_size, entry.path))
+                    total += info.st_size
+                elif entry.name.endswith(".tmp"):
+                    try:
+                        if entry.stat().st_mtime < stale_before:
+                            os.unlink(entry.path)
+                    except FileNotFoundError:
+                        pass
+        if total <= self.max_bytes:
+            return 0
+        files.sort()
+        removed = 0
+        target = self.max_bytes * PRUNE_TARGET
+        for _, size, path in files:
+            if total <= target:
+                break
+            try:
+                os.unlink(path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+        with self._lock:
+            self.evictions += removed
+        return removed
+
+    def ensure(self, jobs: dict, parallel: bool = False) -> set:
+        """Render every {key: (kind, inputs)} not already on disk; returns the keys rendered now.
+
+        With parallel set and enough missing assets, rendering is spread over
+        the render pool's worker processes.
+        """
+        missing = [(kind, key, inputs) for key, (kind, inputs) in jobs.items() if not self._is_cached(key)]
+        if parallel and self.workers > 1 and len(missing) >= PARALLEL_RENDER_THRESHOLD:
+            written = self._render_parallel(missing)
+        else:
+            written = _render_jobs(self.directory, missing)
+        self._count(len(jobs) - len(missing), len(missing))
+        self._wrote(written)
+        return {key for _, key, _ in missing}
+
+    def read(self, key: str) -> str:
+        """SVG text for a key, or None when it was never rendered (or was cleaned up)"""
+        if not _KEY_PATTERN.fullmatch(key):
+            return None
+        try:
+            with open(self.path_for(key), encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def load(self, key: str, kind: str, inputs: dict) -> str:
+        """SVG text for a key, rendering it again if a sweep removed it since ensure()"""
+        svg = self.read(key)
+        if svg is None:
+            svg = RENDERERS[kind](**inputs)
+            self._wrote(_write_asset(self.directory, key, svg))
+        return svg
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.renders
+        return {
+            "directory": self.directory,
+            "hits": self.hits,
+            "renders": self.renders,
+            "evictions": self.evictions,
+            "max_bytes": self.max_bytes,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+asset_cache = AssetCache(os.environ.get("BRAND_ASSET_CACHE_DIR", DEFAULT_CACHE_DIR))
+
+# ============================================================================
+# RESPONSE BUILDERS
+# ============================================================================
+
+
+def _select_assets(assets) -> tuple:
+    """Validate requested asset kinds and return them in ASSET_KINDS order (None = all)"""
+    if assets is None:
+        return ASSET_KINDS
+    if isinstance(assets, str) or not all(isinstance(kind, str) for kind in assets):
+        raise ChartInputError("invalid_type", "assets", "assets must be a list of asset kinds")
+    unknown = sorted(set(assets) - set(ASSET_KINDS))
+    if unknown or not assets:
+        raise ChartInputError("invalid_asset", "assets", f"Unknown asset(s) {unknown}; choose from {list(ASSET_KINDS)}")
+    return tuple(kind for kind in ASSET_KINDS if kind in assets)
+
+
+def _asset_entries(jobs: dict, rendered: set, include_svg: bool) -> dict:
+    entries = {}
+    for key, (kind, _) in jobs.items():
+        entry = {"key": key, "uri": f"brand://asset/{key}", "cached": key not in rendered}
+        if include_svg:
+            entry["svg"] = asset_cache.load(key, *jobs[key])
+        entries[kind] = entry
+    return entries
+
+
+def _assets_response(context: ChartContext, kinds: tuple, business_name: str = None,
+                     include_svg: bool = True) -> dict:
+    _optional_text(business_name, "business_name")
+    jobs = {}
+    for kind in kinds:
+        inputs = asset_inputs(kind, context, business_name)
+        jobs[asset_key(kind, inputs)] = (kind, inputs)
+    rendered = asset_cache.ensure(jobs)
+    return {"status": "success", "archetype": context.archetype, "assets": _asset_entries(jobs, rendered, include_svg)}
+
+
+def _assets_batch_response(records: list, kinds: tuple) -> dict:
+    """Render assets for many birth records; identical assets across the batch are rendered once"""
+    if len(records) > MAX_BATCH_SIZE:
+        return {"status": "error", "error": f"Batch too large: {len(records)} records (max {MAX_BATCH_SIZE})",
+                "error_code": "batch_too_large"}
+    results = [None] * len(records)
+    record_jobs = []
+    for index, record in enumerate(records):
+        try:
+            context = get_chart_context(*(_record_field(record, field)
+                                          for field in ("birth_date", "birth_time", "birth_location")))
+            business_name = _optional_text(record.get("business_name"), "business_name")
+            jobs = {}
+            for kind in kinds:
+                inputs = asset_inputs(kind, context, business_name)
+                jobs[asset_key(kind, inputs)] = (kind, inputs)
+            record_jobs.append((index, context.archetype, jobs))
+        except Exception as e:
+            results[index] = {"index": index, **_error_response(e)}
+
+    all_jobs = {key: job for _, _, jobs in record_jobs for key, job in jobs.items()}
+    rendered = asset_cache.ensure(all_jobs, parallel=True)
+    for index, archetype, jobs in record_jobs:
+        results[index] = {"index": index, "status": "success", "archetype": archetype,
+                          "assets": _asset_entries(jobs, rendered, include_svg=False)}
+
+    failed = sum(1 for result in results if result["status"] == "error")
+    return {
+        "status": "success",
+        "count": len(records),
+        "succeeded": len(records) - failed,
+        "failed": failed,
+        "rendered": len(rendered),
+        "results": results
+    }
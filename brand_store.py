@@ -0,0 +1,332 @@
+"""
+Persistent store of generated brand identities, in a local SQLite file.
+
+Enabled by setting BRAND_STORE_PATH. Every generate_brand_identity result is
+recorded with its normalized birth data, business name and archetype, so a
+repeat request is answered from disk and a returning client can be found by
+name or birth data (lookup_brand_identity / list_brand_identities).
+
+The database runs in WAL mode, so readers never block the writer and several
+worker processes can share one file. Each thread keeps its own connection.
+Rows carry the response fingerprint of the engine that produced them; a
+repeat request is only served from disk when it matches the running engine,
+so changed templates or tables are never masked by old rows.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from types import SimpleNamespace
+
+from chart_engine import (
+    ARCHETYPE_NAMES, PALETTE_ANALYSES, REFERENCE_DATA_VERSION, ChartContext, ChartInputError,
+    _GUIDELINE_TEMPLATES, _SECTION_SEPARATOR, _chart_engine_fingerprint, _fill_template, _require_text,
+    parse_birth_date, parse_birth_time
+)
+from gazetteer import normalize
+
+MAX_PAGE_SIZE = 200
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS brand_identities (
+    id INTEGER PRIMARY KEY,
+    birth_key TEXT NOT NULL,
+    business_key TEXT NOT NULL,
+    variant TEXT NOT NULL,
+    birth_date TEXT NOT NULL,
+    birth_time TEXT NOT NULL,
+    birth_location TEXT NOT NULL,
+    business_name TEXT,
+    archetype TEXT NOT NULL,
+    engine TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    response TEXT NOT NULL,
+    UNIQUE (birth_key, business_key, variant)
+);
+CREATE INDEX IF NOT EXISTS brand_identities_business ON brand_identities (business_key, id);
+CREATE INDEX IF NOT EXISTS brand_identities_archetype ON brand_identities (archetype, id);
+"""
+
+_COLUMNS = ("birth_key", "business_key", "variant", "birth_date", "birth_time", "birth_location",
+            "business_name", "archetype", "engine", "created_at", "response")
+
+_UPSERT = (
+    f"INSERT INTO brand_identities ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))}) "
+    "ON CONFLICT (birth_key, business_key, variant) DO UPDATE SET "
+    + ", ".join(f"{column} = excluded.{column}" for column in _COLUMNS[3:])
+)
+
+_SUMMARY_COLUMNS = "id, birth_date, birth_time, birth_location, business_name, archetype, variant, created_at"
+
+
+def response_fingerprint() -> str:
+    """Hash of everything a brand identity response is built from"""
+    templates = {archetype: {name: chunks for name, (chunks, _) in blocks.items()}
+                 for archetype, blocks in _GUIDELINE_TEMPLATES.items()}
+    material = json.dumps([_chart_engine_fingerprint(), REFERENCE_DATA_VERSION, templates, PALETTE_ANALYSES],
+                          sort_keys=True)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()[:16]
+
+
+def birth_key(birth_date: str, birth_time: str, birth_location: str) -> str:
+    """Canonical birth data: zero-padded date and time plus the normalized location"""
+    for field, value in zip(("birth_date", "birth_time", "birth_location"), (birth_date, birth_time, birth_location)):
+        _require_text(value, field)
+    day, month, year = parse_birth_date(birth_date)
+    hour, minute = parse_birth_time(birth_time)
+    return f"{year:04d}-{month:02d}-{day:02d}T{hour:02d}:{minute:02d}|{normalize(birth_location)}"
+
+
+def business_key(business_name: str) -> str:
+    """Normalized business name; "" only when there is no name at all"""
+    if not business_name:
+        return ""
+    # A name with no letters or digits ("!!!", "  ") normalizes to ""; key it by its
+    # casefolded text instead, marked with "#", which normalized keys never contain
+    return normalize(business_name) or "#" + business_name.casefold()
+
+
+def variant_key(sections: tuple, output_format: str) -> str:
+    """Which rendering of the identity a row holds, e.g. "core,palette|json" """
+    return f"{','.join(sections)}|{output_format}"
+
+
+def _echo_inputs(response: dict, birth_date: str, birth_time: str, birth_location: str) -> dict:
+    """A stored response re-stamped with this request's birth data, as get_chart_context echoes it"""
+    birth_data = response["birth_data"]
+    if (birth_data["date"], birth_data["time"], birth_data["location"]) == (birth_date, birth_time, birth_location):
+        return response
+    birth_data.update(date=birth_date, time=birth_time, location=birth_location)
+    if "guidelines" in response:
+        # The header block is the only part of the document filled from the raw inputs
+        _, separator, rest = response["guidelines"].partition(_SECTION_SEPARATOR)
+        inputs = SimpleNamespace(birth_date=birth_date, birth_time=birth_time, birth_location=birth_location)
+        header = _fill_template(_GUIDELINE_TEMPLATES[response["archetype"]]["header"], inputs)
+        response["guidelines"] = header + separator + rest
+    return response
+
+
+class BrandStore:
+    """SQLite (WAL) table of generated identities with per-thread connections"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.engine = response_fingerprint()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.write_errors = 0
+        self.last_write_error = None
+        self._connection().executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.row_factory = sqlite3.Row
+            self._local.connection = connection
+        return connection
+
+    def _count(self, **deltas) -> None:
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    def row(self, birth_date: str, birth_time: str, birth_location: str, business_name: str, variant: str,
+            response: dict) -> tuple:
+        """Column values for one identity, in _COLUMNS order"""
+        return (birth_key(birth_date, birth_time, birth_location), business_key(business_name), variant,
+                birth_date, birth_time, birth_location, business_name, response["archetype"], self.engine,
+                time.time(), json.dumps(response, ensure_ascii=False))
+
+    def batch_rows(self, records: list, results: list, variant: str) -> list:
+        """Rows for the successful entries of a _run_batch result list"""
+        rows = []
+        for result in results:
+            if result["status"] == "success":
+                record = records[result["index"]]
+                response = {key: value for key, value in result.items() if key != "index"}
+                rows.append(self.row(record["birth_date"], record["birth_time"], record["birth_location"],
+                                     record.get("business_name"), variant, response))
+        return rows
+
+    def get(self, birth_date: str, birth_time: str, birth_location: str, business_name: str, variant: str):
+        """The stored response for this identity, if the running engine produced it.
+
+        Looked up from the raw inputs, so a hit needs no chart; the response
+        echoes this request's spelling of the birth data, not the first caller's.
+        """
+        found = self._connection().execute(
+            "SELECT response FROM brand_identities "
+            "WHERE birth_key = ? AND business_key = ? AND variant = ? AND engine = ?",
+            (birth_key(birth_date, birth_time, birth_location), business_key(business_name), variant, self.engine)
+        ).fetchone()
+        if found is None:
+            self._count(misses=1)
+            return None
+        self._count(hits=1)
+        return _echo_inputs(json.loads(found["response"]), birth_date, birth_time, birth_location)
+
+    def put(self, context: ChartContext, business_name: str, variant: str, response: dict) -> bool:
+        """Record one identity; a failed write is counted in stats() instead of raised"""
+        return self._try_write(lambda: [self.row(context.birth_date, context.birth_time, context.birth_location,
+                                                 business_name, variant, response)])
+
+    def put_batch(self, records: list, results: list, variant: str) -> bool:
+        """Record a batch's successful identities; a failed write is counted in stats() instead of raised"""
+        return self._try_write(lambda: self.batch_rows(records, results, variant))
+
+    def _try_write(self, rows_of) -> bool:
+        # The caller's response is already built; losing its copy on disk must not fail it
+        try:
+            self.put_rows(rows_of())
+        except Exception as e:
+            with self._lock:
+                self.write_errors += 1
+                self.last_write_error = f"{type(e).__name__}: {e}"
+            return False
+        return True
+
+    def put_rows(self, rows: list) -> None:
+        """Insert or replace many identities in one transaction"""
+        if not rows:
+            return
+        connection = self._connection()
+        with self._lock:
+            # Serialize this process's writers; SQLite's busy timeout covers other processes
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.executemany(_UPSERT, rows)
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            self.writes += len(rows)
+
+    @staticmethod
+    def _summary(row: sqlite3.Row, include_response: bool) -> dict:
+        summary = {
+            "id": row["id"],
+            "birth_date": row["birth_date"],
+            "birth_time": row["birth_time"],
+            "birth_location": row["birth_location"],
+            "business_name": row["business_name"],
+            "archetype": row["archetype"],
+            "sections": row["variant"].split("|")[0].split(","),
+            "output_format": row["variant"].split("|")[1],
+            "created_at": round(row["created_at"], 3)
+        }
+        if include_response:
+            summary["response"] = json.loads(row["response"])
+        return summary
+
+    def lookup(self, business_name: str = None, birth: tuple = None, limit: int = 10) -> list:
+        """Newest identities matching a business name and/or birth data"""
+        clauses, params = [], []
+        if business_name:
+            clauses.append("business_key = ?")
+            params.append(business_key(business_name))
+        if birth is not None:
+            clauses.append("birth_key = ?")
+            params.append(birth_key(*birth))
+        rows = self._connection().execute(
+            f"SELECT {_SUMMARY_COLUMNS}, response FROM brand_identities WHERE {' AND '.join(clauses)} "
+            "ORDER BY id DESC LIMIT ?", (*params, limit)
+        ).fetchall()
+        return [self._summary(row, include_response=True) for row in rows]
+
+    def page(self, archetype: str = None, business_name: str = None, limit: int = 50, after: int = None) -> tuple:
+        """(summaries, next cursor) newest first; pass the cursor back as `after` for the next page"""
+        clauses, params = [], []
+        if archetype:
+            clauses.append("archetype = ?")
+            params.append(archetype)
+        if business_name:
+            clauses.append("business_key = ?")
+            params.append(business_key(business_name))
+        if after is not None:
+            clauses.append("id < ?")
+            params.append(after)
+        where = f"WHERE {' AND '.join(clauses)} " if clauses else ""
+        rows = self._connection().execute(
+            f"SELECT {_SUMMARY_COLUMNS} FROM brand_identities {where}ORDER BY id DESC LIMIT ?", (*params, limit + 1)
+        ).fetchall()
+        cursor = rows[limit - 1]["id"] if len(rows) > limit else None
+        return [self._summary(row, include_response=False) for row in rows[:limit]], cursor
+
+    def stats(self) -> dict:
+        count = self._connection().execute("SELECT COUNT(*) FROM brand_identities").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "path": self.path,
+            "engine": self.engine,
+            "identities": count,
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "write_errors": self.write_errors,
+            "last_write_error": self.last_write_error,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+def open_brand_store():
+    """The store at BRAND_STORE_PATH, or None when persistence is not configured"""
+    path = os.environ.get("BRAND_STORE_PATH")
+    return BrandStore(path) if path else None
+
+
+def _require_store(store: BrandStore) -> BrandStore:
+    if store is None:
+        raise ChartInputError("store_disabled", "store", "the brand identity store is off; set BRAND_STORE_PATH")
+    return store
+
+
+def _check_page_size(limit) -> int:
+    if isinstance(limit, bool) or not isinstance(limit, int) or not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ChartInputError("invalid_type", "limit", f"limit must be an integer from 1 to {MAX_PAGE_SIZE}")
+    return limit
+
+
+def _lookup_response(store: BrandStore, business_name: str = None, birth_date: str = None,
+                     birth_time: str = None, birth_location: str = None, limit: int = 10) -> dict:
+    _require_store(store)
+    _check_page_size(limit)
+    birth = (birth_date, birth_time, birth_location)
+    if any(value is not None for value in birth):
+        for field, value in zip(("birth_date", "birth_time", "birth_location"), birth):
+            if value is None:
+                raise ChartInputError("missing_field", field, "birth data lookups need birth_date, birth_time "
+                                                              "and birth_location")
+        # Parses (and so validates) the birth data without computing a chart
+        birth_key(*birth)
+    else:
+        birth = None
+    if not business_name and birth is None:
+        raise ChartInputError("missing_criteria", "business_name", "give business_name and/or birth data")
+    matches = store.lookup(business_name, birth, limit)
+    return {"status": "success", "count": len(matches), "identities": matches}
+
+
+def _list_response(store: BrandStore, archetype: str = None, business_name: str = None, limit: int = 50,
+                   cursor: str = None) -> dict:
+    _require_store(store)
+    _check_page_size(limit)
+    if archetype is not None and archetype not in ARCHETYPE_NAMES:
+        raise ChartInputError("unknown_value", "archetype", f"archetype must be one of {list(ARCHETYPE_NAMES)}")
+    if cursor is not None and not (isinstance(cursor, str) and cursor.isascii() and cursor.isdigit()):
+        raise ChartInputError("invalid_cursor", "cursor", "cursor must be a next_cursor from a previous page")
+    items, next_id = store.page(archetype, business_name, limit, int(cursor) if cursor is not None else None)
+    return {
+        "status": "success",
+        "count": len(items),
+        "identities": items,
+        "next_cursor": str(next_id) if next_id is not None else None
+    }
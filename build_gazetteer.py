@@ -0,0 +1,191 @@
+"""
+Build the bundled offline gazetteer (data/gazetteer.tsv) from GeoNames dumps.
+
+Inputs are the standard GeoNames exports, https://download.geonames.org/export/dump/:
+    cities15000.txt    every populated place with 15,000+ inhabitants
+    countryInfo.txt    country names, ISO codes and capitals
+    admin1CodesASCII.txt (optional) first-level division names, e.g. US states
+
+Output is two sorted, tab-separated files that gazetteer.py memory-maps:
+    data/gazetteer.tsv             normalized name -> place (coordinates, IANA timezone)
+    data/gazetteer_qualifiers.tsv  normalized country / region name -> codes
+
+GeoNames data is licensed CC BY 4.0; the attribution is written into the
+header of every generated file.
+
+Usage:
+    python build_gazetteer.py --cities cities15000.txt --countries countryInfo.txt \\
+        --admin1 admin1CodesASCII.txt --output-dir data
+"""
+
+import argparse
+import csv
+import os
+import sys
+
+from gazetteer import normalize
+
+ATTRIBUTION = "# Place data from GeoNames (https://www.geonames.org), licensed CC BY 4.0."
+
+# Curated extra names, indexed like primary names so they beat GeoNames
+# alternates and smaller places of the same name
+CITY_ALIASES = {
+    "nyc": ("New York City", "US"),
+    "new york": ("New York City", "US"),
+    "la": ("Los Angeles", "US"),
+    "sf": ("San Francisco", "US"),
+    "dc": ("Washington", "US"),
+    "washington dc": ("Washington", "US"),
+    "cdmx": ("Mexico City", "MX"),
+    "bombay": ("Mumbai", "IN"),
+    "calcutta": ("Kolkata", "IN"),
+    "madras": ("Chennai", "IN"),
+    "peking": ("Beijing", "CN"),
+    "saigon": ("Ho Chi Minh City", "VN"),
+    "leningrad": ("Saint Petersburg", "RU"),
+    "st petersburg": ("Saint Petersburg", "RU"),
+}
+
+COUNTRY_ALIASES = {
+    "usa": "US", "us": "US", "america": "US", "united states of america": "US",
+    "uk": "GB", "great britain": "GB", "britain": "GB", "england": "GB",
+    "scotland": "GB", "wales": "GB", "northern ireland": "GB",
+    "south korea": "KR", "korea": "KR", "north korea": "KP",
+    "russia": "RU", "holland": "NL", "czech republic": "CZ", "czechia": "CZ",
+    "ivory coast": "CI", "uae": "AE", "vietnam": "VN", "the netherlands": "NL",
+}
+
+# Only alternate names of cities at least this big are indexed; smaller
+# places carry mostly transliterations that create false matches
+ALTERNATE_NAME_MIN_POPULATION = 1_000_000
+
+
+def _is_latin(text: str) -> bool:
+    return all(ord(char) < 0x250 for char in text)
+
+
+def read_countries(path: str) -> dict:
+    """ISO2 -> (iso3, name) from countryInfo.txt"""
+    countries = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("#") or not line.strip():
+                continue
+            fields = line.rstrip("\n").split("\t")
+            countries[fields[0]] = (fields[1], fields[4])
+    return countries
+
+
+def read_admin1(path: str) -> dict:
+    """(country, admin1 code) -> ascii name from admin1CodesASCII.txt"""
+    regions = {}
+    if path:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                fields = line.rstrip("\n").split("\t")
+                country, _, code = fields[0].partition(".")
+                regions[(country, code)] = fields[2]
+    return regions
+
+
+def read_cities(path: str, min_population: int):
+    """Yield (name, ascii_name, alternates, lat, lon, country, admin1, population, timezone)"""
+    with open(path, encoding="utf-8") as f:
+        for fields in csv.reader(f, delimiter="\t", quoting=csv.QUOTE_NONE):
+            population = int(fields[14] or 0)
+            if population < min_population:
+                continue
+            alternates = [name for name in fields[3].split(",") if name] if fields[3] else []
+            yield (fields[1], fields[2], alternates, fields[4], fields[5], fields[8], fields[10],
+                   population, fields[17])
+
+
+def build(cities_path: str, countries_path: str, admin1_path: str, output_dir: str,
+          min_population: int) -> tuple:
+    countries = read_countries(countries_path)
+    regions = read_admin1(admin1_path)
+
+    rows = {}
+    largest = {}
+    by_name = {}
+    for name, ascii_name, alternates, lat, lon, country, admin1, population, timezone in read_cities(
+            cities_path, min_population):
+        if country not in countries:
+            continue
+        # Only US states are common enough in addresses to keep as a qualifier
+        admin1 = admin1 if country == "US" else ""
+        place = (name, country, admin1, f"{float(lat):.4f}", f"{float(lon):.4f}", timezone, str(population))
+        names = {normalize(name), normalize(ascii_name)}
+        if population >= ALTERNATE_NAME_MIN_POPULATION:
+            alternates = {normalize(alt) for alt in alternates
+                          if _is_latin(alt) and alt[:1].isupper() and not alt.isupper() and len(alt) > 3}
+        else:
+            alternates = set()
+        for key in names:
+            rows[(key, country, admin1, name)] = ("0",) + place
+        for key in alternates - names:
+            rows.setdefault((key, country, admin1, name), ("1",) + place)
+        by_name.setdefault((name, country), place)
+        for region in {(country, ""), (country, admin1)}:
+            if region not in largest or population > int(largest[region][6]):
+                largest[region] = place
+
+    for alias, (name, country) in CITY_ALIASES.items():
+        place = by_name.get((name, country))
+        if place is not None:
+            rows[(alias, country, place[2], name)] = ("0",) + place
+
+    # Sort by key bytes (what gazetteer.py bisects on), then primary names
+    # before alternates, then biggest place first
+    lines = sorted(
+        ((key,) + value for (key, *_), value in rows.items() if key),
+        key=lambda row: (row[0].encode("utf-8"), row[1], -int(row[8]))
+    )
+
+    qualifiers = set()
+    for iso2, (iso3, country_name) in countries.items():
+        for key in (iso2, iso3, country_name):
+            qualifiers.add((normalize(key), iso2, ""))
+    for alias, iso2 in COUNTRY_ALIASES.items():
+        qualifiers.add((alias, iso2, ""))
+    for (country, code), region_name in regions.items():
+        if country == "US":
+            qualifiers.add((normalize(code), country, code))
+            qualifiers.add((normalize(region_name), country, code))
+    qualifier_lines = sorted(
+        (key, country, admin1, normalize(largest[(country, admin1)][0]))
+        for key, country, admin1 in qualifiers if (country, admin1) in largest
+    )
+
+    os.makedirs(output_dir, exist_ok=True)
+    gazetteer_path = os.path.join(output_dir, "gazetteer.tsv")
+    with open(gazetteer_path, "w", encoding="utf-8", newline="\n") as f:
+        f.write(ATTRIBUTION + "\n")
+        f.write("# key\talternate\tname\tcountry_code\tadmin1\tlatitude\tlongitude\ttimezone\tpopulation\n")
+        for line in lines:
+            f.write("\t".join(line) + "\n")
+    qualifiers_path = os.path.join(output_dir, "gazetteer_qualifiers.tsv")
+    with open(qualifiers_path, "w", encoding="utf-8", newline="\n") as f:
+        f.write(ATTRIBUTION + "\n")
+        f.write("# key\tcountry_code\tadmin1\tlargest_place_key\n")
+        for line in qualifier_lines:
+            f.write("\t".join(line) + "\n")
+    return len(lines), len(qualifier_lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Build the offline gazetteer from GeoNames dumps")
+    parser.add_argument("--cities", required=True, help="GeoNames citiesNNNN.txt")
+    parser.add_argument("--countries", required=True, help="GeoNames countryInfo.txt")
+    parser.add_argument("--admin1", help="GeoNames admin1CodesASCII.txt (for US state names)")
+    parser.add_argument("--output-dir", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
+    parser.add_argument("--min-population", type=int, default=15000)
+    args = parser.parse_args(argv)
+
+    places, qualifiers = build(args.cities, args.countries, args.admin1, args.output_dir, args.min_population)
+    print(f"Wrote {places} place names and {qualifiers} qualifiers to {args.output_dir}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
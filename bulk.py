@@ -0,0 +1,195 @@
+"""
+Bulk brand identity generation for CSV / JSONL birth-record files.
+
+Streams records from the input file, fans chunks out to a process pool that
+runs the same engine as the generate_brand_identity tool, and writes one
+JSON result per line in input order. Only a bounded window of chunks is ever
+in memory, so input size is limited by disk, not RAM.
+
+Input records need birth_date, birth_time and birth_location columns/keys
+(business_name is optional). Each output line is the generate_brand_identity
+response for that record plus its zero-based "index" in the input.
+
+Usage:
+    python bulk.py clients.csv -o brand_kits.jsonl
+    python bulk.py clients.jsonl -o - --workers 8 --chunk-size 2000
+    python bulk.py clients.csv -o kits.jsonl --sections palette typography --output-format json
+    python bulk.py clients.csv -o kits.jsonl --store brand_identities.db
+
+With --store, every generated identity is also bulk-inserted into that SQLite
+identity store (see brand_store.py), one transaction per chunk.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import chart_engine
+
+# Identity store per worker process, opened on its first chunk
+_stores = {}
+
+
+def _store(path: str):
+    if path not in _stores:
+        from brand_store import BrandStore
+        _stores[path] = BrandStore(path)
+    return _stores[path]
+
+
+def read_records(path: str, input_format: str = None):
+    """Yield birth records one at a time from a CSV or JSONL file ("-" reads stdin)"""
+    if input_format is None:
+        input_format = "csv" if path.lower().endswith(".csv") else "jsonl"
+    stream = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8")
+    try:
+        if input_format == "csv":
+            yield from csv.DictReader(stream)
+        else:
+            for line in stream:
+                line = line.strip()
+                if line:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError as e:
+                        # Keep the slot so output stays aligned with input; the
+                        # batch engine reports it as a missing-field error
+                        yield {"_invalid_json": str(e)}
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def chunked(records, size: int):
+    """Yield (start_index, chunk) pairs of at most `size` records"""
+    records = iter(records)
+    start = 0
+    while True:
+        chunk = list(islice(records, size))
+        if not chunk:
+            return
+        yield start, chunk
+        start += len(chunk)
+
+
+def process_chunk(start: int, chunk: list, sections: tuple, output_format: str, store_path: str = None) -> tuple:
+    """Worker entry point: build every record's response and serialize the chunk as JSONL.
+
+    Returns (jsonl_text, record_count, failed_count, store_error); the text
+    is one string so it crosses the process boundary as a single pickled
+    object. With a store_path the chunk's identities are also written to that
+    store; a failed write is returned as store_error instead of raised, since
+    the results themselves are complete.
+    """
+    batch = chart_engine._run_batch(
+        chunk, lambda context: chart_engine._brand_identity_response(context, sections, output_format),
+        optional_fields=("business_name",)
+    )
+    store_error = None
+    if store_path:
+        from brand_store import variant_key
+        try:
+            store = _store(store_path)
+        except Exception as e:
+            store_error = f"{type(e).__name__}: {e}"
+        else:
+            if not store.put_batch(chunk, batch["results"], variant_key(sections, output_format)):
+                store_error = store.last_write_error
+    lines = []
+    for result in batch["results"]:
+        result["index"] += start
+        lines.append(json.dumps(result, ensure_ascii=False))
+    lines.append("")
+    return "\n".join(lines), batch["count"], batch["failed"], store_error
+
+
+def run(records, out, workers: int, chunk_size: int, sections: tuple, output_format: str,
+        store_path: str = None) -> dict:
+    """Process records through a process pool, writing results in input order"""
+    started = time.perf_counter()
+    total = failed = unstored = 0
+    store_error = None
+
+    def write(text, chunk_count, chunk_failed, chunk_store_error):
+        nonlocal total, failed, unstored, store_error
+        out.write(text)
+        total += chunk_count
+        failed += chunk_failed
+        if chunk_store_error is not None:
+            unstored += chunk_count - chunk_failed
+            store_error = chunk_store_error
+
+    chunks = chunked(records, chunk_size)
+    if workers <= 0:
+        for start, chunk in chunks:
+            write(*process_chunk(start, chunk, sections, output_format, store_path))
+    else:
+        # At most `window` chunks are read ahead of the writer at any time
+        window = workers * 2
+        pending = deque()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for start, chunk in chunks:
+                pending.append(pool.submit(process_chunk, start, chunk, sections, output_format, store_path))
+                if len(pending) >= window:
+                    write(*pending.popleft().result())
+            while pending:
+                write(*pending.popleft().result())
+
+    elapsed = time.perf_counter() - started
+    return {
+        "records": total,
+        "succeeded": total - failed,
+        "failed": failed,
+        "not_stored": unstored,
+        "store_error": store_error,
+        "elapsed_seconds": round(elapsed, 3),
+        "records_per_sec": round(total / elapsed, 1) if elapsed > 0 else 0.0
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Generate brand identities for a file of birth records")
+    parser.add_argument("input", help="CSV or JSONL file of birth records ('-' for stdin)")
+    parser.add_argument("-o", "--output", default="-", help="JSONL output file ('-' for stdout, the default)")
+    parser.add_argument("--input-format", choices=("csv", "jsonl"),
+                        help="input format (default: from the file extension)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="worker processes (0 = run in this process)")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="records per work unit")
+    parser.add_argument("--sections", nargs="+", choices=chart_engine.GUIDELINE_SECTIONS,
+                        help="only include these guideline sections")
+    parser.add_argument("--output-format", choices=chart_engine.OUTPUT_FORMATS, default="markdown")
+    parser.add_argument("--store", help="also record every identity in this SQLite identity store")
+    args = parser.parse_args(argv)
+
+    if not 1 <= args.chunk_size <= chart_engine.MAX_BATCH_SIZE:
+        parser.error(f"--chunk-size must be between 1 and {chart_engine.MAX_BATCH_SIZE}")
+    sections = chart_engine._select_sections(args.sections)
+
+    records = read_records(args.input, args.input_format)
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        summary = run(records, out, args.workers, args.chunk_size, sections, args.output_format, args.store)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    print(
+        f"{summary['records']} records ({summary['failed']} failed) in "
+        f"{summary['elapsed_seconds']}s — {summary['records_per_sec']:,.0f} records/sec",
+        file=sys.stderr
+    )
+    if summary["not_stored"]:
+        print(f"{summary['not_stored']} identities were not written to the store (last error: "
+              f"{summary['store_error']})", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1909 @@
+"""
+Chart engine for the Brand Identity Discovery MCP Server.
+
+Brand frameworks, lookup tables, chart calculation, input parsing, the chart
+cache and the response builders, with no dependency on FastMCP. server.py is
+a thin MCP adapter over this module; batch jobs, benchmarks and worker
+processes can import it directly without paying the MCP framework's import cost.
+"""
+
+from array import array
+from collections import Counter, OrderedDict
+from contextlib import nullcontext
+from dataclasses import dataclass, replace
+from datetime import date, datetime
+import functools
+import hashlib
+import json
+from operator import attrgetter
+import os
+import re
+import threading
+import time
+import weakref
+import zlib
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from color_engine import analyze_palette, blend, parse_hex, to_hex
+from ephemeris import (DEFAULT_PATH as EPHEMERIS_PATH, Ephemeris, ascendant, days_since_epoch,
+                       obliquity, sidereal_time)
+from gazetteer import DEFAULT_PATH as GAZETTEER_PATH, Gazetteer, Place
+
+# ============================================================================
+# DATA - All brand frameworks
+# ============================================================================
+
+ZODIAC_SIGNS = {
+    "Aries": {
+        "element": "Fire",
+        "modality": "Cardinal",
+        "keywords": ["pioneering", "bold", "energetic", "competitive", "direct"],
+        "brand_traits": ["innovative", "dynamic", "courageous", "action-oriented"]
+    },
+    "Taurus": {
+        "element": "Earth",
+        "modality": "Fixed",
+        "keywords": ["stable", "sensual", "reliable", "patient", "luxurious"],
+        "brand_traits": ["trustworthy", "quality-focused", "grounded", "enduring"]
+    },
+    "Gemini": {
+        "element": "Air",
+        "modality": "Mutable",
+        "keywords": ["communicative", "versatile", "curious", "witty", "social"],
+        "brand_traits": ["adaptable", "engaging", "informative", "multi-faceted"]
+    },
+    "Cancer": {
+        "element": "Water",
+        "modality": "Cardinal",
+        "keywords": ["nurturing", "intuitive", "protective", "emotional", "homey"],
+        "brand_traits": ["caring", "supportive", "empathetic", "community-focused"]
+    },
+    "Leo": {
+        "element": "Fire",
+        "modality": "Fixed",
+        "keywords": ["confident", "creative", "generous", "dramatic", "royal"],
+        "brand_traits": ["bold", "charismatic", "premium", "expressive"]
+    },
+    "Virgo": {
+        "element": "Earth",
+        "modality": "Mutable",
+        "keywords": ["analytical", "precise", "helpful", "practical", "refined"],
+        "brand_traits": ["detail-oriented", "efficient", "service-focused", "expert"]
+    },
+    "Libra": {
+        "element": "Air",
+        "modality": "Cardinal",
+        "keywords": ["harmonious", "diplomatic", "aesthetic", "balanced", "social"],
+        "brand_traits": ["elegant", "fair", "collaborative", "refined"]
+    },
+    "Scorpio": {
+        "element": "Water",
+        "modality": "Fixed",
+        "keywords": ["intense", "transformative", "mysterious", "powerful", "deep"],
+        "brand_traits": ["authentic", "transformative", "passionate", "profound"]
+    },
+    "Sagittarius": {
+        "element": "Fire",
+        "modality": "Mutable",
+        "keywords": ["adventurous", "philosophical", "optimistic", "free", "expansive"],
+        "brand_traits": ["visionary", "adventurous", "inspiring", "global"]
+    },
+    "Capricorn": {
+        "element": "Earth",
+        "modality": "Cardinal",
+        "keywords": ["ambitious", "disciplined", "traditional", "authoritative", "responsible"],
+        "brand_traits": ["professional", "reliable", "ambitious", "structured"]
+    },
+    "Aquarius": {
+        "element": "Air",
+        "modality": "Fixed",
+        "keywords": ["innovative", "humanitarian", "unconventional", "intellectual", "independent"],
+        "brand_traits": ["progressive", "unique", "humanitarian", "innovative"]
+    },
+    "Pisces": {
+        "element": "Water",
+        "modality": "Mutable",
+        "keywords": ["compassionate", "artistic", "intuitive", "dreamy", "spiritual"],
+        "brand_traits": ["imaginative", "empathetic", "creative", "spiritual"]
+    }
+}
+
+HUMAN_DESIGN_TYPES = {
+    "Manifestor": {
+        "strategy": "Inform before acting",
+        "percentage": "9%",
+        "brand_strength": "Initiating, pioneering, independent action",
+        "brand_approach": "Bold launches, trend-setting, disruptive innovation"
+    },
+    "Generator": {
+        "strategy": "Wait to respond",
+        "percentage": "37%",
+        "brand_strength": "Sustainable energy, mastery, satisfaction",
+        "brand_approach": "Responsive service, building momentum, sustainable growth"
+    },
+    "Manifesting Generator": {
+        "strategy": "Wait to respond, then inform",
+        "percentage": "33%",
+        "brand_strength": "Multi-passionate, efficient, fast-paced",
+        "brand_approach": "Quick pivots, multi-faceted offerings, dynamic evolution"
+    },
+    "Projector": {
+        "strategy": "Wait for invitation",
+        "percentage": "20%",
+        "brand_strength": "Guidance, systems, recognition",
+        "brand_approach": "Expert positioning, premium pricing, invitation-based marketing"
+    },
+    "Reflector": {
+        "strategy": "Wait a lunar cycle",
+        "percentage": "1%",
+        "brand_strength": "Evaluation, reflection, community barometer",
+        "brand_approach": "Unique perspective, community-focused, reflective content"
+    }
+}
+
+HUMAN_DESIGN_AUTHORITIES = {
+    "Emotional": "Wait for emotional clarity over time",
+    "Sacral": "Trust gut responses in the moment",
+    "Splenic": "Trust intuitive hits in the present",
+    "Ego": "Trust willpower and heart desires",
+    "Self-Projected": "Trust what you hear yourself say",
+    "Environmental": "Trust wisdom from your environment",
+    "Lunar": "Wait through a full moon cycle"
+}
+
+HUMAN_DESIGN_PROFILES = {
+    "1/3": {"name": "Investigator/Martyr", "essence": "Research-based experimentation"},
+    "1/4": {"name": "Investigator/Opportunist", "essence": "Expert networking"},
+    "2/4": {"name": "Hermit/Opportunist", "essence": "Natural talent meets networking"},
+    "2/5": {"name": "Hermit/Heretic", "essence": "Called forth genius"},
+    "3/5": {"name": "Martyr/Heretic", "essence": "Trial and error problem-solving"},
+    "3/6": {"name": "Martyr/Role Model", "essence": "Experiential wisdom"},
+    "4/6": {"name": "Opportunist/Role Model", "essence": "Network-based leadership"},
+    "4/1": {"name": "Opportunist/Investigator", "essence": "Networking meets research"},
+    "5/1": {"name": "Heretic/Investigator", "essence": "Practical solutions"},
+    "5/2": {"name": "Heretic/Hermit", "essence": "Universal problem-solver"},
+    "6/2": {"name": "Role Model/Hermit", "essence": "Wisdom through experience"},
+    "6/3": {"name": "Role Model/Martyr", "essence": "Authentic living example"}
+}
+
+BRAND_ARCHETYPES = {
+    "Innocent": {"desire": "Safety and happiness"},
+    "Sage": {"desire": "Truth and knowledge"},
+    "Explorer": {"desire": "Freedom and discovery"},
+    "Outlaw": {"desire": "Revolution and change"},
+    "Magician": {"desire": "Transformation"},
+    "Hero": {"desire": "Mastery and courage"},
+    "Lover": {"desire": "Intimacy and beauty"},
+    "Jester": {"desire": "Joy and fun"},
+    "Everyperson": {"desire": "Belonging and connection"},
+    "Caregiver": {"desire": "Service and care"},
+    "Ruler": {"desire": "Control and order"},
+    "Creator": {"desire": "Innovation and expression"}
+}
+
+ARCHETYPE_COLORS = {
+    "Innocent": {"primary": "#FFE5E5", "secondary": "#B8E6FF", "accent": "#FFF8DC"},
+    "Sage": {"primary": "#2C3E50", "secondary": "#95A5A6", "accent": "#F39C12"},
+    "Explorer": {"primary": "#8B4513", "secondary": "#556B2F", "accent": "#CD853F"},
+    "Outlaw": {"primary": "#000000", "secondary": "#8B0000", "accent": "#4B0082"},
+    "Magician": {"primary": "#4B0082", "secondary": "#483D8B", "accent": "#C0C0C0"},
+    "Hero": {"primary": "#DC143C", "secondary": "#00008B", "accent": "#FFD700"},
+    "Lover": {"primary": "#8B0000", "secondary": "#FF69B4", "accent": "#FFD700"},
+    "Jester": {"primary": "#FF6347", "secondary": "#FFD700", "accent": "#32CD32"},
+    "Everyperson": {"primary": "#8B7355", "secondary": "#CD853F", "accent": "#F5DEB3"},
+    "Caregiver": {"primary": "#87CEEB", "secondary": "#98FB98", "accent": "#F5DEB3"},
+    "Ruler": {"primary": "#00008B", "secondary": "#800080", "accent": "#FFD700"},
+    "Creator": {"primary": "#FF4500", "secondary": "#9370DB", "accent": "#FFD700"}
+}
+
+ARCHETYPE_FONTS = {
+    "Innocent": {"heading": "Quicksand, Nunito, or Poppins", "body": "Open Sans or Lato", "style": "Friendly, rounded, approachable"},
+    "Sage": {"heading": "Merriweather, Playfair Display, or Georgia", "body": "Source Sans Pro or Roboto", "style": "Classic, authoritative, readable"},
+    "Explorer": {"heading": "Montserrat Bold or Bebas Neue", "body": "Raleway or Lato", "style": "Bold, adventurous, rugged"},
+    "Outlaw": {"heading": "Oswald, Bebas Neue, or Impact", "body": "Roboto or Open Sans", "style": "Bold, edgy, rebellious"},
+    "Magician": {"heading": "Cinzel, Philosopher, or Cormorant Garamond", "body": "Lora or Crimson Text", "style": "Mystical, elegant, transformative"},
+    "Hero": {"heading": "Montserrat Black or Oswald", "body": "Open Sans or Roboto", "style": "Strong, confident, powerful"},
+    "Lover": {"heading": "Playfair Display or Cormorant Garamond", "body": "Crimson Text or Lora", "style": "Elegant, romantic, sophisticated"},
+    "Jester": {"heading": "Fredoka One or Baloo", "body": "Quicksand or Nunito", "style": "Playful, energetic, fun"},
+    "Everyperson": {"heading": "Open Sans or Lato", "body": "Roboto or PT Sans", "style": "Friendly, accessible, comfortable"},
+    "Caregiver": {"heading": "Nunito or Quicksand", "body": "Open Sans or Lato", "style": "Warm, soft, nurturing"},
+    "Ruler": {"heading": "Playfair Display or Cinzel", "body": "Lora or Crimson Text", "style": "Refined, authoritative, elegant"},
+    "Creator": {"heading": "Montserrat or Raleway", "body": "Open Sans or Lato", "style": "Modern, creative, versatile"}
+}
+
+ARCHETYPE_VOICE = {
+    "Innocent": {"personality": "Optimistic, simple, honest, pure", "tone": "Friendly, encouraging, positive"},
+    "Sage": {"personality": "Intelligent, analytical, thoughtful, guiding", "tone": "Authoritative, informative, thoughtful"},
+    "Explorer": {"personality": "Adventurous, authentic, brave, free", "tone": "Bold, inspiring, authentic"},
+    "Outlaw": {"personality": "Rebellious, disruptive, provocative, raw", "tone": "Bold, direct, challenging"},
+    "Magician": {"personality": "Visionary, inspirational, transformative, magical", "tone": "Inspiring, mystical, transformative"},
+    "Hero": {"personality": "Courageous, inspiring, determined, triumphant", "tone": "Motivating, confident, strong"},
+    "Lover": {"personality": "Passionate, intimate, sensual, devoted", "tone": "Warm, intimate, elegant"},
+    "Jester": {"personality": "Fun, playful, irreverent, joyful", "tone": "Playful, humorous, lighthearted"},
+    "Everyperson": {"personality": "Friendly, down-to-earth, reliable, genuine", "tone": "Conversational, warm, authentic"},
+    "Caregiver": {"personality": "Compassionate, nurturing, supportive, warm", "tone": "Caring, gentle, supportive"},
+    "Ruler": {"personality": "Authoritative, confident, refined, prestigious", "tone": "Sophisticated, authoritative, refined"},
+    "Creator": {"personality": "Innovative, imaginative, artistic, original", "tone": "Creative, inspiring, original"}
+}
+
+VISUAL_STYLES = {
+    "Innocent": {"aesthetic": "Soft, light, optimistic, simple", "imagery": "Bright, happy, uplifting images"},
+    "Sage": {"aesthetic": "Clean, authoritative, informative, trustworthy", "imagery": "Professional, educational, thoughtful"},
+    "Explorer": {"aesthetic": "Rugged, natural, adventurous, authentic", "imagery": "Nature, adventure, discovery, journeys"},
+    "Outlaw": {"aesthetic": "Bold, edgy, disruptive, unconventional", "imagery": "Urban, raw, rebellious, provocative"},
+    "Magician": {"aesthetic": "Mystical, transformative, visionary, enchanting", "imagery": "Transformative, magical, inspiring, cosmic"},
+    "Hero": {"aesthetic": "Strong, confident, triumphant, powerful", "imagery": "Achievement, strength, victory, courage"},
+    "Lover": {"aesthetic": "Elegant, sensual, intimate, beautiful", "imagery": "Beauty, romance, luxury, intimacy"},
+    "Jester": {"aesthetic": "Fun, playful, energetic, joyful", "imagery": "Playful, humorous, colorful, lively"},
+    "Everyperson": {"aesthetic": "Friendly, relatable, comfortable, genuine", "imagery": "Real people, everyday life, authenticity"},
+    "Caregiver": {"aesthetic": "Warm, nurturing, supportive, gentle", "imagery": "Care, support, comfort, warmth"},
+    "Ruler": {"aesthetic": "Refined, prestigious, authoritative, luxurious", "imagery": "Premium, sophisticated, powerful, prestigious"},
+    "Creator": {"aesthetic": "Innovative, artistic, unique, expressive", "imagery": "Creative, original, artistic, imaginative"}
+}
+
+# Element pairings: same element, then the traditionally compatible pairs
+ELEMENT_HARMONY = {"same": 1.0, ("Fire", "Air"): 0.75, ("Earth", "Water"): 0.75, "other": 0.25}
+
+# Same modality means the same pace but competing for the same role
+MODALITY_HARMONY = {"same": 0.5, "other": 1.0}
+
+# How well two Human Design types work together, 0-1 (order-independent)
+HUMAN_DESIGN_PAIRINGS = {
+    ("Manifestor", "Manifestor"): 0.4,
+    ("Manifestor", "Generator"): 0.8,
+    ("Manifestor", "Manifesting Generator"): 0.7,
+    ("Manifestor", "Projector"): 0.6,
+    ("Manifestor", "Reflector"): 0.7,
+    ("Generator", "Generator"): 0.8,
+    ("Generator", "Manifesting Generator"): 0.85,
+    ("Generator", "Projector"): 0.9,
+    ("Generator", "Reflector"): 0.7,
+    ("Manifesting Generator", "Manifesting Generator"): 0.7,
+    ("Manifesting Generator", "Projector"): 0.85,
+    ("Manifesting Generator", "Reflector"): 0.7,
+    ("Projector", "Projector"): 0.5,
+    ("Projector", "Reflector"): 0.7,
+    ("Reflector", "Reflector"): 0.6
+}
+
+# The four motivations the twelve archetypes are grouped under, with each one's opposite
+ARCHETYPE_ORIENTATIONS = {
+    "Independence": ("Innocent", "Sage", "Explorer"),
+    "Mastery": ("Outlaw", "Magician", "Hero"),
+    "Belonging": ("Lover", "Jester", "Everyperson"),
+    "Stability": ("Caregiver", "Ruler", "Creator")
+}
+OPPOSING_ORIENTATIONS = {"Independence": "Belonging", "Belonging": "Independence",
+                         "Mastery": "Stability", "Stability": "Mastery"}
+
+# ============================================================================
+# LOOKUP TABLES - built once at import, indexed by the calculation functions
+# ============================================================================
+
+SIGN_NAMES = tuple(ZODIAC_SIGNS)
+HD_TYPE_NAMES = tuple(HUMAN_DESIGN_TYPES)
+HD_AUTHORITY_NAMES = tuple(HUMAN_DESIGN_AUTHORITIES)
+HD_PROFILE_NAMES = ("1/3", "1/4", "2/4", "2/5", "3/5", "3/6", "4/6", "4/1", "5/1", "5/2", "6/2", "6/3")
+ARCHETYPE_NAMES = tuple(BRAND_ARCHETYPES)
+
+SIGN_INDEX = {name: i for i, name in enumerate(SIGN_NAMES)}
+HD_TYPE_INDEX = {name: i for i, name in enumerate(HD_TYPE_NAMES)}
+HD_AUTHORITY_INDEX = {name: i for i, name in enumerate(HD_AUTHORITY_NAMES)}
+HD_PROFILE_INDEX = {name: i for i, name in enumerate(HD_PROFILE_NAMES)}
+ARCHETYPE_INDEX = {name: i for i, name in enumerate(ARCHETYPE_NAMES)}
+
+SUN_SIGN_ARCHETYPES = {
+    "Aries": "Hero", "Taurus": "Everyperson", "Gemini": "Jester",
+    "Cancer": "Caregiver", "Leo": "Ruler", "Virgo": "Sage",
+    "Libra": "Lover", "Scorpio": "Magician", "Sagittarius": "Explorer",
+    "Capricorn": "Ruler", "Aquarius": "Creator", "Pisces": "Innocent"
+}
+
+HD_TYPE_ARCHETYPES = {
+    "Manifestor": "Outlaw", "Generator": "Everyperson",
+    "Manifesting Generator": "Creator", "Projector": "Sage", "Reflector": "Magician"
+}
+
+# First day of each month on which the Sun enters a new sign
+SUN_SIGN_CUSPS = (
+    (1, 20, "Aquarius"), (2, 19, "Pisces"), (3, 21, "Aries"), (4, 20, "Taurus"),
+    (5, 21, "Gemini"), (6, 21, "Cancer"), (7, 23, "Leo"), (8, 23, "Virgo"),
+    (9, 23, "Libra"), (10, 23, "Scorpio"), (11, 22, "Sagittarius"), (12, 22, "Capricorn")
+)
+
+# Upper bounds of the (day + 3*month + 5*hour) % 100 buckets for each HD type
+HD_TYPE_THRESHOLDS = (
+    (9, "Manifestor"), (46, "Generator"), (79, "Manifesting Generator"),
+    (99, "Projector"), (100, "Reflector")
+)
+
+PROJECTOR_AUTHORITIES = ("Splenic", "Ego", "Self-Projected", "Environmental", "Emotional")
+
+
+def _date_key(day: int, month: int) -> int:
+    """Calendar-position key (month * 32 + day) used to index the date tables"""
+    return month * 32 + day
+
+
+def _build_sun_sign_table() -> bytes:
+    table = bytearray([SIGN_INDEX["Pisces"]]) * _date_key(0, 13)
+    previous = SIGN_INDEX["Capricorn"]
+    for month, cusp_day, sign in SUN_SIGN_CUSPS:
+        for day in range(32):
+            table[_date_key(day, month)] = SIGN_INDEX[sign] if day >= cusp_day else previous
+        previous = SIGN_INDEX[sign]
+    return bytes(table)
+
+
+def _build_hd_type_table() -> bytes:
+    by_value = bytearray(100)
+    low = 0
+    for high, hd_type in HD_TYPE_THRESHOLDS:
+        by_value[low:high] = bytes([HD_TYPE_INDEX[hd_type]]) * (high - low)
+        low = high
+    table = bytearray(_date_key(0, 13) * 24)
+    for month in range(13):
+        for day in range(32):
+            base = _date_key(day, month) * 24
+            for hour in range(24):
+                table[base + hour] = by_value[(day + month * 3 + hour * 5) % 100]
+    return bytes(table)
+
+
+def _authority_for(hd_type: str, day: int) -> str:
+    if hd_type == "Manifestor":
+        return "Splenic" if day % 2 == 0 else "Emotional"
+    elif hd_type in ("Generator", "Manifesting Generator"):
+        return "Sacral" if day % 3 == 0 else "Emotional"
+    elif hd_type == "Projector":
+        return PROJECTOR_AUTHORITIES[day % len(PROJECTOR_AUTHORITIES)]
+    return "Lunar"
+
+
+def _build_hd_authority_table() -> bytes:
+    return bytes(
+        HD_AUTHORITY_INDEX[_authority_for(hd_type, day)]
+        for hd_type in HD_TYPE_NAMES
+        for day in range(32)
+    )
+
+
+def _build_hd_profile_table() -> bytes:
+    return bytes(
+        (day + month) % len(HD_PROFILE_NAMES)
+        for month in range(13)
+        for day in range(32)
+    )
+
+
+def _stable_hash(text: str) -> int:
+    """Process-independent string hash (Python's hash() is salted per process)"""
+    return zlib.crc32(text.encode("utf-8"))
+
+
+def _archetype_for(sun_sign: str, hd_type: str) -> str:
+    primary = SUN_SIGN_ARCHETYPES.get(sun_sign, "Sage")
+    hd_influence = HD_TYPE_ARCHETYPES.get(hd_type)
+    if hd_influence is not None and hd_influence != primary and _stable_hash(sun_sign + hd_type) % 10 < 3:
+        return hd_influence
+    return primary
+
+
+def _build_archetype_table() -> bytes:
+    return bytes(
+        ARCHETYPE_INDEX[_archetype_for(sun_sign, hd_type)]
+        for sun_sign in SIGN_NAMES
+        for hd_type in HD_TYPE_NAMES
+    )
+
+
+_SUN_SIGN_BY_DATE = _build_sun_sign_table()
+_RISING_SIGN_BY_MINUTE = bytes(minute // 120 for minute in range(24 * 60))
+_HD_TYPE_BY_DATE_HOUR = _build_hd_type_table()
+_HD_AUTHORITY_BY_TYPE_DAY = _build_hd_authority_table()
+_HD_PROFILE_BY_DATE = _build_hd_profile_table()
+_ARCHETYPE_BY_SUN_HD = _build_archetype_table()
+
+# Daily Moon longitudes 1900-2100 (see ephemeris.py); the file is mapped on first use
+chart_ephemeris = Ephemeris(os.environ.get("BRAND_EPHEMERIS_PATH", EPHEMERIS_PATH))
+
+# ============================================================================
+# CHART RECORDS - integer-coded chart cores, expanded to names only in responses
+# ============================================================================
+
+# Chart fields in packed order; each is a 4-bit index into its name table
+CHART_FIELDS = ("sun_sign", "moon_sign", "rising_sign", "hd_type", "hd_authority", "hd_profile", "archetype")
+_CHART_FIELD_NAMES = (SIGN_NAMES, SIGN_NAMES, SIGN_NAMES, HD_TYPE_NAMES, HD_AUTHORITY_NAMES,
+                      HD_PROFILE_NAMES, ARCHETYPE_NAMES)
+_CHART_SHIFTS = tuple(range(0, 4 * len(CHART_FIELDS), 4))
+
+def pack_chart(sun: int, moon: int, rising: int, hd_type: int, authority: int, profile: int, archetype: int) -> int:
+    """Pack seven chart indices into one 28-bit code"""
+    return sun | moon << 4 | rising << 8 | hd_type << 12 | authority << 16 | profile << 20 | archetype << 24
+
+
+def _chart_field(shift: int, names: tuple) -> property:
+    return property(lambda record: names[(record.code >> shift) & 15])
+
+
+class ChartRecord:
+    """One chart core as a single packed integer, interned so equal charts share one object.
+
+    Use ChartRecord.of(code) rather than the constructor. Name attributes
+    (sun_sign, hd_type, ...) decode on access; as_dict() gives the
+    calculate_chart() form. The intern table holds records weakly, so a
+    record is dropped once no cache entry or caller still references it.
+    """
+
+    __slots__ = ("code", "__weakref__")
+    _interned = weakref.WeakValueDictionary()
+
+    def __init__(self, code: int):
+        self.code = code
+
+    @classmethod
+    def of(cls, code: int) -> "ChartRecord":
+        record = cls._interned.get(code)
+        if record is None:
+            record = cls._interned.setdefault(code, cls(code))
+        return record
+
+    def indices(self) -> tuple:
+        code = self.code
+        return tuple((code >> shift) & 15 for shift in _CHART_SHIFTS)
+
+    def as_dict(self) -> dict:
+        return {field: names[index]
+                for field, names, index in zip(CHART_FIELDS, _CHART_FIELD_NAMES, self.indices())}
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, ChartRecord) and other.code == self.code
+
+    def __hash__(self) -> int:
+        return hash(self.code)
+
+    def __repr__(self) -> str:
+        return f"ChartRecord({', '.join(f'{k}={v!r}' for k, v in self.as_dict().items())})"
+
+
+for _field, _shift, _names in zip(CHART_FIELDS, _CHART_SHIFTS, _CHART_FIELD_NAMES):
+    setattr(ChartRecord, _field, _chart_field(_shift, _names))
+
+
+class ChartArray:
+    """Packed chart codes for a batch: 4 bytes per chart in an array('I').
+
+    Indexing yields interned ChartRecords; to_numpy() gives a structured array
+    with one uint8 column per chart field when NumPy is installed.
+    """
+
+    __slots__ = ("codes",)
+
+    def __init__(self, codes=()):
+        self.codes = array("I", codes)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, index: int) -> ChartRecord:
+        return ChartRecord.of(self.codes[index])
+
+    def __iter__(self):
+        return map(ChartRecord.of, self.codes)
+
+    def append(self, record: ChartRecord) -> None:
+        self.codes.append(record.code)
+
+    def column(self, field: str) -> list:
+        """Index codes of one chart field for every chart"""
+        shift = _CHART_SHIFTS[CHART_FIELDS.index(field)]
+        return [(code >> shift) & 15 for code in self.codes]
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.codes) * self.codes.itemsize
+
+    def to_numpy(self):
+        """Structured NumPy array (one uint8 field per chart field); requires numpy"""
+        import numpy as np
+        codes = np.frombuffer(self.codes, dtype=np.uint32) if len(self.codes) else np.zeros(0, np.uint32)
+        result = np.empty(len(codes), dtype=[(field, np.uint8) for field in CHART_FIELDS])
+        for field, shift in zip(CHART_FIELDS, _CHART_SHIFTS):
+            result[field] = (codes >> shift) & 15
+        return result
+
+# ============================================================================
+# CALCULATION FUNCTIONS
+# ============================================================================
+
+def calculate_zodiac_sign(day: int, month: int) -> str:
+    """Calculate zodiac sign from day and month"""
+    return SIGN_NAMES[_SUN_SIGN_BY_DATE[_date_key(day, month)]]
+
+def calculate_rising_sign(birth_hour: int, birth_minute: int) -> str:
+    """Approximate rising sign from clock time alone, used when the birth location is unknown"""
+    return SIGN_NAMES[_RISING_SIGN_BY_MINUTE[(birth_hour * 60 + birth_minute) % 1440]]
+
+def _utc_offset_hours(place: Place, day: int, month: int, year: int, hour: int, minute: int) -> float:
+    """UTC offset of the birthplace's clock at birth; local mean time if the zone is unknown"""
+    try:
+        offset = datetime(year, month, day, hour, minute, tzinfo=ZoneInfo(place.timezone)).utcoffset()
+        return offset.total_seconds() / 3600
+    except (ZoneInfoNotFoundError, ValueError, OverflowError):
+        return place.longitude / 15
+
+def _moon_rising_indices(day: int, month: int, year: int, hour: int, minute: int, place: Place = None) -> tuple:
+    """(moon sign, rising sign) indices from the ephemeris Moon and the true Ascendant.
+
+    Without a resolved place the clock time is taken as UT and the rising
+    sign falls back to the clock-time approximation.
+    """
+    ordinal = date(year, month, day).toordinal()
+    if place is None:
+        moon = chart_ephemeris.moon_longitude(ordinal, hour + minute / 60)
+        return int(moon // 30) % 12, _RISING_SIGN_BY_MINUTE[(hour * 60 + minute) % 1440]
+    ut_hours = hour + minute / 60 - _utc_offset_hours(place, day, month, year, hour, minute)
+    moon = chart_ephemeris.moon_longitude(ordinal, ut_hours)
+    days = days_since_epoch(ordinal, ut_hours)
+    rising = ascendant(sidereal_time(days) + place.longitude, place.latitude, obliquity(days))
+    return int(moon // 30) % 12, int(rising // 30) % 12
+
+def calculate_moon_sign(day: int, month: int, year: int, hour: int = 12, minute: int = 0,
+                        place: Place = None) -> str:
+    """Calculate moon sign from the ephemeris (at local noon unless a time is given)"""
+    return SIGN_NAMES[_moon_rising_indices(day, month, year, hour, minute, place)[0]]
+
+def calculate_ascendant_sign(day: int, month: int, year: int, hour: int, minute: int, place: Place) -> str:
+    """Calculate the true rising sign (Ascendant) for a birth at a resolved place"""
+    return SIGN_NAMES[_moon_rising_indices(day, month, year, hour, minute, place)[1]]
+
+def calculate_human_design_type(day: int, month: int, hour: int) -> str:
+    """Calculate Human Design type (simplified)"""
+    return HD_TYPE_NAMES[_HD_TYPE_BY_DATE_HOUR[_date_key(day, month) * 24 + hour]]
+
+def calculate_human_design_authority(hd_type: str, day: int) -> str:
+    """Calculate Human Design authority"""
+    type_index = HD_TYPE_INDEX.get(hd_type)
+    if type_index is None:
+        return "Lunar"
+    return HD_AUTHORITY_NAMES[_HD_AUTHORITY_BY_TYPE_DAY[type_index * 32 + day]]
+
+def calculate_human_design_profile(day: int, month: int) -> str:
+    """Calculate Human Design profile"""
+    return HD_PROFILE_NAMES[_HD_PROFILE_BY_DATE[_date_key(day, month)]]
+
+def determine_brand_archetype(sun_sign: str, moon_sign: str, rising_sign: str, hd_type: str) -> str:
+    """Determine primary brand archetype"""
+    sun_index = SIGN_INDEX.get(sun_sign)
+    type_index = HD_TYPE_INDEX.get(hd_type)
+    if sun_index is None or type_index is None:
+        return _archetype_for(sun_sign, hd_type)
+    return ARCHETYPE_NAMES[_ARCHETYPE_BY_SUN_HD[sun_index * len(HD_TYPE_NAMES) + type_index]]
+
+def hex_to_rgb(hex_color: str) -> str:
+    """Convert hex to RGB"""
+    hex_color = hex_color.lstrip('#')
+    r, g, b = tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+    return f"{r}, {g}, {b}"
+
+def calculate_chart_record(day: int, month: int, year: int, hour: int, minute: int,
+                           place: Place = None) -> ChartRecord:
+    """Calculate one birth's chart core as an integer-coded record"""
+    date_key = _date_key(day, month)
+    sun = _SUN_SIGN_BY_DATE[date_key]
+    moon, rising = _moon_rising_indices(day, month, year, hour, minute, place)
+    hd_type = _HD_TYPE_BY_DATE_HOUR[date_key * 24 + hour]
+    return ChartRecord.of(pack_chart(
+        sun, moon, rising, hd_type, _HD_AUTHORITY_BY_TYPE_DAY[hd_type * 32 + day],
+        _HD_PROFILE_BY_DATE[date_key], _ARCHETYPE_BY_SUN_HD[sun * len(HD_TYPE_NAMES) + hd_type]
+    ))
+
+def calculate_chart(day: int, month: int, year: int, hour: int, minute: int, place: Place = None) -> dict:
+    """Calculate the full chart core (signs, Human Design, archetype) for one birth"""
+    return calculate_chart_record(day, month, year, hour, minute, place).as_dict()
+
+def calculate_chart_array(births: list) -> ChartArray:
+    """Calculate packed chart codes for many (day, month, year, hour, minute[, place]) tuples.
+
+    Each chart field is computed as one pass over the lookup tables and the
+    ephemeris for the whole list, rather than one chain of helper calls per birth.
+    """
+    if not births:
+        return ChartArray()
+    days, months, years, hours, minutes = tuple(zip(*births))[:5]
+    date_keys = [_date_key(day, month) for day, month in zip(days, months)]
+    suns = [_SUN_SIGN_BY_DATE[key] for key in date_keys]
+    moons, risings = zip(*(_moon_rising_indices(*birth) for birth in births))
+    types = [_HD_TYPE_BY_DATE_HOUR[key * 24 + hour] for key, hour in zip(date_keys, hours)]
+    authorities = [_HD_AUTHORITY_BY_TYPE_DAY[hd * 32 + day] for hd, day in zip(types, days)]
+    profiles = [_HD_PROFILE_BY_DATE[key] for key in date_keys]
+    archetypes = [_ARCHETYPE_BY_SUN_HD[sun * len(HD_TYPE_NAMES) + hd] for sun, hd in zip(suns, types)]
+    return ChartArray(map(pack_chart, suns, moons, risings, types, authorities, profiles, archetypes))
+
+def calculate_charts(births: list) -> list:
+    """calculate_chart() dicts for many (day, month, year, hour, minute[, place]) tuples"""
+    return [record.as_dict() for record in calculate_chart_array(births)]
+
+# ============================================================================
+# INPUT PARSING & CHART CONTEXT - parse and compute once per request
+# ============================================================================
+
+class ChartInputError(ValueError):
+    """Invalid tool input, with a machine-readable error code and the offending field"""
+
+    def __init__(self, code: str, field: str, message: str):
+        super().__init__(message)
+        self.code = code
+        self.field = field
+
+
+_DAYS_IN_MONTH = (0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+def _days_in_month(year: int, month: int) -> int:
+    if month == 2 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0):
+        return 29
+    return _DAYS_IN_MONTH[month]
+
+def _require_text(value, field: str) -> str:
+    if not isinstance(value, str):
+        raise ChartInputError("invalid_type", field, f"{field} must be a string")
+    return value
+
+def _optional_text(value, field: str):
+    if value is not None and not isinstance(value, str):
+        raise ChartInputError("invalid_type", field, f"{field} must be a string or null")
+    return value
+
+def parse_birth_date(birth_date: str, field: str = "birth_date") -> tuple:
+    """Parse a YYYY-MM-DD birth date into (day, month, year) without strptime"""
+    parts = _require_text(birth_date, field).strip().split("-")
+    if (len(parts) != 3 or len(parts[0]) != 4
+            or not 1 <= len(parts[1]) <= 2 or not 1 <= len(parts[2]) <= 2
+            or not all(part.isascii() and part.isdigit() for part in parts)):
+        raise ChartInputError("invalid_date_format", field,
+                              f"{field} '{birth_date}' does not match YYYY-MM-DD")
+    year, month, day = int(parts[0]), int(parts[1]), int(parts[2])
+    if year < 1:
+        raise ChartInputError("year_out_of_range", field, f"year {year} is out of range (0001-9999)")
+    if not 1 <= month <= 12:
+        raise ChartInputError("month_out_of_range", field, f"month {month} is out of range (1-12)")
+    if not 1 <= day <= _days_in_month(year, month):
+        raise ChartInputError("day_out_of_range", field,
+                              f"day {day} is out of range for {year:04d}-{month:02d}")
+    return day, month, year
+
+def parse_birth_time(birth_time: str) -> tuple:
+    """Parse an HH:MM (24-hour) birth time into (hour, minute) without strptime"""
+    parts = _require_text(birth_time, "birth_time").strip().split(":")
+    if (len(parts) != 2
+            or not all(1 <= len(part) <= 2 and part.isascii() and part.isdigit() for part in parts)):
+        raise ChartInputError("invalid_time_format", "birth_time",
+                              f"birth_time '{birth_time}' does not match HH:MM")
+    hour, minute = int(parts[0]), int(parts[1])
+    if hour > 23:
+        raise ChartInputError("hour_out_of_range", "birth_time", f"hour {hour} is out of range (0-23)")
+    if minute > 59:
+        raise ChartInputError("minute_out_of_range", "birth_time", f"minute {minute} is out of range (0-59)")
+    return hour, minute
+
+
+@dataclass(frozen=True, slots=True)
+class ChartContext:
+    """Parsed birth data plus its computed chart; every tool response is built from one.
+
+    The chart is an interned ChartRecord; sun_sign, hd_type and the other
+    chart names are read through it.
+    """
+
+    birth_date: str
+    birth_time: str
+    birth_location: str
+    day: int
+    month: int
+    year: int
+    hour: int
+    minute: int
+    chart: ChartRecord
+    place: Place = None
+
+    sun_sign = property(attrgetter("chart.sun_sign"))
+    moon_sign = property(attrgetter("chart.moon_sign"))
+    rising_sign = property(attrgetter("chart.rising_sign"))
+    hd_type = property(attrgetter("chart.hd_type"))
+    hd_authority = property(attrgetter("chart.hd_authority"))
+    hd_profile = property(attrgetter("chart.hd_profile"))
+    archetype = property(attrgetter("chart.archetype"))
+
+
+# Offline birth-location resolver; the data file is mapped on first lookup
+gazetteer = Gazetteer(
+    os.environ.get("BRAND_GAZETTEER_PATH", GAZETTEER_PATH),
+    cache_size=int(os.environ.get("BRAND_GAZETTEER_CACHE_ENTRIES", "4096"))
+)
+
+_NO_SPAN = nullcontext()
+
+def _no_span(name: str):
+    return _NO_SPAN
+
+# Stage-timing hook around the steps of build_chart_context; server.py installs
+# profiling.span, and without it nothing is timed
+span = _no_span
+
+def set_span_hook(hook) -> None:
+    """Use hook(name) -> context manager to time chart stages (None restores the no-op)"""
+    global span
+    span = hook or _no_span
+
+def build_chart_context(birth_date: str, birth_time: str, birth_location: str) -> ChartContext:
+    """Parse and validate birth data, resolve the location, then calculate its chart"""
+    with span("parse"):
+        day, month, year = parse_birth_date(birth_date)
+        hour, minute = parse_birth_time(birth_time)
+    with span("location"):
+        place = gazetteer.resolve(_require_text(birth_location, "birth_location"))
+    with span("chart"):
+        chart = calculate_chart_record(day, month, year, hour, minute, place)
+    return ChartContext(birth_date, birth_time, birth_location, day, month, year, hour, minute, chart, place)
+
+# ============================================================================
+# CHART CACHE - one computed chart core per person, shared by every tool
+# ============================================================================
+
+class ChartCache:
+    """Thread-safe, size-bounded LRU cache of chart cores with optional TTL.
+
+    Keys are normalized (birth_date, birth_time, birth_location) tuples; values
+    are ChartContext objects. A max_entries of 0 disables
+    caching, and a ttl_seconds of 0 keeps entries until they are evicted.
+    """
+
+    def __init__(self, max_entries: int = 4096, ttl_seconds: float = 0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def make_key(birth_date: str, birth_time: str, birth_location: str) -> tuple:
+        return (birth_date.strip(), birth_time.strip(), " ".join(birth_location.casefold().split()))
+
+    def get(self, key: tuple):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            context, stored_at = entry
+            if self.ttl_seconds and time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return context
+
+    def put(self, key: tuple, context: ChartContext) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (context, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+chart_cache = ChartCache(
+    max_entries=int(os.environ.get("BRAND_CACHE_MAX_ENTRIES", "4096")),
+    ttl_seconds=float(os.environ.get("BRAND_CACHE_TTL_SECONDS", "0"))
+)
+
+def _chart_engine_fingerprint() -> int:
+    """Checksum of the engine's charts over a fixed sample, so a shared cache
+    file written by a different engine version is never trusted"""
+    greenwich = Place("Greenwich", "GB", "", 51.4769, 0.0, "Europe/London", 0, "exact")
+    checksum = 0
+    for year in range(1900, 2101, 7):
+        for month in range(1, 13):
+            for hour in range(0, 24, 5):
+                chart = calculate_chart((year + month) % 28 + 1, month, year, hour, (year * month) % 60,
+                                        greenwich if hour % 2 else None)
+                checksum = zlib.crc32("|".join(chart.values()).encode("utf-8"), checksum)
+    return checksum
+
+def _open_shared_chart_cache():
+    path = os.environ.get("BRAND_SHARED_CACHE_PATH")
+    if not path:
+        return None
+    from shared_cache import SharedChartCache
+    return SharedChartCache(
+        path,
+        slots=int(os.environ.get("BRAND_SHARED_CACHE_SLOTS", "65536")),
+        fingerprint=_chart_engine_fingerprint()
+    )
+
+# Optional cross-process cache (see serve.py); None unless BRAND_SHARED_CACHE_PATH is set
+shared_chart_cache = _open_shared_chart_cache()
+
+def _chart_codes(context: ChartContext) -> tuple:
+    return (context.day, context.month, context.year, context.hour, context.minute) + context.chart.indices()
+
+def _context_from_codes(birth_date: str, birth_time: str, birth_location: str, codes: tuple) -> ChartContext:
+    return ChartContext(
+        birth_date, birth_time, birth_location, *codes[:5],
+        ChartRecord.of(pack_chart(*codes[5:])), gazetteer.resolve(birth_location)
+    )
+
+def get_chart_context(birth_date: str, birth_time: str, birth_location: str) -> ChartContext:
+    """Return the ChartContext for this birth data, parsing and computing only on a cache miss.
+
+    Looks in the in-process LRU first, then the shared cross-process cache
+    when one is configured.
+    """
+    key = ChartCache.make_key(
+        _require_text(birth_date, "birth_date"),
+        _require_text(birth_time, "birth_time"),
+        _require_text(birth_location, "birth_location")
+    )
+    context = chart_cache.get(key)
+    if context is None:
+        codes = shared_chart_cache.get(key) if shared_chart_cache is not None else None
+        if codes is not None:
+            context = _context_from_codes(birth_date, birth_time, birth_location, codes)
+        else:
+            context = build_chart_context(birth_date, birth_time, birth_location)
+            if shared_chart_cache is not None:
+                shared_chart_cache.put(key, _chart_codes(context))
+        chart_cache.put(key, context)
+    elif (context.birth_date, context.birth_time, context.birth_location) != (birth_date, birth_time, birth_location):
+        # Same normalized key, different spelling: echo this request's inputs
+        context = replace(context, birth_date=birth_date, birth_time=birth_time, birth_location=birth_location)
+    return context
+
+# ============================================================================
+# POPULATION ANALYTICS - closed-form chart histograms over birth-date ranges
+# ============================================================================
+
+# Birth times sampled on every day of a range, as minutes after midnight
+DISTRIBUTION_SAMPLES = {
+    "day": (12 * 60,),
+    "hour": tuple(range(0, 24 * 60, 60)),
+    "minute": tuple(range(24 * 60))
+}
+
+MAX_DISTRIBUTION_DAYS = int(os.environ.get("BRAND_DISTRIBUTION_MAX_DAYS", str(366 * 200)))
+
+def _moon_sign_at(ordinal: int, minute_of_day: int) -> int:
+    hour, minute = divmod(minute_of_day, 60)
+    return int(chart_ephemeris.moon_longitude(ordinal, hour + minute / 60) // 30) % 12
+
+def _moon_sign_split(ordinal: int, samples: tuple, first: int, following: int) -> int:
+    """How many of one day's samples fall before the Moon leaves `first`, the sign at its first sample.
+
+    `following` is the sign at the same time next day. The Moon moves at most
+    ~15 degrees a day, so it changes sign at most once in between, and only if
+    the two differ; the change is then found by bisection.
+    """
+    if first == following or len(samples) == 1:
+        return len(samples)
+    lo, hi = 0, len(samples)
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if _moon_sign_at(ordinal, samples[mid]) == first:
+            lo = mid
+        else:
+            hi = mid
+    return hi
+
+@functools.lru_cache(maxsize=64)
+def _distribution_counts(start: int, end: int, time_resolution: str) -> tuple:
+    """Chart-field counts for every sampled birth between two day ordinals (inclusive).
+
+    Sun sign, profile and the Human Design fields depend only on the calendar
+    day and hour, so each distinct (month, day) is evaluated once and weighted
+    by how often it occurs; the rising sign depends only on the clock time;
+    only the Moon is looked up per day.
+    """
+    samples = DISTRIBUTION_SAMPLES[time_resolution]
+    hour_weights = [0] * 24
+    rising = [0] * 12
+    for minute_of_day in samples:
+        hour_weights[minute_of_day // 60] += 1
+        rising[_RISING_SIGN_BY_MINUTE[minute_of_day]] += 1
+
+    day_counts = [0] * _date_key(0, 13)
+    moon = [0] * 12
+    sun_moon = [0] * 144
+    following = _moon_sign_at(start, samples[0])
+    for ordinal in range(start, end + 1):
+        when = date.fromordinal(ordinal)
+        date_key = _date_key(when.day, when.month)
+        day_counts[date_key] += 1
+        sun = _SUN_SIGN_BY_DATE[date_key] * 12
+        first, following = following, _moon_sign_at(ordinal + 1, samples[0])
+        count = _moon_sign_split(ordinal, samples, first, following)
+        moon[first] += count
+        sun_moon[sun + first] += count
+        if count < len(samples):
+            moon[following] += len(samples) - count
+            sun_moon[sun + following] += len(samples) - count
+
+    suns = [0] * len(SIGN_NAMES)
+    types = [0] * len(HD_TYPE_NAMES)
+    authorities = [0] * len(HD_AUTHORITY_NAMES)
+    profiles = [0] * len(HD_PROFILE_NAMES)
+    archetypes = [0] * len(ARCHETYPE_NAMES)
+    for date_key, days in enumerate(day_counts):
+        if not days:
+            continue
+        day = date_key % 32
+        sun = _SUN_SIGN_BY_DATE[date_key]
+        suns[sun] += days * len(samples)
+        profiles[_HD_PROFILE_BY_DATE[date_key]] += days * len(samples)
+        for hour, weight in enumerate(hour_weights):
+            if weight:
+                hd_type = _HD_TYPE_BY_DATE_HOUR[date_key * 24 + hour]
+                types[hd_type] += days * weight
+                authorities[_HD_AUTHORITY_BY_TYPE_DAY[hd_type * 32 + day]] += days * weight
+                archetypes[_ARCHETYPE_BY_SUN_HD[sun * len(HD_TYPE_NAMES) + hd_type]] += days * weight
+
+    total_days = end - start + 1
+    rising = [count * total_days for count in rising]
+    return (total_days * len(samples), suns, moon, rising, types, authorities, profiles, archetypes, sun_moon)
+
+def chart_distribution(start: date, end: date, time_resolution: str = "hour") -> dict:
+    """Histograms of every chart field over all births from start to end, sampled per time_resolution.
+
+    Charts are location-free, as calculate_chart(place=None) computes them.
+    """
+    total, *fields, sun_moon = _distribution_counts(start.toordinal(), end.toordinal(), time_resolution)
+    histograms = {
+        field: dict(zip(names, counts))
+        for field, names, counts in zip(CHART_FIELDS, _CHART_FIELD_NAMES, fields)
+    }
+    histograms["sun_moon"] = {
+        f"{SIGN_NAMES[code // 12]}/{SIGN_NAMES[code % 12]}": count
+        for code, count in enumerate(sun_moon) if count
+    }
+    return {"total_charts": total, "histograms": histograms}
+
+# ============================================================================
+# REVERSE LOOKUP - inverted index from chart values to recurring birth windows
+# ============================================================================
+
+# Chart fields that depend only on the calendar day and clock hour, so every
+# year repeats the same windows; the Moon depends on the year and is not indexed
+WINDOW_FIELDS = ("sun_sign", "rising_sign", "hd_type", "hd_authority", "hd_profile", "archetype")
+
+# (month, day) of each index day, in calendar order and including Feb 29
+_WINDOW_DAYS = tuple((month, day) for month in range(1, 13) for day in range(1, _days_in_month(2000, month) + 1))
+_WINDOW_CELLS = len(_WINDOW_DAYS) * 24
+
+@functools.lru_cache(maxsize=1)
+def _birth_window_index() -> dict:
+    """field -> one bitmask per value index; bit n is set when hour cell n has that value.
+
+    Cell n is hour n % 24 of calendar day n // 24. Built on first use.
+    """
+    index = {field: [0] * len(names)
+             for field, names in zip(CHART_FIELDS, _CHART_FIELD_NAMES) if field in WINDOW_FIELDS}
+    for day_number, (month, day) in enumerate(_WINDOW_DAYS):
+        date_key = _date_key(day, month)
+        sun = _SUN_SIGN_BY_DATE[date_key]
+        profile = _HD_PROFILE_BY_DATE[date_key]
+        for hour in range(24):
+            bit = 1 << (day_number * 24 + hour)
+            hd_type = _HD_TYPE_BY_DATE_HOUR[date_key * 24 + hour]
+            index["sun_sign"][sun] |= bit
+            index["rising_sign"][_RISING_SIGN_BY_MINUTE[hour * 60]] |= bit
+            index["hd_type"][hd_type] |= bit
+            index["hd_authority"][_HD_AUTHORITY_BY_TYPE_DAY[hd_type * 32 + day]] |= bit
+            index["hd_profile"][profile] |= bit
+            index["archetype"][_ARCHETYPE_BY_SUN_HD[sun * len(HD_TYPE_NAMES) + hd_type]] |= bit
+    return {field: tuple(masks) for field, masks in index.items()}
+
+def _window_label(cell: int, minute: int) -> str:
+    month, day = _WINDOW_DAYS[cell // 24]
+    return f"{month:02d}-{day:02d} {cell % 24:02d}:{minute:02d}"
+
+@functools.lru_cache(maxsize=1024)
+def _birth_window_runs(criteria: tuple) -> tuple:
+    """((start label, end label, hours), ...) for runs of hour cells matching every (field, value index)"""
+    index = _birth_window_index()
+    mask = (1 << _WINDOW_CELLS) - 1
+    for field, value in criteria:
+        mask &= index[field][value]
+    bits = format(mask, f"0{_WINDOW_CELLS}b")[::-1]
+    return tuple((_window_label(run.start(), 0), _window_label(run.end() - 1, 59), run.end() - run.start())
+                 for run in re.finditer("1+", bits))
+
+def find_birth_windows(criteria: dict) -> tuple:
+    """Recurring ("MM-DD HH:MM" start, end, hours) windows whose births have every {field: name} in criteria.
+
+    Windows repeat every year (Feb 29 windows only in leap years) and assume
+    location-free charts, where the rising sign follows the clock time.
+    """
+    key = []
+    for field, name in criteria.items():
+        if field not in WINDOW_FIELDS:
+            raise ChartInputError("unsupported_field", field,
+                                  f"{field} cannot be searched; use one of {list(WINDOW_FIELDS)}")
+        names = _CHART_FIELD_NAMES[CHART_FIELDS.index(field)]
+        if name not in names:
+            raise ChartInputError("unknown_value", field, f"{field} must be one of {list(names)}")
+        key.append((field, names.index(name)))
+    return _birth_window_runs(tuple(sorted(key)))
+
+# ============================================================================
+# BIRTH-TIME SWEEP - change-points of a chart across the times of one day
+# ============================================================================
+
+# Chart fields that can change with the birth time on a fixed date and place
+SWEEP_FIELDS = ("moon_sign", "rising_sign", "hd_type", "hd_authority", "archetype")
+
+def _clock_minutes(text: str, field: str) -> int:
+    try:
+        hour, minute = parse_birth_time(text)
+    except ChartInputError as e:
+        raise ChartInputError(e.code, field, str(e).replace("birth_time", field)) from None
+    return hour * 60 + minute
+
+def sweep_birth_times(day: int, month: int, year: int, place: Place = None, start: int = 0,
+                      end: int = 24 * 60 - 1) -> list:
+    """[(first minute, ChartRecord), ...] at every minute of day in start..end where the chart changes.
+
+    The Human Design fields and archetype change only on the hour. Within an
+    hour the Moon and the Ascendant both move forward by far less than a full
+    circle, so a chart equal at both ends of a stretch is constant across it,
+    and each change is found by bisection from a handful of evaluations rather
+    than one per minute.
+    """
+    def chart_at(minute_of_day):
+        return calculate_chart_record(day, month, year, minute_of_day // 60, minute_of_day % 60, place)
+
+    changes = []
+
+    def split(lo, hi, at_lo, at_hi):
+        if at_lo is at_hi:
+            return
+        if hi - lo == 1:
+            changes.append((hi, at_hi))
+            return
+        mid = (lo + hi) // 2
+        at_mid = chart_at(mid)
+        split(lo, mid, at_lo, at_mid)
+        split(mid, hi, at_mid, at_hi)
+
+    previous = None
+    for hour_start in range(start - start % 60, end + 1, 60):
+        lo, hi = max(start, hour_start), min(end, hour_start + 59)
+        at_lo = chart_at(lo)
+        if at_lo is not previous:
+            changes.append((lo, at_lo))
+        at_hi = chart_at(hi) if hi > lo else at_lo
+        split(lo, hi, at_lo, at_hi)
+        previous = at_hi
+    return changes
+
+def _sweep_intervals(changes: list, end: int, fields: tuple) -> list:
+    """Merge change-points into ("HH:MM" start, "HH:MM" end, minutes, {field: name}) runs of equal `fields`"""
+    intervals = []
+    for n, (minute, record) in enumerate(changes):
+        values = {field: getattr(record, field) for field in fields}
+        last = changes[n + 1][0] - 1 if n + 1 < len(changes) else end
+        if intervals and intervals[-1][3] == values:
+            intervals[-1][1] = last
+        else:
+            intervals.append([minute, last, None, values])
+    return [(f"{lo // 60:02d}:{lo % 60:02d}", f"{hi // 60:02d}:{hi % 60:02d}", hi - lo + 1, values)
+            for lo, hi, _, values in intervals]
+
+# ============================================================================
+# TEAM COMPATIBILITY - pairwise scores over integer-coded charts
+# ============================================================================
+
+# Points each component contributes to a 0-100 pair score
+COMPATIBILITY_POINTS = {"sun_sign": 20, "moon_sign": 10, "rising_sign": 10, "hd_type": 30, "archetype": 30}
+
+MAX_TEAM_SIZE = int(os.environ.get("BRAND_MAX_TEAM_SIZE", "2000"))
+
+def sign_harmony(a: str, b: str) -> float:
+    """Element and modality harmony of two signs, 0-1"""
+    first, second = ZODIAC_SIGNS[a], ZODIAC_SIGNS[b]
+    elements = (first["element"], second["element"])
+    if elements[0] == elements[1]:
+        element = ELEMENT_HARMONY["same"]
+    else:
+        element = ELEMENT_HARMONY.get(elements, ELEMENT_HARMONY.get(elements[::-1], ELEMENT_HARMONY["other"]))
+    modality = MODALITY_HARMONY["same" if first["modality"] == second["modality"] else "other"]
+    return 0.7 * element + 0.3 * modality
+
+def human_design_pairing(a: str, b: str) -> float:
+    return HUMAN_DESIGN_PAIRINGS.get((a, b), HUMAN_DESIGN_PAIRINGS.get((b, a)))
+
+_ARCHETYPE_ORIENTATION = {name: group for group, names in ARCHETYPE_ORIENTATIONS.items() for name in names}
+
+def archetype_affinity(a: str, b: str) -> float:
+    """1 for the same archetype, then same, neighbouring and opposing motivations"""
+    if a == b:
+        return 1.0
+    if _ARCHETYPE_ORIENTATION[a] == _ARCHETYPE_ORIENTATION[b]:
+        return 0.8
+    return 0.3 if OPPOSING_ORIENTATIONS[_ARCHETYPE_ORIENTATION[a]] == _ARCHETYPE_ORIENTATION[b] else 0.5
+
+def _pair_tables(names: tuple, score, points: int) -> tuple:
+    """One bytes.translate table per value index a, mapping value index b to the pair's points"""
+    return tuple(
+        bytes(round(points * score(a, b)) for b in names) + bytes(256 - len(names))
+        for a in names
+    )
+
+# Each person's field codes translate a whole column of partner codes to points at once
+_COMPATIBILITY_TABLES = {
+    "sun_sign": _pair_tables(SIGN_NAMES, sign_harmony, COMPATIBILITY_POINTS["sun_sign"]),
+    "moon_sign": _pair_tables(SIGN_NAMES, sign_harmony, COMPATIBILITY_POINTS["moon_sign"]),
+    "rising_sign": _pair_tables(SIGN_NAMES, sign_harmony, COMPATIBILITY_POINTS["rising_sign"]),
+    "hd_type": _pair_tables(HD_TYPE_NAMES, human_design_pairing, COMPATIBILITY_POINTS["hd_type"]),
+    "archetype": _pair_tables(ARCHETYPE_NAMES, archetype_affinity, COMPATIBILITY_POINTS["archetype"])
+}
+
+def compatibility_rows(charts: ChartArray) -> list:
+    """One bytes row of 0-100 scores per chart against every chart; the diagonal is 100.
+
+    Each component row comes from one bytes.translate over the partners' codes.
+    The rows are added as big integers, one byte per partner; a total never
+    exceeds 100, so no byte carries into its neighbour.
+    """
+    size = len(charts)
+    columns = {field: bytes(charts.column(field)) for field in COMPATIBILITY_POINTS}
+    tables = [(_COMPATIBILITY_TABLES[field], column) for field, column in columns.items()]
+    rows = []
+    for i in range(size):
+        total = 0
+        for field_tables, column in tables:
+            total += int.from_bytes(column.translate(field_tables[column[i]]), "big")
+        row = total.to_bytes(size, "big")
+        rows.append(row[:i] + b"\x64" + row[i + 1:])
+    return rows
+
+# ============================================================================
+# REFERENCE DATA - static tables published as versioned, content-hashed resources
+# ============================================================================
+
+def resource_slug(name: str) -> str:
+    """URI-safe form of a table key: "Manifesting Generator" -> "manifesting-generator", "1/3" -> "1-3" """
+    return "-".join(name.casefold().replace("/", " ").split())
+
+def _content_hash(data) -> str:
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return "sha256:" + hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+# URI kind -> {name: data}; every entry never changes between calls
+REFERENCE_TABLES = {
+    "zodiac": ZODIAC_SIGNS,
+    "hd/type": HUMAN_DESIGN_TYPES,
+    "hd/authority": {name: {"description": text} for name, text in HUMAN_DESIGN_AUTHORITIES.items()},
+    "hd/profile": HUMAN_DESIGN_PROFILES,
+    "archetype": {
+        name: {**BRAND_ARCHETYPES[name], "colors": ARCHETYPE_COLORS[name], "fonts": ARCHETYPE_FONTS[name],
+               "voice": ARCHETYPE_VOICE[name], "visual_style": VISUAL_STYLES[name]}
+        for name in ARCHETYPE_NAMES
+    }
+}
+
+def resource_uri(kind: str, name: str) -> str:
+    return f"brand://{kind}/{resource_slug(name)}"
+
+def _build_reference_resources() -> tuple:
+    """({uri: JSON text}, {uri: content hash}, overall data version)"""
+    texts, hashes = {}, {}
+    for kind, table in REFERENCE_TABLES.items():
+        for name, data in table.items():
+            uri = resource_uri(kind, name)
+            hashes[uri] = _content_hash(data)
+            texts[uri] = json.dumps({"uri": uri, "name": name, "content_hash": hashes[uri], "data": data},
+                                    ensure_ascii=False)
+    return texts, hashes, _content_hash(hashes)
+
+_REFERENCE_TEXTS, REFERENCE_HASHES, REFERENCE_DATA_VERSION = _build_reference_resources()
+
+def reference_resource(kind: str, slug: str) -> str:
+    """JSON text of one reference resource, identical on every call"""
+    text = _REFERENCE_TEXTS.get(f"brand://{kind}/{resource_slug(slug)}")
+    if text is None:
+        raise ChartInputError("unknown_resource", "uri", f"no reference resource brand://{kind}/{slug}")
+    return text
+
+def reference_catalog() -> dict:
+    """Every reference resource URI with its content hash, plus the overall data version"""
+    return {"version": REFERENCE_DATA_VERSION, "resources": dict(REFERENCE_HASHES)}
+
+# ============================================================================
+# RESPONSE BUILDERS - shared by the single-record and batch tools
+# ============================================================================
+
+MAX_BATCH_SIZE = 10000
+
+def _error_response(error: Exception) -> dict:
+    if isinstance(error, ChartInputError):
+        return {"status": "error", "error": str(error), "error_code": error.code, "field": error.field}
+    return {"status": "error", "error": str(error), "error_code": "internal_error"}
+
+def _color_label(name: str) -> str:
+    """"primary" -> "Primary", "neutral_dark" -> "Dark Neutral" """
+    return " ".join(reversed(name.split("_"))).title()
+
+def _accessible_pairings(archetype: str, limit: int = 4) -> str:
+    """The highest-contrast pairings of a palette that pass AA for body text"""
+    pairs = [pair for pair in PALETTE_ANALYSES[archetype]["accessible_pairs"] if pair["level"] in ("AAA", "AA")]
+    return "\n".join(
+        f"{_color_label(a)} + {_color_label(b)} • {pair['ratio']}:1 • {pair['level']}"
+        for pair in pairs[:limit] for a, b in [pair["colors"]]
+    )
+
+def _render_guidelines(archetype: str, birth_date: str, birth_time: str, birth_location: str,
+                       sun_sign: str, moon_sign: str, rising_sign: str,
+                       hd_type: str, hd_authority: str, hd_profile: str) -> str:
+    """Reference guidelines template; compiled per archetype by _compile_guidelines"""
+    colors = ARCHETYPE_COLORS[archetype]
+    fonts = ARCHETYPE_FONTS[archetype]
+    voice = ARCHETYPE_VOICE[archetype]
+    visual = VISUAL_STYLES[archetype]
+    return f"""# BRAND IDENTITY GUIDELINES
+
+**Generated for:** {birth_date} at {birth_time} in {birth_location}
+
+---
+
+## Core Brand Identity
+
+**Primary Archetype:** {archetype}
+**Astrological Foundation:** {sun_sign} Sun • {moon_sign} Moon • {rising_sign} Rising
+**Human Design:** {hd_type} • {hd_authority} Authority • {hd_profile} Profile
+
+{BRAND_ARCHETYPES[archetype]['desire']} is at the heart of this brand.
+This core identity shapes every visual and verbal element of your brand presence.
+
+---
+
+## Color Palette
+
+**Primary Brand Color**
+Primary Color • {colors['primary']} • RGB {hex_to_rgb(colors['primary'])}
+Use for: Main brand elements, headers, key CTAs
+
+**Secondary Color**
+Secondary Color • {colors['secondary']} • RGB {hex_to_rgb(colors['secondary'])}
+Use for: Supporting elements, subheadings, backgrounds
+
+**Accent Color**
+Accent Color • {colors['accent']} • RGB {hex_to_rgb(colors['accent'])}
+Use for: Highlights, buttons, important details
+
+**Neutral Colors**
+Dark Neutral • #2C3E50 • RGB 44, 62, 80
+Medium Neutral • #95A5A6 • RGB 149, 165, 166
+Light Neutral • #ECF0F1 • RGB 236, 240, 241
+
+**Accessible Pairings (WCAG 2.x contrast)**
+{_accessible_pairings(archetype)}
+
+---
+
+## Typography
+
+**Heading Font:** {fonts['heading']}
+Use for: Main headlines, section headers, hero text
+Sizes: H1 48-60px, H2 36-42px, H3 24-30px
+
+**Body Font:** {fonts['body']}
+Use for: Paragraphs, descriptions, general content
+Sizes: Body 16-18px, Caption 14px
+
+**Font Style:** {fonts['style']}
+Line height: 1.5-1.8
+Letter spacing: Normal (0) for body, tight (-0.5px) for headings
+
+---
+
+## Logo Guidelines
+
+**Style:** {archetype} brand aesthetic
+
+**Primary Logo**
+Font: Primary heading font
+Color: Primary brand color
+Format: Full color on white background
+
+**Required Variations**
+• Full color
+• Single color (black)
+• Single color (white)
+• Horizontal version
+• Stacked version
+• Icon only
+
+**Sizing & Spacing**
+Minimum size: 24px height for digital, 0.5 inch for print
+Clear space: Equal to height of logo on all sides
+Formats: SVG, PNG, PDF
+
+---
+
+## Visual Style
+
+**Overall Aesthetic:** {visual['aesthetic']}
+
+**Imagery Style:** {visual['imagery']}
+
+**Photography Direction**
+Style: Images should feel {visual['aesthetic']}
+Subjects: {visual['imagery']}
+
+---
+
+## Brand Voice
+
+**Personality:** {voice['personality']}
+**Tone:** {voice['tone']}
+
+**Communication Style**
+Speak with {voice['tone']} to connect authentically with your audience.
+Embody {voice['personality']} in every message.
+
+---
+
+## Quick Reference
+
+**One-Line Brand Essence:** {archetype} brand with {sun_sign} energy, {hd_type} approach
+
+**Color Snapshot:** {colors['primary']} • {colors['secondary']} • {colors['accent']}
+
+**Font Pairing:** {fonts['heading']} + {fonts['body']}
+
+**Visual Mood:** {visual['aesthetic']}
+
+**Voice:** {voice['personality']}
+
+---
+
+*These guidelines provide a complete foundation for your brand identity. Use them to maintain consistency across all brand touchpoints, from website to social media to print materials.*
+"""
+
+# Per-person fields spliced into the precompiled guidelines; everything else
+# depends only on the archetype
+GUIDELINE_FIELDS = (
+    "birth_date", "birth_time", "birth_location",
+    "sun_sign", "moon_sign", "rising_sign",
+    "hd_type", "hd_authority", "hd_profile"
+)
+
+# Selectable guideline sections, in document order
+GUIDELINE_SECTIONS = ("core", "palette", "typography", "logo", "visual", "voice", "quick_reference")
+OUTPUT_FORMATS = ("markdown", "json")
+
+NEUTRAL_COLORS = {"dark": "#2C3E50", "medium": "#95A5A6", "light": "#ECF0F1"}
+
+# Contrast matrix, ramps and harmonies for each archetype palette plus the
+# neutrals, computed once here so the palette tools never recompute them
+PALETTE_ANALYSES = {
+    archetype: analyze_palette({
+        **ARCHETYPE_COLORS[archetype],
+        **{f"neutral_{name}": value for name, value in NEUTRAL_COLORS.items()}
+    })
+    for archetype in ARCHETYPE_NAMES
+}
+MAX_PALETTE_COLORS = 32
+LOGO_VARIATIONS = ("Full color", "Single color (black)", "Single color (white)",
+                   "Horizontal version", "Stacked version", "Icon only")
+
+_SECTION_SEPARATOR = "\n---\n\n"
+
+def _slot_getter(fields: tuple):
+    """attrgetter that always returns a tuple, even for a single field"""
+    if len(fields) == 1:
+        getter = attrgetter(fields[0])
+        return lambda context: (getter(context),)
+    return attrgetter(*fields)
+
+def _compile_template(text: str) -> tuple:
+    """Split sentinel-marked text into (static_chunks, slot_getter); slot_getter is None without slots"""
+    pieces = text.split("\x00")
+    # Even pieces are static text, odd pieces are the field names between them
+    fields = tuple(pieces[1::2])
+    return tuple(pieces[0::2]), _slot_getter(fields) if fields else None
+
+def _fill_template(template: tuple, context: ChartContext) -> str:
+    static_chunks, slot_getter = template
+    if slot_getter is None:
+        return static_chunks[0]
+    parts = [None] * (2 * len(static_chunks) - 1)
+    parts[0::2] = static_chunks
+    parts[1::2] = slot_getter(context)
+    return "".join(parts)
+
+def _compile_guidelines(archetype: str) -> dict:
+    """Pre-render an archetype's guidelines, leaving only the per-person fields as slots.
+
+    Returns a template per block: "header", each name in GUIDELINE_SECTIONS,
+    and "footer". Joining every block with _SECTION_SEPARATOR reproduces
+    _render_guidelines exactly.
+    """
+    sentinels = {field: f"\x00{field}\x00" for field in GUIDELINE_FIELDS}
+    blocks = _render_guidelines(archetype, **sentinels).split(_SECTION_SEPARATOR)
+    names = ("header",) + GUIDELINE_SECTIONS + ("footer",)
+    assert len(blocks) == len(names), "guidelines template sections out of sync"
+    return {name: _compile_template(block) for name, block in zip(names, blocks)}
+
+_GUIDELINE_TEMPLATES = {archetype: _compile_guidelines(archetype) for archetype in ARCHETYPE_NAMES}
+
+def _format_guidelines(context: ChartContext, sections: tuple = GUIDELINE_SECTIONS) -> str:
+    """Markdown guidelines for the requested sections; the footer is kept only for the full document"""
+    templates = _GUIDELINE_TEMPLATES[context.archetype]
+    names = ("header",) + sections
+    if sections == GUIDELINE_SECTIONS:
+        names += ("footer",)
+    return _SECTION_SEPARATOR.join(_fill_template(templates[name], context) for name in names)
+
+def _core_section(context: ChartContext) -> dict:
+    return {
+        "archetype": context.archetype,
+        "desire": BRAND_ARCHETYPES[context.archetype]["desire"]
+    }
+
+def _build_palette_section(archetype: str) -> dict:
+    colors = ARCHETYPE_COLORS[archetype]
+    return {
+        "primary": {"hex": colors["primary"], "rgb": hex_to_rgb(colors["primary"]),
+                    "use_for": "Main brand elements, headers, key CTAs"},
+        "secondary": {"hex": colors["secondary"], "rgb": hex_to_rgb(colors["secondary"]),
+                      "use_for": "Supporting elements, subheadings, backgrounds"},
+        "accent": {"hex": colors["accent"], "rgb": hex_to_rgb(colors["accent"]),
+                   "use_for": "Highlights, buttons, important details"},
+        "neutrals": {name: {"hex": value, "rgb": hex_to_rgb(value)} for name, value in NEUTRAL_COLORS.items()},
+        "analysis": PALETTE_ANALYSES[archetype]
+    }
+
+_PALETTE_SECTIONS = {archetype: _build_palette_section(archetype) for archetype in ARCHETYPE_NAMES}
+
+def _palette_section(context: ChartContext) -> dict:
+    return dict(_PALETTE_SECTIONS[context.archetype])
+
+def _typography_section(context: ChartContext) -> dict:
+    fonts = ARCHETYPE_FONTS[context.archetype]
+    return {
+        "heading": fonts["heading"],
+        "body": fonts["body"],
+        "style": fonts["style"],
+        "sizes": {"h1": "48-60px", "h2": "36-42px", "h3": "24-30px", "body": "16-18px", "caption": "14px"},
+        "line_height": "1.5-1.8",
+        "letter_spacing": {"body": "0", "headings": "-0.5px"}
+    }
+
+def _logo_section(context: ChartContext) -> dict:
+    return {
+        "style": f"{context.archetype} brand aesthetic",
+        "variations": list(LOGO_VARIATIONS),
+        "minimum_size": {"digital": "24px height", "print": "0.5 inch"},
+        "clear_space": "Equal to height of logo on all sides",
+        "formats": ["SVG", "PNG", "PDF"]
+    }
+
+def _visual_section(context: ChartContext) -> dict:
+    return dict(VISUAL_STYLES[context.archetype])
+
+def _voice_section(context: ChartContext) -> dict:
+    return dict(ARCHETYPE_VOICE[context.archetype])
+
+def _quick_reference_section(context: ChartContext) -> dict:
+    archetype = context.archetype
+    colors = ARCHETYPE_COLORS[archetype]
+    fonts = ARCHETYPE_FONTS[archetype]
+    return {
+        "essence": f"{archetype} brand with {context.sun_sign} energy, {context.hd_type} approach",
+        "colors": [colors["primary"], colors["secondary"], colors["accent"]],
+        "font_pairing": f"{fonts['heading']} + {fonts['body']}",
+        "visual_mood": VISUAL_STYLES[archetype]["aesthetic"],
+        "voice": ARCHETYPE_VOICE[archetype]["personality"]
+    }
+
+# Structured renderers, called only for the sections a request asks for
+_SECTION_RENDERERS = {
+    "core": _core_section,
+    "palette": _palette_section,
+    "typography": _typography_section,
+    "logo": _logo_section,
+    "visual": _visual_section,
+    "voice": _voice_section,
+    "quick_reference": _quick_reference_section
+}
+
+def _select_sections(sections) -> tuple:
+    """Validate requested section names and return them in document order (None = all)"""
+    if sections is None:
+        return GUIDELINE_SECTIONS
+    if isinstance(sections, str) or not all(isinstance(name, str) for name in sections):
+        raise ChartInputError("invalid_type", "sections", "sections must be a list of section names")
+    unknown = sorted(set(sections) - set(GUIDELINE_SECTIONS))
+    if unknown:
+        raise ChartInputError("invalid_section", "sections",
+                              f"Unknown section(s) {unknown}; choose from {list(GUIDELINE_SECTIONS)}")
+    if not sections:
+        raise ChartInputError("invalid_section", "sections", "sections must name at least one section")
+    return tuple(name for name in GUIDELINE_SECTIONS if name in sections)
+
+def _check_output_format(output_format: str) -> str:
+    if output_format not in OUTPUT_FORMATS:
+        raise ChartInputError("invalid_output_format", "output_format",
+                              f"output_format must be one of {list(OUTPUT_FORMATS)}")
+    return output_format
+
+def _brand_identity_response(context: ChartContext, sections: tuple = GUIDELINE_SECTIONS,
+                             output_format: str = "markdown") -> dict:
+    response = {
+        "status": "success",
+        "birth_data": {
+            "date": context.birth_date,
+            "time": context.birth_time,
+            "location": context.birth_location,
+            "resolved_location": _location_fields(context.place)
+        },
+        "astrology": {
+            "sun_sign": context.sun_sign,
+            "moon_sign": context.moon_sign,
+            "rising_sign": context.rising_sign
+        },
+        "human_design": {
+            "type": context.hd_type,
+            "authority": context.hd_authority,
+            "profile": context.hd_profile
+        },
+        "archetype": context.archetype
+    }
+    if output_format == "json":
+        response["sections"] = {name: _SECTION_RENDERERS[name](context) for name in sections}
+    else:
+        response["guidelines"] = _format_guidelines(context, sections)
+    return response
+
+def _build_color_palette(archetype: str) -> dict:
+    colors = ARCHETYPE_COLORS[archetype]
+    return {
+        "primary": {"hex": colors['primary'], "rgb": hex_to_rgb(colors['primary'])},
+        "secondary": {"hex": colors['secondary'], "rgb": hex_to_rgb(colors['secondary'])},
+        "accent": {"hex": colors['accent'], "rgb": hex_to_rgb(colors['accent'])}
+    }
+
+_COLOR_PALETTES = {archetype: _build_color_palette(archetype) for archetype in ARCHETYPE_NAMES}
+
+def _color_palette_response(context: ChartContext) -> dict:
+    return {
+        "status": "success",
+        "archetype": context.archetype,
+        "colors": _COLOR_PALETTES[context.archetype],
+        "analysis": PALETTE_ANALYSES[context.archetype]
+    }
+
+def _palette_analysis_response(palettes: list, include_neutrals: bool = False) -> dict:
+    """analyze_palette() for each caller-supplied {name: hex} palette; a bad palette fails alone"""
+    if not isinstance(palettes, list):
+        raise ChartInputError("invalid_type", "palettes", "palettes must be a list of {name: hex} objects")
+    if len(palettes) > MAX_BATCH_SIZE:
+        return {"status": "error", "error": f"Batch too large: {len(palettes)} palettes (max {MAX_BATCH_SIZE})",
+                "error_code": "batch_too_large"}
+    neutrals = {f"neutral_{name}": value for name, value in NEUTRAL_COLORS.items()} if include_neutrals else {}
+    results = []
+    for index, palette in enumerate(palettes):
+        try:
+            if not isinstance(palette, dict) or not palette:
+                raise ChartInputError("invalid_type", "palettes", "each palette must be a non-empty {name: hex} object")
+            if len(palette) + len(neutrals) > MAX_PALETTE_COLORS:
+                raise ChartInputError("palette_too_large", "palettes",
+                                      f"a palette may hold at most {MAX_PALETTE_COLORS} colors")
+            try:
+                analysis = analyze_palette({**palette, **neutrals})
+            except ValueError as e:
+                raise ChartInputError("invalid_color", "palettes", str(e)) from None
+            results.append({"index": index, "status": "success", **analysis})
+        except Exception as e:
+            results.append({"index": index, **_error_response(e)})
+    failed = sum(1 for result in results if result["status"] == "error")
+    return {"status": "success", "count": len(palettes), "succeeded": len(palettes) - failed,
+            "failed": failed, "results": results}
+
+def _typography_response(context: ChartContext) -> dict:
+    return {
+        "status": "success",
+        "archetype": context.archetype,
+        "typography": ARCHETYPE_FONTS[context.archetype]
+    }
+
+def _location_fields(place: Place):
+    if place is None:
+        return None
+    return {
+        "name": place.name,
+        "country_code": place.country_code,
+        "admin1": place.admin1 or None,
+        "latitude": place.latitude,
+        "longitude": place.longitude,
+        "timezone": place.timezone,
+        "match": place.match
+    }
+
+def _location_response(birth_location: str) -> dict:
+    place = gazetteer.resolve(_require_text(birth_location, "birth_location"))
+    if place is None:
+        raise ChartInputError("location_not_found", "birth_location",
+                              f"birth_location '{birth_location}' is not in the gazetteer")
+    return {"status": "success", "birth_location": birth_location, "location": _location_fields(place)}
+
+def _lean_references(fields: dict) -> dict:
+    """Identifiers plus the resource URIs a caching client resolves them against"""
+    return {
+        "resources": {field: resource_uri(kind, name) for field, (kind, name) in fields.items()},
+        "data_version": REFERENCE_DATA_VERSION
+    }
+
+def _distribution_response(start_date: str, end_date: str, time_resolution: str) -> dict:
+    if time_resolution not in DISTRIBUTION_SAMPLES:
+        raise ChartInputError("invalid_time_resolution", "time_resolution",
+                              f"time_resolution must be one of {list(DISTRIBUTION_SAMPLES)}")
+    start = date(*reversed(parse_birth_date(start_date, "start_date")))
+    end = date(*reversed(parse_birth_date(end_date, "end_date")))
+    if end < start:
+        raise ChartInputError("invalid_date_range", "end_date", "end_date must not be before start_date")
+    days = (end - start).days + 1
+    if days > MAX_DISTRIBUTION_DAYS:
+        raise ChartInputError("range_too_large", "end_date",
+                              f"range covers {days} days (max {MAX_DISTRIBUTION_DAYS})")
+    return {
+        "status": "success",
+        "start_date": start.isoformat(),
+        "end_date": end.isoformat(),
+        "time_resolution": time_resolution,
+        "days": days,
+        **chart_distribution(start, end, time_resolution)
+    }
+
+def _birth_windows_response(criteria: dict, limit: int) -> dict:
+    criteria = {field: name for field, name in criteria.items() if name is not None}
+    if not criteria:
+        raise ChartInputError("missing_criteria", "criteria", f"give at least one of {list(WINDOW_FIELDS)}")
+    if isinstance(limit, bool) or not isinstance(limit, int) or limit < 1:
+        raise ChartInputError("invalid_type", "limit", "limit must be a positive integer")
+    windows = find_birth_windows(criteria)
+    response = {
+        "status": "success",
+        "criteria": criteria,
+        "window_count": len(windows),
+        "hours_per_year": sum(hours for _, _, hours in windows),
+        "windows": [{"start": start, "end": end} for start, end, _ in windows[:limit]],
+        "truncated": len(windows) > limit
+    }
+    if windows:
+        start = windows[0][0]
+        response["example"] = {"birth_date": f"2000-{start[:5]}", "birth_time": start[6:]}
+    return response
+
+def _birth_time_sweep_response(birth_date: str, birth_location: str, start: str, end: str,
+                               fields: list = None) -> dict:
+    day, month, year = parse_birth_date(birth_date)
+    place = gazetteer.resolve(_require_text(birth_location, "birth_location"))
+    first, last = _clock_minutes(start, "start"), _clock_minutes(end, "end")
+    if last < first:
+        raise ChartInputError("invalid_time_range", "end", "end must not be before start")
+    if fields is None:
+        fields = SWEEP_FIELDS
+    else:
+        if not isinstance(fields, (list, tuple)) or not fields:
+            raise ChartInputError("invalid_type", "fields", "fields must be a non-empty list of field names")
+        for field in fields:
+            if field not in SWEEP_FIELDS:
+                raise ChartInputError("unsupported_field", "fields",
+                                      f"'{field}' does not vary with birth time; use {list(SWEEP_FIELDS)}")
+        fields = tuple(field for field in SWEEP_FIELDS if field in fields)
+    changes = sweep_birth_times(day, month, year, place, first, last)
+    intervals = _sweep_intervals(changes, last, fields)
+    chart = changes[0][1]
+    return {
+        "status": "success",
+        "birth_date": birth_date,
+        "location": _location_fields(place),
+        "start": f"{first // 60:02d}:{first % 60:02d}",
+        "end": f"{last // 60:02d}:{last % 60:02d}",
+        "sun_sign": chart.sun_sign,
+        "hd_profile": chart.hd_profile,
+        "interval_count": len(intervals),
+        "intervals": [{"start": lo, "end": hi, "minutes": minutes, **values}
+                      for lo, hi, minutes, values in intervals]
+    }
+
+def _team_palette(ranked: list) -> dict:
+    """Palette led by the team's two most common archetypes, with every member's accent blended"""
+    primary = ARCHETYPE_NAMES[ranked[0][0]]
+    secondary = ARCHETYPE_NAMES[ranked[1][0]] if len(ranked) > 1 else None
+    colors = {
+        "primary": ARCHETYPE_COLORS[primary]["primary"],
+        "secondary": ARCHETYPE_COLORS[secondary]["primary"] if secondary else ARCHETYPE_COLORS[primary]["secondary"],
+        "accent": to_hex(blend([(parse_hex(ARCHETYPE_COLORS[ARCHETYPE_NAMES[code]]["accent"]), count)
+                                for code, count in ranked])),
+        **{f"neutral_{name}": value for name, value in NEUTRAL_COLORS.items()}
+    }
+    return {"colors": colors, "analysis": analyze_palette(colors)}
+
+def _team_compatibility_response(records: list, include_matrix: bool = True) -> dict:
+    if not isinstance(records, list):
+        raise ChartInputError("invalid_type", "records", "records must be a list of birth records")
+    if len(records) < 2:
+        raise ChartInputError("team_too_small", "records", "a team needs at least 2 records")
+    if len(records) > MAX_TEAM_SIZE:
+        raise ChartInputError("team_too_large", "records",
+                              f"team of {len(records)} records is too large (max {MAX_TEAM_SIZE})")
+    births = []
+    for index, record in enumerate(records):
+        try:
+            births.append(_parse_record(record)[1])
+        except Exception as e:
+            # Matrix positions are record positions, so one bad record fails the team
+            return {**_error_response(e), "index": index}
+
+    charts = calculate_chart_array(births)
+    rows = compatibility_rows(charts)
+    size = len(rows)
+    members = []
+    pair_total = 0
+    for index, (record, chart, row) in enumerate(zip(records, charts, rows)):
+        others = row[:index] + b"\x00" + row[index + 1:]
+        best = max(others)
+        row_total = sum(others)
+        pair_total += row_total
+        members.append({
+            "index": index,
+            "name": record.get("name"),
+            "sun_sign": chart.sun_sign,
+            "moon_sign": chart.moon_sign,
+            "rising_sign": chart.rising_sign,
+            "hd_type": chart.hd_type,
+            "archetype": chart.archetype,
+            "average_compatibility": round(row_total / (size - 1), 1),
+            "best_match": {"index": others.index(best), "score": best}
+        })
+
+    ranked = sorted(Counter(charts.column("archetype")).items(), key=lambda item: (-item[1], item[0]))
+    response = {
+        "status": "success",
+        "size": size,
+        "points": COMPATIBILITY_POINTS,
+        "team_average": round(pair_total / (size * (size - 1)), 1),
+        "team_archetype": {
+            "primary": ARCHETYPE_NAMES[ranked[0][0]],
+            "secondary": ARCHETYPE_NAMES[ranked[1][0]] if len(ranked) > 1 else None,
+            "distribution": {ARCHETYPE_NAMES[code]: count for code, count in ranked}
+        },
+        "team_palette": _team_palette(ranked),
+        "members": members
+    }
+    if include_matrix:
+        response["matrix"] = [list(row) for row in rows]
+    return response
+
+def _birth_chart_response(context: ChartContext, lean: bool = False) -> dict:
+    sun_sign, moon_sign, rising_sign = context.sun_sign, context.moon_sign, context.rising_sign
+    if lean:
+        return {
+            "status": "success",
+            "location": _location_fields(context.place),
+            "birth_chart": {"sun_sign": sun_sign, "moon_sign": moon_sign, "rising_sign": rising_sign},
+            **_lean_references({"sun_sign": ("zodiac", sun_sign), "moon_sign": ("zodiac", moon_sign),
+                                "rising_sign": ("zodiac", rising_sign)})
+        }
+    return {
+        "status": "success",
+        "location": _location_fields(context.place),
+        "birth_chart": {
+            "sun_sign": sun_sign,
+            "sun_traits": ZODIAC_SIGNS[sun_sign],
+            "moon_sign": moon_sign,
+            "moon_traits": ZODIAC_SIGNS[moon_sign],
+            "rising_sign": rising_sign,
+            "rising_traits": ZODIAC_SIGNS[rising_sign]
+        }
+    }
+
+def _human_design_response(context: ChartContext, lean: bool = False) -> dict:
+    hd_type, hd_authority, hd_profile = context.hd_type, context.hd_authority, context.hd_profile
+    if lean:
+        return {
+            "status": "success",
+            "human_design": {"type": hd_type, "authority": hd_authority, "profile": hd_profile},
+            **_lean_references({"type": ("hd/type", hd_type), "authority": ("hd/authority", hd_authority),
+                                "profile": ("hd/profile", hd_profile)})
+        }
+    return {
+        "status": "success",
+        "human_design": {
+            "type": hd_type,
+            "type_details": HUMAN_DESIGN_TYPES[hd_type],
+            "authority": hd_authority,
+            "authority_description": HUMAN_DESIGN_AUTHORITIES[hd_authority],
+            "profile": hd_profile,
+            "profile_details": HUMAN_DESIGN_PROFILES[hd_profile]
+        }
+    }
+
+def _record_field(record: dict, field: str):
+    if not isinstance(record, dict) or field not in record:
+        raise ChartInputError("missing_field", field, f"record is missing '{field}'")
+    return record[field]
+
+def _parse_record(record: dict) -> tuple:
+    """((birth_date, birth_time, birth_location), (day, month, year, hour, minute, place)) for one batch record"""
+    inputs = tuple(_record_field(record, field) for field in ("birth_date", "birth_time", "birth_location"))
+    day, month, year = parse_birth_date(inputs[0])
+    hour, minute = parse_birth_time(inputs[1])
+    place = gazetteer.resolve(_require_text(inputs[2], "birth_location"))
+    return inputs, (day, month, year, hour, minute, place)
+
+def _run_batch(records: list, build, optional_fields: tuple = ()) -> dict:
+    """Parse every record, calculate all charts in one pass, then build each response.
+
+    optional_fields names extra per-record fields that must be a string or
+    null when present (e.g. business_name). A record that fails to parse or
+    build gets its own error entry; the rest of the batch is unaffected.
+    """
+    if len(records) > MAX_BATCH_SIZE:
+        return {"status": "error", "error": f"Batch too large: {len(records)} records (max {MAX_BATCH_SIZE})",
+                "error_code": "batch_too_large"}
+
+    results = [None] * len(records)
+    parsed = []
+    for index, record in enumerate(records):
+        try:
+            inputs, birth = _parse_record(record)
+            for field in optional_fields:
+                _optional_text(record.get(field), field)
+            parsed.append((index, inputs, birth))
+        except Exception as e:
+            results[index] = {"index": index, **_error_response(e)}
+
+    charts = calculate_chart_array([birth for _, _, birth in parsed])
+    for (index, inputs, birth), chart in zip(parsed, charts):
+        try:
+            context = ChartContext(*inputs, *birth[:5], chart, birth[5])
+            results[index] = {"index": index, **build(context)}
+        except Exception as e:
+            results[index] = {"index": index, **_error_response(e)}
+
+    failed = sum(1 for result in results if result["status"] == "error")
+    return {
+        "status": "success",
+        "count": len(records),
+        "succeeded": len(records) - failed,
+        "failed": failed,
+        "results": results
+    }
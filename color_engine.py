@@ -0,0 +1,148 @@
+"""
+Color science for brand palettes: WCAG 2.x contrast, tint/shade ramps and
+hue harmonies.
+
+Everything here is plain arithmetic on sRGB triples, with the sRGB-to-linear
+transfer curve tabulated once for all 256 channel values. chart_engine.py
+analyzes every archetype palette once at import, so the palette tools return
+the results without recomputing them; caller-supplied palettes go through the
+same analyze_palette().
+"""
+
+import colorsys
+import re
+
+_HEX_PATTERN = re.compile(r"#?([0-9A-Fa-f]{3}|[0-9A-Fa-f]{6})")
+
+# Mix amounts toward white (tints) and black (shades), lightest change first
+RAMP_STEPS = (0.2, 0.4, 0.6, 0.8)
+
+# Hue rotations in degrees for each harmony scheme
+HARMONY_ROTATIONS = {
+    "complementary": (180,),
+    "analogous": (-30, 30),
+    "triadic": (120, 240),
+    "split_complementary": (150, 210)
+}
+
+# WCAG 2.x contrast thresholds, strictest first
+WCAG_LEVELS = (("AAA", 7.0), ("AA", 4.5), ("AA Large", 3.0))
+
+_WHITE = (255, 255, 255)
+_BLACK = (0, 0, 0)
+
+# sRGB channel value -> linear light, per WCAG 2.x relative luminance
+_LINEAR = tuple(
+    value / 12.92 if value <= 0.04045 else ((value + 0.055) / 1.055) ** 2.4
+    for value in (channel / 255 for channel in range(256))
+)
+
+
+def parse_hex(text: str) -> tuple:
+    """(r, g, b) from "#RRGGBB", "RRGGBB" or "#RGB"; raises ValueError otherwise"""
+    match = _HEX_PATTERN.fullmatch(text.strip()) if isinstance(text, str) else None
+    if match is None:
+        raise ValueError(f"'{text}' is not a hex color like #1A2B3C")
+    digits = match.group(1)
+    if len(digits) == 3:
+        digits = "".join(char * 2 for char in digits)
+    return int(digits[0:2], 16), int(digits[2:4], 16), int(digits[4:6], 16)
+
+
+def to_hex(rgb: tuple) -> str:
+    return "#{:02X}{:02X}{:02X}".format(*rgb)
+
+
+def relative_luminance(rgb: tuple) -> float:
+    r, g, b = rgb
+    return 0.2126 * _LINEAR[r] + 0.7152 * _LINEAR[g] + 0.0722 * _LINEAR[b]
+
+
+def contrast_ratio(luminance_a: float, luminance_b: float) -> float:
+    lighter, darker = max(luminance_a, luminance_b), min(luminance_a, luminance_b)
+    return (lighter + 0.05) / (darker + 0.05)
+
+
+def wcag_level(ratio: float) -> str:
+    """Strictest WCAG 2.x level a contrast ratio meets, or "Fail" """
+    for level, threshold in WCAG_LEVELS:
+        if ratio >= threshold:
+            return level
+    return "Fail"
+
+
+def mix(rgb: tuple, target: tuple, amount: float) -> tuple:
+    """Blend `amount` (0-1) of `target` into `rgb`"""
+    return tuple(round(channel + (other - channel) * amount) for channel, other in zip(rgb, target))
+
+
+def _from_linear(value: float) -> int:
+    value = value * 12.92 if value <= 0.0031308 else 1.055 * value ** (1 / 2.4) - 0.055
+    return min(255, max(0, round(value * 255)))
+
+
+def blend(weighted_colors: list) -> tuple:
+    """Weighted average of [(rgb, weight), ...] taken in linear light, so mixes don't darken"""
+    total = sum(weight for _, weight in weighted_colors)
+    return tuple(
+        _from_linear(sum(_LINEAR[rgb[channel]] * weight for rgb, weight in weighted_colors) / total)
+        for channel in range(3)
+    )
+
+
+def ramps(rgb: tuple) -> dict:
+    return {
+        "tints": [to_hex(mix(rgb, _WHITE, amount)) for amount in RAMP_STEPS],
+        "shades": [to_hex(mix(rgb, _BLACK, amount)) for amount in RAMP_STEPS]
+    }
+
+
+def harmonies(rgb: tuple) -> dict:
+    """Hue-rotated companions of a color, keeping its lightness and saturation"""
+    hue, lightness, saturation = colorsys.rgb_to_hls(*(channel / 255 for channel in rgb))
+    return {
+        scheme: [
+            to_hex(tuple(round(channel * 255) for channel in
+                         colorsys.hls_to_rgb((hue + rotation / 360) % 1.0, lightness, saturation)))
+            for rotation in rotations
+        ]
+        for scheme, rotations in HARMONY_ROTATIONS.items()
+    }
+
+
+def analyze_palette(colors: dict) -> dict:
+    """Contrast matrix, accessible pairings, ramps and harmonies for {name: hex}.
+
+    Raises ValueError naming the first color that is not valid hex.
+    """
+    parsed = {}
+    for name, value in colors.items():
+        try:
+            parsed[name] = parse_hex(value)
+        except ValueError as e:
+            raise ValueError(f"{name}: {e}") from None
+    luminance = {name: relative_luminance(rgb) for name, rgb in parsed.items()}
+    names = list(parsed)
+    ratios = {a: {b: contrast_ratio(luminance[a], luminance[b]) for b in names} for a in names}
+    # Levels come from the unrounded ratio; WCAG thresholds are not rounded
+    pairs = sorted(
+        ({"colors": [a, b], "ratio": round(ratios[a][b], 2), "level": wcag_level(ratios[a][b])}
+         for i, a in enumerate(names) for b in names[i + 1:]),
+        key=lambda pair: -pair["ratio"]
+    )
+    return {
+        "colors": {
+            name: {
+                "hex": to_hex(rgb),
+                "rgb": "{}, {}, {}".format(*rgb),
+                "luminance": round(luminance[name], 4),
+                "text_color": "#000000" if contrast_ratio(luminance[name], 0.0) >= contrast_ratio(luminance[name], 1.0)
+                              else "#FFFFFF",
+                **ramps(rgb),
+                "harmonies": harmonies(rgb)
+            }
+            for name, rgb in parsed.items()
+        },
+        "contrast_matrix": {a: {b: round(ratio, 2) for b, ratio in row.items()} for a, row in ratios.items()},
+        "accessible_pairs": [pair for pair in pairs if pair["level"] != "Fail"]
+    }
@@ -0,0 +1,197 @@
+"""
+Compact precomputed Moon ephemeris plus the sidereal-time and Ascendant math.
+
+data/ephemeris.bin stores the Moon's geocentric ecliptic longitude (tropical,
+equinox of date) at 0h UT for every day from 1900-01-01 to 2100-12-31, as
+little-endian uint32 fixed-point turns (2**32 == 360 degrees), ~290 KB in all.
+It is memory-mapped on first use; a position at any instant is a quadratic
+interpolation over three consecutive days, accurate to a few arcminutes.
+
+The Moon is computed with Paul Schlyter's perturbed-orbit method ("How to
+compute planetary positions"), good to about 2 arcminutes. Sidereal time and
+obliquity are closed-form polynomials, cheaper than any table. Dates outside
+the table range fall back to computing the Moon directly.
+
+Regenerate the table with:  python ephemeris.py [output_path]
+"""
+
+import math
+import mmap
+import os
+import struct
+import sys
+import threading
+from datetime import date
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "ephemeris.bin")
+
+MAGIC = b"BRANDEPH"
+# magic, format version, ordinal of the first day, number of days
+_HEADER = struct.Struct("<8sIII")
+_HEADER_SIZE = 32
+FORMAT_VERSION = 1
+
+FIRST_DAY = date(1900, 1, 1)
+LAST_DAY = date(2100, 12, 31)
+# Interpolating day i needs days i+1 and i+2, so store two extra days
+DAY_COUNT = LAST_DAY.toordinal() - FIRST_DAY.toordinal() + 3
+
+_TURN = 2 ** 32
+_DEGREES_PER_UNIT = 360.0 / _TURN
+# Schlyter's day 0 is 2000 Jan 0.0 UT, i.e. 1999-12-31 00:00 UT
+_EPOCH_ORDINAL = date(1999, 12, 31).toordinal()
+
+_RAD = math.pi / 180.0
+
+
+def days_since_epoch(ordinal: int, ut_hours: float) -> float:
+    """Days since 2000 Jan 0.0 UT"""
+    return ordinal - _EPOCH_ORDINAL + ut_hours / 24.0
+
+
+def _kepler(mean_anomaly: float, eccentricity: float) -> float:
+    """Eccentric anomaly (radians) for a mean anomaly in radians"""
+    eccentric = mean_anomaly + eccentricity * math.sin(mean_anomaly) * (1.0 + eccentricity * math.cos(mean_anomaly))
+    for _ in range(5):
+        eccentric -= ((eccentric - eccentricity * math.sin(eccentric) - mean_anomaly)
+                      / (1.0 - eccentricity * math.cos(eccentric)))
+    return eccentric
+
+
+def moon_longitude(days: float) -> float:
+    """Geocentric ecliptic longitude of the Moon in degrees, `days` after 2000 Jan 0.0 UT"""
+    node = (125.1228 - 0.0529538083 * days) * _RAD
+    inclination = 5.1454 * _RAD
+    perigee = (318.0634 + 0.1643573223 * days) * _RAD
+    eccentricity = 0.054900
+    moon_anomaly = (115.3654 + 13.0649929509 * days) * _RAD
+    sun_anomaly = (356.0470 + 0.9856002585 * days) * _RAD
+    sun_perihelion = (282.9404 + 4.70935e-5 * days) * _RAD
+
+    eccentric = _kepler(moon_anomaly, eccentricity)
+    x = math.cos(eccentric) - eccentricity
+    y = math.sqrt(1.0 - eccentricity * eccentricity) * math.sin(eccentric)
+    argument = math.atan2(y, x) + perigee
+    longitude = math.atan2(
+        math.sin(node) * math.cos(argument) + math.cos(node) * math.sin(argument) * math.cos(inclination),
+        math.cos(node) * math.cos(argument) - math.sin(node) * math.sin(argument) * math.cos(inclination)
+    ) / _RAD
+
+    moon_mean = moon_anomaly + perigee + node
+    elongation = moon_mean - (sun_anomaly + sun_perihelion)
+    latitude_argument = moon_mean - node
+    longitude += (
+        -1.274 * math.sin(moon_anomaly - 2 * elongation)        # evection
+        + 0.658 * math.sin(2 * elongation)                        # variation
+        - 0.186 * math.sin(sun_anomaly)                           # yearly equation
+        - 0.059 * math.sin(2 * moon_anomaly - 2 * elongation)
+        - 0.057 * math.sin(moon_anomaly - 2 * elongation + sun_anomaly)
+        + 0.053 * math.sin(moon_anomaly + 2 * elongation)
+        + 0.046 * math.sin(2 * elongation - sun_anomaly)
+        + 0.041 * math.sin(moon_anomaly - sun_anomaly)
+        - 0.035 * math.sin(elongation)                            # parallactic equation
+        - 0.031 * math.sin(moon_anomaly + sun_anomaly)
+        - 0.015 * math.sin(2 * latitude_argument - 2 * elongation)
+        + 0.011 * math.sin(moon_anomaly - 4 * elongation)
+    )
+    return longitude % 360.0
+
+
+def sidereal_time(days: float) -> float:
+    """Greenwich mean sidereal time in degrees (IAU 1982, as in Meeus eq. 12.4)"""
+    t = days - 1.5  # days since J2000.0 (2000-01-01 12:00 UT)
+    centuries = t / 36525.0
+    return (280.46061837 + 360.98564736629 * t
+            + centuries * centuries * (0.000387933 - centuries / 38710000.0)) % 360.0
+
+
+def obliquity(days: float) -> float:
+    """Mean obliquity of the ecliptic in degrees"""
+    return 23.4393 - 3.563e-7 * days
+
+
+def ascendant(local_sidereal: float, latitude: float, obliquity_degrees: float) -> float:
+    """Ecliptic longitude (degrees) rising on the eastern horizon"""
+    theta = local_sidereal * _RAD
+    epsilon = obliquity_degrees * _RAD
+    phi = max(-89.9, min(89.9, latitude)) * _RAD
+    return math.atan2(
+        math.cos(theta),
+        -(math.sin(theta) * math.cos(epsilon) + math.tan(phi) * math.sin(epsilon))
+    ) / _RAD % 360.0
+
+
+def build_table(path: str = DEFAULT_PATH) -> int:
+    """Write the daily Moon table; returns the number of days stored"""
+    first = FIRST_DAY.toordinal()
+    values = bytearray()
+    for ordinal in range(first, first + DAY_COUNT):
+        units = int(round(moon_longitude(days_since_epoch(ordinal, 0.0)) / _DEGREES_PER_UNIT)) % _TURN
+        values += units.to_bytes(4, "little")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, first, DAY_COUNT).ljust(_HEADER_SIZE, b"\0"))
+        f.write(values)
+    return DAY_COUNT
+
+
+class Ephemeris:
+    """Memory-mapped daily Moon table with interpolated lookups.
+
+    Nothing is read until the first lookup; a missing or mismatched file makes
+    every lookup compute the Moon directly instead.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+        self._load_lock = threading.Lock()
+        self._loaded = False
+        self._moon = None
+        self._first = 0
+        self._count = 0
+
+    def _load(self) -> None:
+        with self._load_lock:
+            if self._loaded:
+                return
+            try:
+                with open(self.path, "rb") as f:
+                    data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                magic, version, first, count = _HEADER.unpack_from(data)
+                if (magic == MAGIC and version == FORMAT_VERSION and sys.byteorder == "little"
+                        and len(data) >= _HEADER_SIZE + count * 4):
+                    self._moon = memoryview(data)[_HEADER_SIZE:_HEADER_SIZE + count * 4].cast("I")
+                    self._first, self._count = first, count
+            except (OSError, ValueError, struct.error):
+                pass
+            self._loaded = True
+
+    def moon_longitude(self, ordinal: int, ut_hours: float) -> float:
+        """Moon longitude in degrees at `ut_hours` UT on the given proleptic-Gregorian day ordinal"""
+        if not self._loaded:
+            self._load()
+        whole, ut_hours = divmod(ut_hours, 24.0)
+        index = ordinal + int(whole) - self._first
+        if self._moon is None or not 0 <= index < self._count - 2:
+            return moon_longitude(days_since_epoch(ordinal, ut_hours + whole * 24.0))
+        moon = self._moon
+        m0 = moon[index]
+        step1 = (moon[index + 1] - m0) % _TURN
+        step2 = (moon[index + 2] - moon[index + 1]) % _TURN
+        fraction = ut_hours / 24.0
+        # Newton forward-difference quadratic through days i, i+1, i+2
+        units = m0 + fraction * step1 + fraction * (fraction - 1.0) * 0.5 * (step2 - step1)
+        return (units * _DEGREES_PER_UNIT) % 360.0
+
+    def stats(self) -> dict:
+        return {
+            "path": self.path,
+            "loaded": self._moon is not None,
+            "first_day": date.fromordinal(self._first).isoformat() if self._moon is not None else None,
+            "days": self._count
+        }
+
+
+if __name__ == "__main__":
+    target = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_PATH
+    print(f"Wrote {build_table(target)} days to {target}", file=sys.stderr)
@@ -0,0 +1,243 @@
+"""
+Offline birth-location resolver backed by the bundled GeoNames gazetteer.
+
+data/gazetteer.tsv holds one line per normalized place name, sorted by that
+name (see build_gazetteer.py). The file is memory-mapped on first use and
+searched by bisection over an array of line offsets, so an exact or prefix
+lookup touches a handful of pages and no network. A difflib fuzzy match over
+names sharing the query's first two characters catches typos, and resolved
+queries are kept in an LRU cache so repeat locations cost a dict lookup.
+
+Queries are free text such as "Buenos Aires, Argentina", "Austin, TX" or
+"tokyo"; the parts after the first comma (or a trailing country name) narrow
+the match to a country or US state. A query naming only a known country or
+state resolves to its largest place.
+"""
+
+import difflib
+import functools
+import mmap
+import os
+import threading
+import unicodedata
+from array import array
+from dataclasses import dataclass
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+DEFAULT_PATH = os.path.join(DATA_DIR, "gazetteer.tsv")
+
+PREFIX_SCAN_LIMIT = 256
+FUZZY_CUTOFF = 0.8
+
+
+def normalize(text: str) -> str:
+    """Accent-free, casefolded, punctuation-free form used for every key"""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    chars = [char if char.isalnum() else " " for char in decomposed if not unicodedata.combining(char)]
+    return " ".join("".join(chars).split())
+
+
+@dataclass(frozen=True)
+class Place:
+    """A resolved location; match is "exact", "alternate", "prefix", "fuzzy" or "region" """
+
+    name: str
+    country_code: str
+    admin1: str
+    latitude: float
+    longitude: float
+    timezone: str
+    population: int
+    match: str
+
+
+class Gazetteer:
+    """Memory-mapped, bisectable place-name index with an LRU cache of resolved queries.
+
+    Nothing is read until the first lookup; a missing data file makes every
+    lookup return None rather than failing the request.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH, cache_size: int = 4096):
+        self.path = path
+        self.qualifiers_path = os.path.join(os.path.dirname(path), "gazetteer_qualifiers.tsv")
+        self._load_lock = threading.Lock()
+        self._map = None
+        self._offsets = None
+        self._qualifiers = None
+        self.resolve = functools.lru_cache(maxsize=cache_size)(self._resolve)
+
+    # ------------------------------------------------------------------ loading
+
+    def _load(self) -> bool:
+        if self._offsets is not None:
+            return self._map is not None
+        with self._load_lock:
+            if self._offsets is None:
+                offsets = array("I")
+                try:
+                    with open(self.path, "rb") as f:
+                        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                except (OSError, ValueError):
+                    self._qualifiers = {}
+                    self._offsets = offsets
+                    return False
+                position, end = 0, len(data)
+                while position < end:
+                    newline = data.find(b"\n", position)
+                    if newline < 0:
+                        newline = end
+                    if data[position:position + 1] != b"#":
+                        offsets.append(position)
+                    position = newline + 1
+                self._map = data
+                self._qualifiers = self._read_qualifiers()
+                self._offsets = offsets
+        return self._map is not None
+
+    def _read_qualifiers(self) -> dict:
+        """normalized country / state name -> [(country_code, admin1, largest_place_key)]"""
+        qualifiers = {}
+        try:
+            with open(self.qualifiers_path, encoding="utf-8") as f:
+                for line in f:
+                    if not line.startswith("#"):
+                        key, country, admin1, largest = line.rstrip("\n").split("\t")
+                        qualifiers.setdefault(key, []).append((country, admin1, largest))
+        except OSError:
+            pass
+        return qualifiers
+
+    # ------------------------------------------------------------------ index
+
+    def _key_at(self, row: int) -> bytes:
+        start = self._offsets[row]
+        return self._map[start:self._map.find(b"\t", start)]
+
+    def _row(self, row: int) -> list:
+        start = self._offsets[row]
+        end = self._map.find(b"\n", start)
+        return self._map[start:end if end >= 0 else len(self._map)].decode("utf-8").split("\t")
+
+    def _lower_bound(self, key: bytes) -> int:
+        lo, hi = 0, len(self._offsets)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _exact(self, key: str) -> list:
+        encoded = key.encode("utf-8")
+        rows = []
+        row = self._lower_bound(encoded)
+        while row < len(self._offsets) and self._key_at(row) == encoded:
+            rows.append(self._row(row))
+            row += 1
+        return rows
+
+    def _prefix(self, key: str) -> list:
+        encoded = key.encode("utf-8")
+        rows = []
+        row = self._lower_bound(encoded)
+        while row < len(self._offsets) and len(rows) < PREFIX_SCAN_LIMIT:
+            if not self._key_at(row).startswith(encoded):
+                break
+            rows.append(self._row(row))
+            row += 1
+        return rows
+
+    def _fuzzy(self, key: str) -> list:
+        if len(key) < 4:
+            return []
+        encoded = key[:2].encode("utf-8")
+        start = self._lower_bound(encoded)
+        stop = (self._lower_bound(encoded[:-1] + bytes([encoded[-1] + 1]))
+                if encoded[-1] < 0xFF else len(self._offsets))
+        candidates = {
+            name for name in (self._key_at(row).decode("utf-8") for row in range(start, stop))
+            if abs(len(name) - len(key)) <= 3
+        }
+        matches = difflib.get_close_matches(key, candidates, n=1, cutoff=FUZZY_CUTOFF)
+        return self._exact(matches[0]) if matches else []
+
+    # ------------------------------------------------------------------ resolving
+
+    @staticmethod
+    def _allowed(rows: list, regions: list) -> list:
+        if regions is None:
+            return rows
+        return [row for row in rows if any(
+            row[3] == country and (not admin1 or row[4] == admin1) for country, admin1, _ in regions
+        )]
+
+    @staticmethod
+    def _best(rows: list, match: str):
+        if not rows:
+            return None
+        # Primary names beat alternate names, then the most populous place wins
+        row = min(rows, key=lambda row: (row[1], -int(row[8])))
+        if row[1] == "1" and match == "exact":
+            match = "alternate"
+        return Place(row[2], row[3], row[4], float(row[5]), float(row[6]), row[7], int(row[8]), match)
+
+    def _split_query(self, query: str) -> tuple:
+        """(place key, [(country, admin1, largest)] or None) for a free-text location"""
+        parts = [normalize(part) for part in query.split(",")]
+        parts = [part for part in parts if part]
+        if not parts:
+            return "", None
+        regions = None
+        for part in parts[1:]:
+            known = self._qualifiers.get(part)
+            if known:
+                regions = known if regions is None else [
+                    region for region in regions
+                    if any(region[0] == other[0] for other in known)
+                ] or regions
+        if len(parts) == 1 and parts[0] not in self._qualifiers:
+            # "Buenos Aires Argentina": peel a trailing country or state name off
+            words = parts[0].split()
+            for size in (3, 2, 1):
+                if len(words) > size and " ".join(words[-size:]) in self._qualifiers:
+                    tail = " ".join(words[-size:])
+                    if not self._exact(parts[0]):
+                        return " ".join(words[:-size]), self._qualifiers[tail]
+                    break
+        return parts[0], regions
+
+    def _resolve(self, query: str):
+        if not self._load():
+            return None
+        key, regions = self._split_query(query)
+        if not key:
+            return None
+        place = self._best(self._allowed(self._exact(key), regions), "exact")
+        if place is None and regions is None and key in self._qualifiers:
+            # A bare country or state name
+            regions = self._qualifiers[key]
+        elif place is None and len(key) >= 3:
+            place = self._best(self._allowed(self._prefix(key), regions), "prefix")
+            if place is None:
+                place = self._best(self._allowed(self._fuzzy(key), regions), "fuzzy")
+        if place is None and regions:
+            # Unknown town in a known country or state: use its largest place
+            largest = regions[0]
+            place = self._best(self._allowed(self._exact(largest[2]), [largest]), "region")
+        return place
+
+    def stats(self) -> dict:
+        info = self.resolve.cache_info()
+        lookups = info.hits + info.misses
+        return {
+            "path": self.path,
+            "loaded": self._map is not None,
+            "names": len(self._offsets) if self._offsets is not None else 0,
+            "cache_size": info.currsize,
+            "cache_max_entries": info.maxsize,
+            "hits": info.hits,
+            "misses": info.misses,
+            "hit_rate": round(info.hits / lookups, 4) if lookups else 0.0
+        }
@@ -0,0 +1,480 @@
+"""
+End-to-end load test for the Brand Identity Discovery MCP Server.
+
+Unlike benchmark.py, which calls the tool functions directly, this drives a
+real server process through a real MCP transport, so JSON-RPC framing,
+serialization, session handling, admission control and the executor are all
+on the measured path.
+
+The harness starts the server itself: over stdio each session is its own
+server subprocess (as with a desktop MCP client); over HTTP one serve.py
+instance (optionally multi-worker) is shared by every session. Many client
+sessions then call the five chart tools with a weighted mix, either at a
+fixed Poisson arrival rate (open loop) or back-to-back (closed loop, rate 0).
+Several rates can be given to step the load up and find the saturation point.
+
+Reported per step and per --interval: throughput, p50/p99 latency, error rate
+(by error_code) and the resident memory of the server processes.
+
+Usage:
+    python loadtest.py --transport http --sessions 32 --rate 100 200 400 800 --duration 20
+    python loadtest.py --transport http --workers 4 --rate 500 --duration 60 --save run.json
+    python loadtest.py --transport stdio --sessions 4 --rate 0 --duration 15
+    python loadtest.py --url http://10.0.0.5:8000/mcp --rate 300
+    python loadtest.py --mix generate_brand_identity=1 calculate_birth_chart=3
+"""
+
+import argparse
+import asyncio
+import calendar
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from contextlib import AsyncExitStack
+from pathlib import Path
+
+from fastmcp import Client
+from fastmcp.client.transports import StdioTransport, StreamableHttpTransport
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Relative call weights; roughly what a brand-kit client does per session
+DEFAULT_MIX = {
+    "generate_brand_identity": 4,
+    "get_color_palette_only": 2,
+    "get_typography_only": 2,
+    "calculate_birth_chart": 1,
+    "calculate_human_design": 1
+}
+
+LOCATIONS = [
+    "Buenos Aires, Argentina", "New York, USA", "London, UK", "Tokyo, Japan",
+    "Lagos, Nigeria", "Mumbai, India", "São Paulo, Brazil", "Sydney, Australia"
+]
+
+# A step is saturated once it completes less than this share of the offered rate
+SATURATION_THROUGHPUT = 0.9
+# ... or more than this share of its calls fail
+SATURATION_ERROR_RATE = 0.01
+
+
+def parse_mix(items: list) -> dict:
+    """{tool: weight} from ["tool=weight", ...]"""
+    mix = {}
+    for item in items:
+        name, _, weight = item.partition("=")
+        if name not in DEFAULT_MIX:
+            raise ValueError(f"unknown tool '{name}'; choose from {list(DEFAULT_MIX)}")
+        try:
+            mix[name] = float(weight) if weight else 1.0
+        except ValueError:
+            raise ValueError(f"weight for {name} must be a number, got '{weight}'") from None
+    if not any(weight > 0 for weight in mix.values()):
+        raise ValueError("the mix needs at least one tool with a positive weight")
+    return mix
+
+
+def make_birth_records(count: int, seed: int = 42) -> list:
+    """Birth records spread over 1940-2010 with uniform times of day"""
+    rng = random.Random(seed)
+    records = []
+    for n in range(count):
+        year = rng.randint(1940, 2010)
+        month = rng.randint(1, 12)
+        day = rng.randint(1, calendar.monthrange(year, month)[1])
+        records.append({
+            "birth_date": f"{year:04d}-{month:02d}-{day:02d}",
+            "birth_time": f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}",
+            "birth_location": rng.choice(LOCATIONS),
+            "business_name": f"Client {n}"
+        })
+    return records
+
+
+def _percentile(sorted_values: list, fraction: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _latency_summary(latencies: list) -> dict:
+    latencies = sorted(latencies)
+    if not latencies:
+        return {"p50_ms": None, "p99_ms": None}
+    return {
+        "p50_ms": round(_percentile(latencies, 0.50) * 1000, 2),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 2)
+    }
+
+# ============================================================================
+# SERVER PROCESSES
+# ============================================================================
+
+def process_tree_rss(root_pid: int, include_root: bool = True):
+    """Total resident memory in bytes of a process and its descendants (Linux /proc), or None"""
+    children = {}
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return None
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # Field 4 is the parent pid; the command name in field 2 may contain spaces
+                parent = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(parent, []).append(int(entry))
+
+    pids = [root_pid] if include_root else []
+    stack = list(children.get(root_pid, ()))
+    while stack:
+        pid = stack.pop()
+        pids.append(pid)
+        stack.extend(children.get(pid, ()))
+
+    total = 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1]) * 1024
+                        break
+        except OSError:
+            continue
+    return total
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_http_server(workers: int, port: int, timeout: float = 60.0) -> subprocess.Popen:
+    """Launch serve.py and wait until it accepts connections"""
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(HERE, "serve.py"), "--workers", str(workers), "--port", str(port)],
+        cwd=HERE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"serve.py exited with {process.returncode} during startup")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"serve.py did not accept connections on port {port} within {timeout:.0f}s")
+
+
+def make_transport(transport: str, url: str = None):
+    if transport == "stdio":
+        # Server stderr (startup banner, logs) would interleave with the report
+        return StdioTransport(sys.executable, ["-c", "import server; server.mcp.run()"], cwd=HERE,
+                              env=dict(os.environ), log_file=Path(os.devnull))
+    return StreamableHttpTransport(url)
+
+# ============================================================================
+# LOAD GENERATION
+# ============================================================================
+
+class Recorder:
+    """Outcomes of every call, bucketed into the current reporting interval"""
+
+    def __init__(self):
+        self.window = self._empty()
+        self.step = self._empty()
+        self.in_flight = 0
+        self.dropped = 0
+
+    @staticmethod
+    def _empty() -> dict:
+        return {"latencies": [], "errors": {}, "tools": {}}
+
+    def record(self, tool: str, elapsed: float, error: str = None) -> None:
+        for bucket in (self.window, self.step):
+            bucket["latencies"].append(elapsed)
+            calls = bucket["tools"].setdefault(tool, [])
+            calls.append(elapsed)
+            if error is not None:
+                bucket["errors"][error] = bucket["errors"].get(error, 0) + 1
+
+    def take_window(self) -> dict:
+        window, self.window = self.window, self._empty()
+        return window
+
+    def take_step(self) -> dict:
+        step, self.step = self.step, self._empty()
+        self.window = self._empty()
+        dropped, self.dropped = self.dropped, 0
+        step["dropped"] = dropped
+        return step
+
+
+def _error_of(result) -> str:
+    """error_code of a tool result, or None when the call succeeded"""
+    if result.is_error:
+        return "tool_error"
+    data = result.structured_content
+    if isinstance(data, dict) and "result" in data and len(data) == 1:
+        data = data["result"]
+    if isinstance(data, dict) and data.get("status") == "error":
+        return data.get("error_code", "error")
+    return None
+
+
+async def call_tool(client: Client, recorder: Recorder, tool: str, arguments: dict, timeout: float) -> None:
+    recorder.in_flight += 1
+    started = time.perf_counter()
+    error = None
+    try:
+        result = await client.call_tool(tool, arguments, raise_on_error=False, timeout=timeout)
+        error = _error_of(result)
+    except Exception as e:
+        error = type(e).__name__
+    finally:
+        recorder.in_flight -= 1
+        recorder.record(tool, time.perf_counter() - started, error)
+
+
+def _arguments(tool: str, record: dict) -> dict:
+    arguments = {key: record[key] for key in ("birth_date", "birth_time", "birth_location")}
+    if tool == "generate_brand_identity":
+        arguments["business_name"] = record["business_name"]
+    return arguments
+
+
+async def run_step(clients: list, recorder: Recorder, rate: float, duration: float, mix: dict, records: list,
+                   rng: random.Random, max_outstanding: int, timeout: float) -> None:
+    """Offer `rate` calls/sec (Poisson arrivals) for `duration` seconds; rate 0 runs each session back-to-back"""
+    tools, weights = list(mix), list(mix.values())
+    deadline = time.perf_counter() + duration
+
+    def next_call():
+        tool = rng.choices(tools, weights)[0]
+        return tool, _arguments(tool, rng.choice(records))
+
+    if rate <= 0:
+        async def session_loop(client):
+            while time.perf_counter() < deadline:
+                await call_tool(client, recorder, *next_call(), timeout)
+
+        await asyncio.gather(*(session_loop(client) for client in clients))
+        return
+
+    tasks = set()
+    arrival = time.perf_counter()
+    n = 0
+    while True:
+        arrival += rng.expovariate(rate)
+        if arrival >= deadline:
+            break
+        delay = arrival - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if recorder.in_flight >= max_outstanding:
+            # The server is not keeping up; count the arrival instead of queueing it without bound
+            recorder.dropped += 1
+            continue
+        task = asyncio.create_task(call_tool(clients[n % len(clients)], recorder, *next_call(), timeout))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        n += 1
+    if tasks:
+        await asyncio.gather(*tasks)
+
+
+def _step_report(rate: float, step: dict, elapsed: float, rss_peak) -> dict:
+    calls = len(step["latencies"])
+    errors = sum(step["errors"].values())
+    return {
+        "offered_rate": rate,
+        "calls": calls,
+        "dropped": step["dropped"],
+        "throughput": round(calls / elapsed, 1) if elapsed > 0 else 0.0,
+        **_latency_summary(step["latencies"]),
+        "error_rate": round(errors / calls, 4) if calls else 0.0,
+        "errors": step["errors"],
+        "rss_peak_mb": round(rss_peak / 2**20, 1) if rss_peak is not None else None,
+        "tools": {
+            tool: {"calls": len(latencies), **_latency_summary(latencies)}
+            for tool, latencies in sorted(step["tools"].items())
+        }
+    }
+
+
+def _saturated(step: dict) -> bool:
+    offered = step["offered_rate"]
+    if step["error_rate"] > SATURATION_ERROR_RATE or step["dropped"]:
+        return True
+    return offered > 0 and step["throughput"] < offered * SATURATION_THROUGHPUT
+
+
+async def run_load_test(transport: str, sessions: int, rates: list, duration: float, mix: dict, records: list,
+                        url: str = None, rss_pid: int = None, interval: float = 1.0, seed: int = 42,
+                        max_outstanding: int = 1000, timeout: float = 30.0, progress=None) -> dict:
+    """Open `sessions` clients, run one step per rate, and sample the timeline every `interval` seconds"""
+    rng = random.Random(seed)
+    recorder = Recorder()
+    timeline = []
+    steps = []
+
+    def rss():
+        # Over stdio the servers are this process's children; over HTTP, the serve.py tree
+        if transport == "stdio":
+            return process_tree_rss(os.getpid(), include_root=False)
+        return process_tree_rss(rss_pid) if rss_pid is not None else None
+
+    async with AsyncExitStack() as stack:
+        clients = [await stack.enter_async_context(Client(make_transport(transport, url), timeout=timeout))
+                   for _ in range(sessions)]
+        started = time.perf_counter()
+        for rate in rates:
+            step_started = time.perf_counter()
+            rss_peak = None
+            sampling = True
+
+            async def sample():
+                nonlocal rss_peak
+                last = time.perf_counter()
+                while sampling:
+                    await asyncio.sleep(interval)
+                    now = time.perf_counter()
+                    window = recorder.take_window()
+                    resident = rss()
+                    if resident is not None:
+                        rss_peak = max(rss_peak or 0, resident)
+                    calls = len(window["latencies"])
+                    row = {
+                        "t": round(now - started, 2),
+                        "offered_rate": rate,
+                        "throughput": round(calls / (now - last), 1),
+                        **_latency_summary(window["latencies"]),
+                        "error_rate": round(sum(window["errors"].values()) / calls, 4) if calls else 0.0,
+                        "in_flight": recorder.in_flight,
+                        "rss_mb": round(resident / 2**20, 1) if resident is not None else None
+                    }
+                    timeline.append(row)
+                    if progress is not None:
+                        progress(row)
+                    last = now
+
+            sampler = asyncio.create_task(sample())
+            await run_step(clients, recorder, rate, duration, mix, records, rng, max_outstanding, timeout)
+            sampling = False
+            await sampler
+            elapsed = time.perf_counter() - step_started
+            steps.append(_step_report(rate, recorder.take_step(), elapsed, rss_peak))
+
+    saturation = next((step["offered_rate"] for step in steps if _saturated(step)), None)
+    return {
+        "meta": {
+            "transport": transport,
+            "sessions": sessions,
+            "duration_per_step": duration,
+            "mix": mix,
+            "records": len(records),
+            "seed": seed,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z")
+        },
+        "steps": steps,
+        "saturated_at": saturation,
+        "timeline": timeline
+    }
+
+
+def format_row(row: dict) -> str:
+    p50 = "-" if row["p50_ms"] is None else f"{row['p50_ms']:.1f}"
+    p99 = "-" if row["p99_ms"] is None else f"{row['p99_ms']:.1f}"
+    rss = "-" if row["rss_mb"] is None else f"{row['rss_mb']:.0f}"
+    return (f"{row['t']:>7.1f}s {row['offered_rate']:>8g} {row['throughput']:>10,.1f} {p50:>9} {p99:>9} "
+            f"{row['error_rate']:>8.2%} {row['in_flight']:>9} {rss:>8}")
+
+
+def format_steps(report: dict) -> str:
+    lines = [f"{'offered/s':>10} {'calls/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'errors':>8} {'dropped':>8} "
+             f"{'RSS MB':>8}"]
+    for step in report["steps"]:
+        offered = "closed" if step["offered_rate"] <= 0 else f"{step['offered_rate']:g}"
+        p50 = "-" if step["p50_ms"] is None else f"{step['p50_ms']:.1f}"
+        p99 = "-" if step["p99_ms"] is None else f"{step['p99_ms']:.1f}"
+        rss = "-" if step["rss_peak_mb"] is None else f"{step['rss_peak_mb']:.0f}"
+        lines.append(f"{offered:>10} {step['throughput']:>10,.1f} {p50:>9} {p99:>9} {step['error_rate']:>8.2%} "
+                     f"{step['dropped']:>8} {rss:>8}")
+        if step["errors"]:
+            lines.append("           errors: " + ", ".join(f"{code} {count}" for code, count in step["errors"].items()))
+    if report["saturated_at"] is not None:
+        lines.append(f"\nSaturated at {report['saturated_at']:g} calls/sec offered")
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Load-test the brand identity server over a real MCP transport")
+    parser.add_argument("--transport", choices=("http", "stdio"), default="http")
+    parser.add_argument("--url", help="load an already-running HTTP server instead of starting one")
+    parser.add_argument("--workers", type=int, default=1, help="serve.py worker processes for --transport http")
+    parser.add_argument("--sessions", type=int, help="concurrent client sessions (default: 32 http, 4 stdio)")
+    parser.add_argument("--rate", type=float, nargs="+", default=[0.0],
+                        help="offered calls/sec, one step per value (0 = closed loop)")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds per step")
+    parser.add_argument("--mix", nargs="+", metavar="TOOL=WEIGHT", help="tool call weights (default: a brand-kit mix)")
+    parser.add_argument("--records", type=int, default=2000, help="distinct birth records to draw from")
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between timeline samples")
+    parser.add_argument("--max-outstanding", type=int, default=1000,
+                        help="in-flight calls beyond which open-loop arrivals are dropped")
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-call timeout in seconds")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--save", metavar="PATH", help="write the full report (with timeline) as JSON")
+    parser.add_argument("--quiet", action="store_true", help="only print the per-step summary")
+    args = parser.parse_args(argv)
+
+    transport = "http" if args.url else args.transport
+    sessions = args.sessions or (4 if transport == "stdio" else 32)
+    try:
+        mix = parse_mix(args.mix) if args.mix else dict(DEFAULT_MIX)
+    except ValueError as e:
+        parser.error(str(e))
+    records = make_birth_records(args.records, args.seed)
+
+    server_process = None
+    url = args.url
+    if transport == "http" and url is None:
+        port = _free_port()
+        server_process = start_http_server(args.workers, port)
+        url = f"http://127.0.0.1:{port}/mcp"
+
+    if not args.quiet:
+        print(f"{'time':>8} {'offered':>8} {'calls/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'errors':>8} "
+              f"{'in flight':>9} {'RSS MB':>8}")
+    try:
+        report = asyncio.run(run_load_test(
+            transport, sessions, args.rate, args.duration, mix, records, url=url,
+            rss_pid=server_process.pid if server_process else None, interval=args.interval, seed=args.seed,
+            max_outstanding=args.max_outstanding, timeout=args.timeout,
+            progress=None if args.quiet else lambda row: print(format_row(row), flush=True)
+        ))
+    finally:
+        if server_process is not None:
+            server_process.terminate()
+            server_process.wait(timeout=15)
+
+    print()
+    print(format_steps(report))
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved report to {args.save}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
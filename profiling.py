@@ -0,0 +1,323 @@
+"""
+Opt-in profiling of live tool calls.
+
+A configurable fraction of calls to each tool runs under cProfile, and
+optionally tracemalloc. Each tool's samples are merged into one profile.
+Code on the request path can mark named stages with span(); their timings are
+kept for sampled calls only, so an unsampled call pays one thread-local read
+per span.
+
+Profiles are written out as collapsed stacks, one "frame;frame;frame weight"
+line per stack with weights in microseconds. That is the input format of
+flamegraph.pl, inferno and speedscope. cProfile records caller/callee edges
+rather than whole stacks, so each callee's time is split across its callers in
+proportion to the time each caller spent in it. Profiles can also be written
+as pstats files for snakeviz or the pstats module.
+
+Only one sampled call per process is profiled at a time; a call that would
+be sampled while another profile is running runs unprofiled instead.
+tracemalloc is process-wide, so memory figures also count allocations made by
+concurrent unsampled calls. When tool bodies run in worker processes, the
+parent decides which calls are sampled, each worker profiles its call with
+profile_call(), and the parent merges the returned sample with record().
+"""
+
+import cProfile
+import os
+import pstats
+import random
+import tempfile
+import threading
+import time
+import tracemalloc
+from contextlib import nullcontext
+
+PROFILE_FORMATS = ("collapsed", "pstats")
+
+# Deepest call stack written to collapsed output, and the smallest stack kept (microseconds)
+MAX_STACK_DEPTH = 64
+MIN_STACK_WEIGHT_US = 1
+
+_active = threading.local()
+_NO_SPAN = nullcontext()
+
+
+class _SampledCall:
+    __slots__ = ("path", "spans")
+
+    def __init__(self):
+        self.path = ""
+        self.spans = []
+
+
+class _Span:
+    __slots__ = ("call", "name", "outer", "started")
+
+    def __init__(self, call: _SampledCall, name: str):
+        self.call = call
+        self.name = name
+
+    def __enter__(self):
+        self.outer = self.call.path
+        self.call.path = f"{self.outer}/{self.name}" if self.outer else self.name
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.call.spans.append((self.call.path, time.perf_counter() - self.started))
+        self.call.path = self.outer
+
+
+def span(name: str):
+    """Context manager timing one stage of a sampled call; nested spans are recorded as "outer/inner" """
+    call = getattr(_active, "call", None)
+    return _NO_SPAN if call is None else _Span(call, name)
+
+
+class _StatsTable:
+    """A raw pstats table in the shape pstats.Stats loads from a profiler"""
+
+    def __init__(self, stats: dict):
+        self.stats = stats
+
+    def create_stats(self) -> None:
+        pass
+
+
+class _Capture:
+    """Context manager profiling its body; afterwards .sample is a picklable
+    (pstats table, seconds, spans, (retained, peak) bytes or None) tuple"""
+
+    def __init__(self, memory: bool):
+        self.memory = memory
+        self.sample = None
+
+    def __enter__(self):
+        self.started_tracing = self.memory and not tracemalloc.is_tracing()
+        if self.started_tracing:
+            tracemalloc.start()
+        if self.memory:
+            tracemalloc.reset_peak()
+            self.baseline = tracemalloc.get_traced_memory()[0]
+        self.call = _active.call = _SampledCall()
+        self.profile = cProfile.Profile()
+        self.started = time.perf_counter()
+        self.profile.enable()
+
+    def __exit__(self, *exc):
+        self.profile.disable()
+        elapsed = time.perf_counter() - self.started
+        _active.call = None
+        allocation = None
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            allocation = (max(current - self.baseline, 0), max(peak - self.baseline, 0))
+            if self.started_tracing:
+                tracemalloc.stop()
+        self.profile.create_stats()
+        self.sample = (self.profile.stats, elapsed, self.call.spans, allocation)
+
+
+def profile_call(fn, args: tuple, kwargs: dict, memory: bool = False) -> tuple:
+    """(result, sample) of fn(*args, **kwargs) run under cProfile; the sample
+    pickles, so a worker process can return it for ToolProfiler.record()"""
+    capture = _Capture(memory)
+    with capture:
+        result = fn(*args, **kwargs)
+    return result, capture.sample
+
+
+def _frame_label(func: tuple) -> str:
+    filename, line, name = func
+    if filename == "~":
+        label = name
+    else:
+        label = f"{name} ({os.path.basename(filename)}:{line})"
+    # ";" separates frames in collapsed-stack lines
+    return label.replace(";", ":")
+
+
+def collapsed_stacks(stats: dict, root: str) -> dict:
+    """{"root;frame;...": microseconds} from a pstats.Stats.stats table"""
+    children = {}
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller, edge in callers.items():
+            children.setdefault(caller, []).append((func, edge[3]))
+    # The profiler's own disable() call is a root too; leave it out
+    roots = [func for func, entry in stats.items() if not entry[4] and "_lsprof.Profiler" not in func[2]]
+    stacks = {}
+
+    def walk(func, path, on_path, scale, depth):
+        frame = f"{path};{_frame_label(func)}"
+        weight = round(stats[func][2] * scale * 1e6)
+        if weight:
+            stacks[frame] = stacks.get(frame, 0) + weight
+        if depth >= MAX_STACK_DEPTH:
+            return
+        for child, edge_time in children.get(func, ()):
+            total = stats[child][3]
+            if child in on_path or total <= 0:
+                continue
+            child_scale = scale * min(edge_time / total, 1.0)
+            if child_scale * total * 1e6 >= MIN_STACK_WEIGHT_US:
+                walk(child, frame, on_path | {child}, child_scale, depth + 1)
+
+    for func in roots:
+        walk(func, root, frozenset((func,)), 1.0, 1)
+    return stacks
+
+
+class ToolProfiler:
+    """Samples tool calls under cProfile/tracemalloc and aggregates the results per tool"""
+
+    def __init__(self, sample_rate: float = 0.0, memory: bool = False, directory: str = None):
+        self.sample_rate = sample_rate
+        self.tool_rates = {}
+        self.memory = memory
+        self.directory = directory or os.path.join(tempfile.gettempdir(), "brand_identity_profiles")
+        self.skipped = 0
+        self._lock = threading.Lock()
+        self._running = threading.Lock()
+        self._tools = {}
+
+    def rate(self, name: str) -> float:
+        return self.tool_rates.get(name, self.sample_rate)
+
+    def configure(self, sample_rate: float, tools: list = None, memory: bool = None) -> None:
+        """Set the sampled fraction of calls for the given tools, or the default for all of them"""
+        with self._lock:
+            if tools is None:
+                self.sample_rate = sample_rate
+                self.tool_rates.clear()
+            else:
+                self.tool_rates.update(dict.fromkeys(tools, sample_rate))
+            if memory is not None:
+                self.memory = memory
+
+    def sampled(self, name: str) -> bool:
+        """Whether this call of the tool should be profiled"""
+        rate = self.tool_rates.get(name, self.sample_rate)
+        return rate > 0 and (rate >= 1 or random.random() < rate)
+
+    def call(self, name: str, fn, args: tuple, kwargs: dict):
+        """Run fn(*args, **kwargs), profiling it if this call is sampled"""
+        if not self.sampled(name):
+            return fn(*args, **kwargs)
+        if not self._running.acquire(blocking=False):
+            with self._lock:
+                self.skipped += 1
+            return fn(*args, **kwargs)
+        try:
+            return self._profiled(name, fn, args, kwargs)
+        finally:
+            self._running.release()
+
+    def _profiled(self, name: str, fn, args: tuple, kwargs: dict):
+        capture = _Capture(self.memory)
+        try:
+            with capture:
+                return fn(*args, **kwargs)
+        finally:
+            self.record(name, capture.sample)
+
+    def record(self, name: str, sample: tuple) -> None:
+        """Merge one sample, from this process or a worker's profile_call(), into the tool's profile"""
+        table, elapsed, spans, allocation = sample
+        with self._lock:
+            entry = self._tools.get(name)
+            if entry is None:
+                entry = self._tools[name] = {
+                    "stats": pstats.Stats(_StatsTable(table)),
+                    "samples": 0,
+                    "seconds": 0.0,
+                    "stages": {},
+                    "retained_bytes": 0,
+                    "peak_bytes": 0,
+                    "memory_samples": 0
+                }
+            else:
+                entry["stats"].add(_StatsTable(table))
+            entry["samples"] += 1
+            entry["seconds"] += elapsed
+            for path, seconds in spans:
+                stage = entry["stages"].setdefault(path, [0, 0.0, 0.0])
+                stage[0] += 1
+                stage[1] += seconds
+                stage[2] = max(stage[2], seconds)
+            if allocation is not None:
+                entry["memory_samples"] += 1
+                entry["retained_bytes"] += allocation[0]
+                entry["peak_bytes"] = max(entry["peak_bytes"], allocation[1])
+
+    def reset(self) -> None:
+        with self._lock:
+            self._tools.clear()
+            self.skipped = 0
+
+    def config(self) -> dict:
+        return {
+            "sample_rate": self.sample_rate,
+            "tool_rates": dict(self.tool_rates),
+            "memory": self.memory,
+            "directory": self.directory
+        }
+
+    def summary(self, top: int = 5) -> dict:
+        """Samples, stage timings, memory and hottest functions per profiled tool"""
+        with self._lock:
+            tools = {}
+            for name, entry in self._tools.items():
+                stats = entry["stats"].stats
+                hottest = sorted(stats.items(), key=lambda item: -item[1][2])[:top]
+                tools[name] = {
+                    "samples": entry["samples"],
+                    "mean_ms": round(entry["seconds"] / entry["samples"] * 1000, 4),
+                    "stages": {
+                        path: {
+                            "count": count,
+                            "mean_ms": round(total / count * 1000, 4),
+                            "max_ms": round(longest * 1000, 4)
+                        }
+                        for path, (count, total, longest) in sorted(entry["stages"].items())
+                    },
+                    "top_functions": [
+                        {"function": _frame_label(func), "calls": calls,
+                         "self_ms": round(self_time * 1000, 4), "cumulative_ms": round(total * 1000, 4)}
+                        for func, (_, calls, self_time, total, _) in hottest
+                    ]
+                }
+                if entry["memory_samples"]:
+                    tools[name]["memory"] = {
+                        "mean_retained_bytes": entry["retained_bytes"] // entry["memory_samples"],
+                        "max_peak_bytes": entry["peak_bytes"]
+                    }
+            return {**self.config(), "skipped_while_busy": self.skipped, "tools": tools}
+
+    def dump(self, file_name: str, output_format: str = "collapsed") -> list:
+        """Write the aggregated profiles under self.directory; returns the paths written"""
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock:
+            entries = {name: entry["stats"] for name, entry in self._tools.items()}
+            if output_format == "pstats":
+                paths = []
+                for name, stats in sorted(entries.items()):
+                    path = os.path.join(self.directory, f"{file_name}.{name}.prof")
+                    stats.dump_stats(path)
+                    paths.append(path)
+                return paths
+            stacks = {}
+            for name, stats in sorted(entries.items()):
+                stacks.update(collapsed_stacks(stats.stats, name))
+        path = os.path.join(self.directory, f"{file_name}.folded")
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, weight in sorted(stacks.items()):
+                f.write(f"{stack} {weight}\n")
+        return [path]
+
+
+def open_tool_profiler() -> ToolProfiler:
+    """Profiler configured from BRAND_PROFILE_RATE, BRAND_PROFILE_MEMORY and BRAND_PROFILE_DIR"""
+    return ToolProfiler(
+        sample_rate=float(os.environ.get("BRAND_PROFILE_RATE", "0")),
+        memory=os.environ.get("BRAND_PROFILE_MEMORY", "0").lower() in ("1", "true", "yes"),
+        directory=os.environ.get("BRAND_PROFILE_DIR")
+    )
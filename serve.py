@@ -0,0 +1,112 @@
+"""
+Multi-worker HTTP serving mode for the Brand Identity Discovery MCP Server.
+
+The parent process binds the listening socket and creates the shared chart
+cache file, then starts N worker processes. Each worker imports server.py,
+maps the same cache file (via BRAND_SHARED_CACHE_PATH), and serves the MCP
+streamable-HTTP app on the inherited socket. The kernel spreads incoming
+connections across workers, so throughput scales with cores, and a chart
+computed by any worker is a cache hit in all of them.
+
+Workers run the MCP app in stateless HTTP mode, since consecutive requests
+from one client may land on different workers. Dead workers are restarted.
+
+Usage:
+    python serve.py --workers 4 --port 8000
+    python serve.py --workers 8 --shared-cache /dev/shm/brand_charts.bin --cache-slots 262144
+"""
+
+import argparse
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import tempfile
+import time
+
+DEFAULT_CACHE_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+
+
+def _worker(sock: socket.socket, path: str, log_level: str) -> None:
+    """Worker process entry point: serve the MCP HTTP app on the shared socket"""
+    import uvicorn
+
+    import server
+
+    app = server.mcp.http_app(path=path, stateless_http=True)
+    config = uvicorn.Config(app, log_level=log_level, lifespan="on")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def _bind(host: str, port: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Serve the brand identity MCP server with multiple workers")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--path", default="/mcp", help="MCP endpoint path")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--shared-cache", default=os.path.join(DEFAULT_CACHE_DIR, "brand_identity_charts.bin"),
+                        help="file backing the cross-worker chart cache (tmpfs recommended)")
+    parser.add_argument("--cache-slots", type=int, default=65536, help="entries in the shared cache")
+    parser.add_argument("--log-level", default="warning")
+    args = parser.parse_args(argv)
+
+    os.environ["BRAND_SHARED_CACHE_PATH"] = args.shared_cache
+    os.environ["BRAND_SHARED_CACHE_SLOTS"] = str(args.cache_slots)
+
+    # Create (or reset) the cache file once, before any worker maps it; the
+    # engine alone is enough, so the parent never imports the MCP framework
+    import chart_engine
+    if chart_engine.shared_chart_cache is not None:
+        chart_engine.shared_chart_cache.close()
+
+    sock = _bind(args.host, args.port)
+    context = multiprocessing.get_context("spawn")
+    workers = {}
+    stopping = False
+
+    def start_worker(slot: int) -> None:
+        process = context.Process(target=_worker, args=(sock, args.path, args.log_level),
+                                  name=f"brand-worker-{slot}", daemon=True)
+        process.start()
+        workers[slot] = process
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    for slot in range(args.workers):
+        start_worker(slot)
+    print(f"Serving on http://{args.host}:{args.port}{args.path} with {args.workers} workers "
+          f"(shared cache: {args.shared_cache})", file=sys.stderr)
+
+    while not stopping:
+        time.sleep(0.5)
+        for slot, process in list(workers.items()):
+            if not process.is_alive() and not stopping:
+                print(f"Worker {process.name} exited with {process.exitcode}; restarting", file=sys.stderr)
+                start_worker(slot)
+
+    for process in workers.values():
+        process.terminate()
+    for process in workers.values():
+        process.join(timeout=10)
+    sock.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,327 +3,580 @@ Brand Identity Discovery MCP Server - FULL VERSION
 
 Complete brand identity generation using astrology, Human Design, and brand strategy.
 Optimized for FastMCP Cloud deployment.
+
+This module is the MCP adapter: tool definitions, metrics and admission
+control. The frameworks and chart calculations live in chart_engine.py,
+which imports nothing heavier than the standard library.
 """
 
+import time
+
+# Taken before the framework import so cold-start cost shows up in server_metrics
+_IMPORT_STARTED = time.perf_counter()
+
 from fastmcp import FastMCP
-from datetime import datetime
+from fastmcp.exceptions import ResourceError
+import asyncio
+from bisect import bisect_left
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import functools
+import inspect
 import json
+import multiprocessing
+import os
+import threading
+
+from brand_assets import _assets_batch_response, _assets_response, _select_assets, asset_cache
+from brand_store import _list_response, _lookup_response, open_brand_store, variant_key
+from chart_engine import (
+    ChartInputError, _birth_chart_response, _birth_time_sweep_response, _birth_windows_response,
+    _brand_identity_response,
+    _check_output_format, _color_palette_response, _distribution_response, _error_response,
+    _human_design_response, _location_response, _optional_text, _palette_analysis_response, _run_batch,
+    _select_sections, _team_compatibility_response, _typography_response, chart_cache, gazetteer, get_chart_context,
+    reference_catalog, reference_resource, set_span_hook, shared_chart_cache
+)
+from profiling import PROFILE_FORMATS, open_tool_profiler, profile_call, span
+# Re-exported so existing `from server import ...` callers keep working
+from chart_engine import (  # noqa: F401
+    ARCHETYPE_COLORS, ARCHETYPE_FONTS, BRAND_ARCHETYPES, HUMAN_DESIGN_AUTHORITIES,
+    HUMAN_DESIGN_PROFILES, HUMAN_DESIGN_TYPES, ZODIAC_SIGNS, ChartContext, build_chart_context,
+    calculate_ascendant_sign, calculate_chart, calculate_charts, calculate_human_design_authority,
+    calculate_human_design_profile, calculate_human_design_type, calculate_moon_sign,
+    calculate_rising_sign, calculate_zodiac_sign, determine_brand_archetype, hex_to_rgb
+)
 
 # Create FastMCP server
 mcp = FastMCP("Brand Identity Discovery")
 
 # ============================================================================
-# DATA - All brand frameworks
+# METRICS - per-tool call counts, latency histograms, errors and concurrency
 # ============================================================================
 
-ZODIAC_SIGNS = {
-    "Aries": {
-        "element": "Fire",
-        "modality": "Cardinal",
-        "keywords": ["pioneering", "bold", "energetic", "competitive", "direct"],
-        "brand_traits": ["innovative", "dynamic", "courageous", "action-oriented"]
-    },
-    "Taurus": {
-        "element": "Earth",
-        "modality": "Fixed",
-        "keywords": ["stable", "sensual", "reliable", "patient", "luxurious"],
-        "brand_traits": ["trustworthy", "quality-focused", "grounded", "enduring"]
-    },
-    "Gemini": {
-        "element": "Air",
-        "modality": "Mutable",
-        "keywords": ["communicative", "versatile", "curious", "witty", "social"],
-        "brand_traits": ["adaptable", "engaging", "informative", "multi-faceted"]
-    },
-    "Cancer": {
-        "element": "Water",
-        "modality": "Cardinal",
-        "keywords": ["nurturing", "intuitive", "protective", "emotional", "homey"],
-        "brand_traits": ["caring", "supportive", "empathetic", "community-focused"]
-    },
-    "Leo": {
-        "element": "Fire",
-        "modality": "Fixed",
-        "keywords": ["confident", "creative", "generous", "dramatic", "royal"],
-        "brand_traits": ["bold", "charismatic", "premium", "expressive"]
-    },
-    "Virgo": {
-        "element": "Earth",
-        "modality": "Mutable",
-        "keywords": ["analytical", "precise", "helpful", "practical", "refined"],
-        "brand_traits": ["detail-oriented", "efficient", "service-focused", "expert"]
-    },
-    "Libra": {
-        "element": "Air",
-        "modality": "Cardinal",
-        "keywords": ["harmonious", "diplomatic", "aesthetic", "balanced", "social"],
-        "brand_traits": ["elegant", "fair", "collaborative", "refined"]
-    },
-    "Scorpio": {
-        "element": "Water",
-        "modality": "Fixed",
-        "keywords": ["intense", "transformative", "mysterious", "powerful", "deep"],
-        "brand_traits": ["authentic", "transformative", "passionate", "profound"]
-    },
-    "Sagittarius": {
-        "element": "Fire",
-        "modality": "Mutable",
-        "keywords": ["adventurous", "philosophical", "optimistic", "free", "expansive"],
-        "brand_traits": ["visionary", "adventurous", "inspiring", "global"]
-    },
-    "Capricorn": {
-        "element": "Earth",
-        "modality": "Cardinal",
-        "keywords": ["ambitious", "disciplined", "traditional", "authoritative", "responsible"],
-        "brand_traits": ["professional", "reliable", "ambitious", "structured"]
-    },
-    "Aquarius": {
-        "element": "Air",
-        "modality": "Fixed",
-        "keywords": ["innovative", "humanitarian", "unconventional", "intellectual", "independent"],
-        "brand_traits": ["progressive", "unique", "humanitarian", "innovative"]
-    },
-    "Pisces": {
-        "element": "Water",
-        "modality": "Mutable",
-        "keywords": ["compassionate", "artistic", "intuitive", "dreamy", "spiritual"],
-        "brand_traits": ["imaginative", "empathetic", "creative", "spiritual"]
-    }
-}
+# Latency histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+                   0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+class ToolMetrics:
+    """Thread-safe counters for every instrumented tool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        # Seconds spent importing server.py (framework, engine, tool registration)
+        self.startup_seconds = None
+        self._tools = {}
+
+    def _tool(self, name: str) -> dict:
+        stats = self._tools.get(name)
+        if stats is None:
+            stats = self._tools[name] = {
+                "calls": 0,
+                "errors": {},
+                "in_flight": 0,
+                "max_in_flight": 0,
+                "latency_sum": 0.0,
+                "latency_max": 0.0,
+                "buckets": [0] * (len(LATENCY_BUCKETS) + 1)
+            }
+        return stats
+
+    def start(self, name: str) -> None:
+        with self._lock:
+            stats = self._tool(name)
+            stats["in_flight"] += 1
+            stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+
+    def finish(self, name: str, elapsed: float, error: str = None) -> None:
+        with self._lock:
+            stats = self._tool(name)
+            stats["in_flight"] -= 1
+            stats["calls"] += 1
+            stats["latency_sum"] += elapsed
+            stats["latency_max"] = max(stats["latency_max"], elapsed)
+            stats["buckets"][bisect_left(LATENCY_BUCKETS, elapsed)] += 1
+            if error is not None:
+                stats["errors"][error] = stats["errors"].get(error, 0) + 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._tools.clear()
+            self.started_at = time.time()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            uptime = max(time.time() - self.started_at, 1e-9)
+            tools = {}
+            for name, stats in self._tools.items():
+                calls = stats["calls"]
+                tools[name] = {
+                    "calls": calls,
+                    "errors": sum(stats["errors"].values()),
+                    "errors_by_type": dict(stats["errors"]),
+                    "in_flight": stats["in_flight"],
+                    "max_in_flight": stats["max_in_flight"],
+                    "throughput_per_sec": round(calls / uptime, 4),
+                    "latency_ms": {
+                        "mean": round(stats["latency_sum"] / calls * 1000, 4) if calls else 0.0,
+                        "max": round(stats["latency_max"] * 1000, 4),
+                        "p50": self._quantile_ms(stats["buckets"], calls, 0.50, stats["latency_max"]),
+                        "p95": self._quantile_ms(stats["buckets"], calls, 0.95, stats["latency_max"]),
+                        "p99": self._quantile_ms(stats["buckets"], calls, 0.99, stats["latency_max"])
+                    },
+                    "histogram": {
+                        "buckets_seconds": list(LATENCY_BUCKETS),
+                        "counts": list(stats["buckets"])
+                    }
+                }
+            return {"uptime_seconds": round(uptime, 3), "startup_seconds": self.startup_seconds, "tools": tools}
+
+    @staticmethod
+    def _quantile_ms(buckets: list, calls: int, fraction: float, latency_max: float) -> float:
+        """Upper bound of the histogram bucket holding the given quantile (capped at the max seen)"""
+        if not calls:
+            return 0.0
+        target = fraction * calls
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, buckets):
+            seen += count
+            if seen >= target:
+                return round(min(bound, latency_max) * 1000, 4)
+        return round(latency_max * 1000, 4)
+
+    def prometheus(self, cache_stats: dict = None, admission_stats: dict = None) -> str:
+        """Render all counters in the Prometheus text exposition format"""
+        with self._lock:
+            tools = {name: dict(stats, errors=dict(stats["errors"]), buckets=list(stats["buckets"]))
+                     for name, stats in self._tools.items()}
+            uptime = time.time() - self.started_at
+        lines = [
+            "# HELP brand_uptime_seconds Seconds since metrics collection started",
+            "# TYPE brand_uptime_seconds gauge",
+            f"brand_uptime_seconds {uptime:.3f}",
+            "# HELP brand_startup_seconds Seconds spent importing the server module at cold start",
+            "# TYPE brand_startup_seconds gauge",
+            f"brand_startup_seconds {self.startup_seconds or 0:.4f}",
+            "# HELP brand_tool_calls_total Completed tool calls",
+            "# TYPE brand_tool_calls_total counter"
+        ]
+        lines += [f'brand_tool_calls_total{{tool="{name}"}} {stats["calls"]}' for name, stats in tools.items()]
+        lines += ["# HELP brand_tool_errors_total Tool calls that returned an error, by error type",
+                  "# TYPE brand_tool_errors_total counter"]
+        lines += [f'brand_tool_errors_total{{tool="{name}",error="{error}"}} {count}'
+                  for name, stats in tools.items() for error, count in stats["errors"].items()]
+        lines += ["# HELP brand_tool_in_flight Tool calls currently executing",
+                  "# TYPE brand_tool_in_flight gauge"]
+        lines += [f'brand_tool_in_flight{{tool="{name}"}} {stats["in_flight"]}' for name, stats in tools.items()]
+        lines += ["# HELP brand_tool_latency_seconds Tool call latency",
+                  "# TYPE brand_tool_latency_seconds histogram"]
+        for name, stats in tools.items():
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, stats["buckets"]):
+                cumulative += count
+                lines.append(f'brand_tool_latency_seconds_bucket{{tool="{name}",le="{bound}"}} {cumulative}')
+            lines.append(f'brand_tool_latency_seconds_bucket{{tool="{name}",le="+Inf"}} {stats["calls"]}')
+            lines.append(f'brand_tool_latency_seconds_sum{{tool="{name}"}} {stats["latency_sum"]:.9f}')
+            lines.append(f'brand_tool_latency_seconds_count{{tool="{name}"}} {stats["calls"]}')
+        if cache_stats is not None:
+            lines += ["# HELP brand_chart_cache_entries Charts currently cached",
+                      "# TYPE brand_chart_cache_entries gauge",
+                      f'brand_chart_cache_entries {cache_stats["size"]}']
+            for counter in ("hits", "misses", "evictions", "expirations"):
+                lines += [f"# TYPE brand_chart_cache_{counter}_total counter",
+                          f"brand_chart_cache_{counter}_total {cache_stats[counter]}"]
+        if admission_stats is not None:
+            lines += ["# HELP brand_admission_running Tool calls executing under admission control",
+                      "# TYPE brand_admission_running gauge",
+                      f'brand_admission_running {admission_stats["running"]}',
+                      "# HELP brand_admission_queued Tool calls waiting for a slot",
+                      "# TYPE brand_admission_queued gauge",
+                      f'brand_admission_queued {admission_stats["queued"]}',
+                      "# HELP brand_admission_rejected_total Tool calls rejected as overloaded",
+                      "# TYPE brand_admission_rejected_total counter",
+                      f'brand_admission_rejected_total {admission_stats["rejected_total"]}']
+        return "\n".join(lines) + "\n"
+
+
+tool_metrics = ToolMetrics()
+
+# Names of every instrumented tool, for validating per-tool settings
+TOOL_NAMES = set()
+
+def instrumented(fn):
+    """Record call count, latency, errors and concurrency for a tool function.
+
+    A returned {"status": "error"} dict is counted under its error_code; an
+    exception escaping the tool is counted under its class name and re-raised.
+    Works for both plain and async tool functions.
+    """
+    name = fn.__name__
+    TOOL_NAMES.add(name)
+
+    def error_of(result):
+        if isinstance(result, dict) and result.get("status") == "error":
+            return result.get("error_code", "error")
+        return None
+
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            tool_metrics.start(name)
+            started = time.perf_counter()
+            error = None
+            try:
+                result = await fn(*args, **kwargs)
+                error = error_of(result)
+                return result
+            except BaseException as e:
+                error = type(e).__name__
+                raise
+            finally:
+                tool_metrics.finish(name, time.perf_counter() - started, error)
+
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        tool_metrics.start(name)
+        started = time.perf_counter()
+        error = None
+        try:
+            result = tool_profiler.call(name, fn, args, kwargs)
+            error = error_of(result)
+            return result
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            tool_metrics.finish(name, time.perf_counter() - started, error)
+
+    return wrapper
 
-HUMAN_DESIGN_TYPES = {
-    "Manifestor": {
-        "strategy": "Inform before acting",
-        "percentage": "9%",
-        "brand_strength": "Initiating, pioneering, independent action",
-        "brand_approach": "Bold launches, trend-setting, disruptive innovation"
-    },
-    "Generator": {
-        "strategy": "Wait to respond",
-        "percentage": "37%",
-        "brand_strength": "Sustainable energy, mastery, satisfaction",
-        "brand_approach": "Responsive service, building momentum, sustainable growth"
-    },
-    "Manifesting Generator": {
-        "strategy": "Wait to respond, then inform",
-        "percentage": "33%",
-        "brand_strength": "Multi-passionate, efficient, fast-paced",
-        "brand_approach": "Quick pivots, multi-faceted offerings, dynamic evolution"
-    },
-    "Projector": {
-        "strategy": "Wait for invitation",
-        "percentage": "20%",
-        "brand_strength": "Guidance, systems, recognition",
-        "brand_approach": "Expert positioning, premium pricing, invitation-based marketing"
-    },
-    "Reflector": {
-        "strategy": "Wait a lunar cycle",
-        "percentage": "1%",
-        "brand_strength": "Evaluation, reflection, community barometer",
-        "brand_approach": "Unique perspective, community-focused, reflective content"
-    }
-}
+# ============================================================================
+# OFFLOADING & ADMISSION CONTROL - async tools, bounded concurrency and queues
+# ============================================================================
 
-HUMAN_DESIGN_AUTHORITIES = {
-    "Emotional": "Wait for emotional clarity over time",
-    "Sacral": "Trust gut responses in the moment",
-    "Splenic": "Trust intuitive hits in the present",
-    "Ego": "Trust willpower and heart desires",
-    "Self-Projected": "Trust what you hear yourself say",
-    "Environmental": "Trust wisdom from your environment",
-    "Lunar": "Wait through a full moon cycle"
-}
+class ServerOverloaded(Exception):
+    """Raised when a call would exceed the admission queue limits"""
 
-HUMAN_DESIGN_PROFILES = {
-    "1/3": {"name": "Investigator/Martyr", "essence": "Research-based experimentation"},
-    "1/4": {"name": "Investigator/Opportunist", "essence": "Expert networking"},
-    "2/4": {"name": "Hermit/Opportunist", "essence": "Natural talent meets networking"},
-    "2/5": {"name": "Hermit/Heretic", "essence": "Called forth genius"},
-    "3/5": {"name": "Martyr/Heretic", "essence": "Trial and error problem-solving"},
-    "3/6": {"name": "Martyr/Role Model", "essence": "Experiential wisdom"},
-    "4/6": {"name": "Opportunist/Role Model", "essence": "Network-based leadership"},
-    "4/1": {"name": "Opportunist/Investigator", "essence": "Networking meets research"},
-    "5/1": {"name": "Heretic/Investigator", "essence": "Practical solutions"},
-    "5/2": {"name": "Heretic/Hermit", "essence": "Universal problem-solver"},
-    "6/2": {"name": "Role Model/Hermit", "essence": "Wisdom through experience"},
-    "6/3": {"name": "Role Model/Martyr", "essence": "Authentic living example"}
-}
+    code = "overloaded"
 
-BRAND_ARCHETYPES = {
-    "Innocent": {"desire": "Safety and happiness"},
-    "Sage": {"desire": "Truth and knowledge"},
-    "Explorer": {"desire": "Freedom and discovery"},
-    "Outlaw": {"desire": "Revolution and change"},
-    "Magician": {"desire": "Transformation"},
-    "Hero": {"desire": "Mastery and courage"},
-    "Lover": {"desire": "Intimacy and beauty"},
-    "Jester": {"desire": "Joy and fun"},
-    "Everyperson": {"desire": "Belonging and connection"},
-    "Caregiver": {"desire": "Service and care"},
-    "Ruler": {"desire": "Control and order"},
-    "Creator": {"desire": "Innovation and expression"}
-}
+    def __init__(self, message: str, scope: str):
+        super().__init__(message)
+        self.scope = scope
 
-ARCHETYPE_COLORS = {
-    "Innocent": {"primary": "#FFE5E5", "secondary": "#B8E6FF", "accent": "#FFF8DC"},
-    "Sage": {"primary": "#2C3E50", "secondary": "#95A5A6", "accent": "#F39C12"},
-    "Explorer": {"primary": "#8B4513", "secondary": "#556B2F", "accent": "#CD853F"},
-    "Outlaw": {"primary": "#000000", "secondary": "#8B0000", "accent": "#4B0082"},
-    "Magician": {"primary": "#4B0082", "secondary": "#483D8B", "accent": "#C0C0C0"},
-    "Hero": {"primary": "#DC143C", "secondary": "#00008B", "accent": "#FFD700"},
-    "Lover": {"primary": "#8B0000", "secondary": "#FF69B4", "accent": "#FFD700"},
-    "Jester": {"primary": "#FF6347", "secondary": "#FFD700", "accent": "#32CD32"},
-    "Everyperson": {"primary": "#8B7355", "secondary": "#CD853F", "accent": "#F5DEB3"},
-    "Caregiver": {"primary": "#87CEEB", "secondary": "#98FB98", "accent": "#F5DEB3"},
-    "Ruler": {"primary": "#00008B", "secondary": "#800080", "accent": "#FFD700"},
-    "Creator": {"primary": "#FF4500", "secondary": "#9370DB", "accent": "#FFD700"}
-}
 
-ARCHETYPE_FONTS = {
-    "Innocent": {"heading": "Quicksand, Nunito, or Poppins", "body": "Open Sans or Lato", "style": "Friendly, rounded, approachable"},
-    "Sage": {"heading": "Merriweather, Playfair Display, or Georgia", "body": "Source Sans Pro or Roboto", "style": "Classic, authoritative, readable"},
-    "Explorer": {"heading": "Montserrat Bold or Bebas Neue", "body": "Raleway or Lato", "style": "Bold, adventurous, rugged"},
-    "Outlaw": {"heading": "Oswald, Bebas Neue, or Impact", "body": "Roboto or Open Sans", "style": "Bold, edgy, rebellious"},
-    "Magician": {"heading": "Cinzel, Philosopher, or Cormorant Garamond", "body": "Lora or Crimson Text", "style": "Mystical, elegant, transformative"},
-    "Hero": {"heading": "Montserrat Black or Oswald", "body": "Open Sans or Roboto", "style": "Strong, confident, powerful"},
-    "Lover": {"heading": "Playfair Display or Cormorant Garamond", "body": "Crimson Text or Lora", "style": "Elegant, romantic, sophisticated"},
-    "Jester": {"heading": "Fredoka One or Baloo", "body": "Quicksand or Nunito", "style": "Playful, energetic, fun"},
-    "Everyperson": {"heading": "Open Sans or Lato", "body": "Roboto or PT Sans", "style": "Friendly, accessible, comfortable"},
-    "Caregiver": {"heading": "Nunito or Quicksand", "body": "Open Sans or Lato", "style": "Warm, soft, nurturing"},
-    "Ruler": {"heading": "Playfair Display or Cinzel", "body": "Lora or Crimson Text", "style": "Refined, authoritative, elegant"},
-    "Creator": {"heading": "Montserrat or Raleway", "body": "Open Sans or Lato", "style": "Modern, creative, versatile"}
-}
+class AdmissionController:
+    """Caps concurrent tool executions globally and per client, with bounded FIFO queues.
 
-ARCHETYPE_VOICE = {
-    "Innocent": {"personality": "Optimistic, simple, honest, pure", "tone": "Friendly, encouraging, positive"},
-    "Sage": {"personality": "Intelligent, analytical, thoughtful, guiding", "tone": "Authoritative, informative, thoughtful"},
-    "Explorer": {"personality": "Adventurous, authentic, brave, free", "tone": "Bold, inspiring, authentic"},
-    "Outlaw": {"personality": "Rebellious, disruptive, provocative, raw", "tone": "Bold, direct, challenging"},
-    "Magician": {"personality": "Visionary, inspirational, transformative, magical", "tone": "Inspiring, mystical, transformative"},
-    "Hero": {"personality": "Courageous, inspiring, determined, triumphant", "tone": "Motivating, confident, strong"},
-    "Lover": {"personality": "Passionate, intimate, sensual, devoted", "tone": "Warm, intimate, elegant"},
-    "Jester": {"personality": "Fun, playful, irreverent, joyful", "tone": "Playful, humorous, lighthearted"},
-    "Everyperson": {"personality": "Friendly, down-to-earth, reliable, genuine", "tone": "Conversational, warm, authentic"},
-    "Caregiver": {"personality": "Compassionate, nurturing, supportive, warm", "tone": "Caring, gentle, supportive"},
-    "Ruler": {"personality": "Authoritative, confident, refined, prestigious", "tone": "Sophisticated, authoritative, refined"},
-    "Creator": {"personality": "Innovative, imaginative, artistic, original", "tone": "Creative, inspiring, original"}
-}
+    A call starts at once when the server has a free slot and its client is
+    under its own cap with nothing queued. Otherwise it waits in the queue;
+    if the global or the client's queue is already full it is rejected at
+    once with ServerOverloaded, so latency stays bounded under bursts. Must
+    be used from a single event loop.
+    """
 
-VISUAL_STYLES = {
-    "Innocent": {"aesthetic": "Soft, light, optimistic, simple", "imagery": "Bright, happy, uplifting images"},
-    "Sage": {"aesthetic": "Clean, authoritative, informative, trustworthy", "imagery": "Professional, educational, thoughtful"},
-    "Explorer": {"aesthetic": "Rugged, natural, adventurous, authentic", "imagery": "Nature, adventure, discovery, journeys"},
-    "Outlaw": {"aesthetic": "Bold, edgy, disruptive, unconventional", "imagery": "Urban, raw, rebellious, provocative"},
-    "Magician": {"aesthetic": "Mystical, transformative, visionary, enchanting", "imagery": "Transformative, magical, inspiring, cosmic"},
-    "Hero": {"aesthetic": "Strong, confident, triumphant, powerful", "imagery": "Achievement, strength, victory, courage"},
-    "Lover": {"aesthetic": "Elegant, sensual, intimate, beautiful", "imagery": "Beauty, romance, luxury, intimacy"},
-    "Jester": {"aesthetic": "Fun, playful, energetic, joyful", "imagery": "Playful, humorous, colorful, lively"},
-    "Everyperson": {"aesthetic": "Friendly, relatable, comfortable, genuine", "imagery": "Real people, everyday life, authenticity"},
-    "Caregiver": {"aesthetic": "Warm, nurturing, supportive, gentle", "imagery": "Care, support, comfort, warmth"},
-    "Ruler": {"aesthetic": "Refined, prestigious, authoritative, luxurious", "imagery": "Premium, sophisticated, powerful, prestigious"},
-    "Creator": {"aesthetic": "Innovative, artistic, unique, expressive", "imagery": "Creative, original, artistic, imaginative"}
+    def __init__(self, max_concurrency: int, max_queue: int,
+                 client_max_concurrency: int, client_max_queue: int):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.client_max_concurrency = client_max_concurrency
+        self.client_max_queue = client_max_queue
+        self.running = 0
+        self.admitted = 0
+        self.rejected = 0
+        self._clients = {}  # client id -> [running, waiting]
+        self._waiters = deque()  # (client id, future), FIFO
+
+    def _can_start(self, client: list) -> bool:
+        return self.running < self.max_concurrency and client[0] < self.client_max_concurrency
+
+    def _start(self, client: list) -> None:
+        self.running += 1
+        self.admitted += 1
+        client[0] += 1
+
+    def _forget_if_idle(self, client_id: str, client: list) -> None:
+        # Entries exist only while a client has calls running or queued
+        if client == [0, 0]:
+            del self._clients[client_id]
+
+    async def acquire(self, client_id: str) -> None:
+        client = self._clients.setdefault(client_id, [0, 0])
+        # Queue only behind this client's own waiters or a full server; waiters
+        # held back by their own client cap never block other clients
+        if client[1] == 0 and self._can_start(client):
+            self._start(client)
+            return
+        if len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            self._forget_if_idle(client_id, client)
+            raise ServerOverloaded(f"Server busy: {len(self._waiters)} calls already queued", "global")
+        if client[1] >= self.client_max_queue:
+            self.rejected += 1
+            self._forget_if_idle(client_id, client)
+            raise ServerOverloaded(f"Too many queued calls for this client ({client[1]})", "client")
+        waiter = (client_id, asyncio.get_running_loop().create_future())
+        self._waiters.append(waiter)
+        client[1] += 1
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            if waiter[1].done() and not waiter[1].cancelled():
+                # Admitted just as we were cancelled: hand the slot back
+                self.release(client_id)
+            else:
+                self._waiters.remove(waiter)
+                client[1] -= 1
+                self._forget_if_idle(client_id, client)
+            raise
+
+    def release(self, client_id: str) -> None:
+        client = self._clients[client_id]
+        self.running -= 1
+        client[0] -= 1
+        # Admit the oldest waiters whose clients are under their own cap
+        for waiter in list(self._waiters):
+            if self.running >= self.max_concurrency:
+                break
+            waiting_client = self._clients[waiter[0]]
+            if waiting_client[0] < self.client_max_concurrency:
+                self._waiters.remove(waiter)
+                waiting_client[1] -= 1
+                self._start(waiting_client)
+                waiter[1].set_result(None)
+        self._forget_if_idle(client_id, client)
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "queued": len(self._waiters),
+            "admitted_total": self.admitted,
+            "rejected_total": self.rejected,
+            "active_clients": len(self._clients),
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "client_max_concurrency": self.client_max_concurrency,
+            "client_max_queue": self.client_max_queue
+        }
+
+
+EXECUTOR_KIND = os.environ.get("BRAND_EXECUTOR", "thread")
+EXECUTOR_WORKERS = int(os.environ.get("BRAND_EXECUTOR_WORKERS", str(min(32, (os.cpu_count() or 1) + 4))))
+
+admission = AdmissionController(
+    max_concurrency=int(os.environ.get("BRAND_MAX_CONCURRENCY", str(EXECUTOR_WORKERS))),
+    max_queue=int(os.environ.get("BRAND_MAX_QUEUE", "256")),
+    client_max_concurrency=int(os.environ.get("BRAND_CLIENT_MAX_CONCURRENCY", "8")),
+    client_max_queue=int(os.environ.get("BRAND_CLIENT_MAX_QUEUE", "32"))
+)
+
+# Optional persistent record of generated identities; None unless BRAND_STORE_PATH is set
+brand_store = open_brand_store()
+
+# Samples nothing unless BRAND_PROFILE_RATE or configure_profiling turns it on
+tool_profiler = open_tool_profiler()
+# Lets sampled calls time the engine's parse/location/chart stages
+set_span_hook(span)
+
+_executor = None
+# Sync tool bodies by name, so a process-pool worker can find them after import
+SYNC_TOOLS = {}
+
+def _get_executor():
+    """Executor for tool bodies: BRAND_EXECUTOR=thread (default) or process"""
+    global _executor
+    if _executor is None:
+        if EXECUTOR_KIND == "process":
+            # Spawned, not forked: this process already runs an event loop and worker threads
+            _executor = ProcessPoolExecutor(max_workers=EXECUTOR_WORKERS,
+                                            mp_context=multiprocessing.get_context("spawn"))
+        elif EXECUTOR_KIND == "thread":
+            _executor = ThreadPoolExecutor(max_workers=EXECUTOR_WORKERS, thread_name_prefix="brand-tool")
+        else:
+            raise ValueError(f"BRAND_EXECUTOR must be 'thread' or 'process', not {EXECUTOR_KIND!r}")
+    return _executor
+
+def _run_sync_tool(name: str, args: tuple, kwargs: dict):
+    # Profiled here, on the thread that runs the body, not around the event loop
+    return tool_profiler.call(name, SYNC_TOOLS[name], args, kwargs)
+
+# Cache counters each process-pool worker reported with its latest result, by pid
+_worker_stats = {}
+
+def _process_stats() -> dict:
+    """This process's cache counters; cheap enough to send back with every worker result"""
+    stats = {"cache": chart_cache.stats(), "gazetteer": gazetteer.stats(), "assets": asset_cache.stats()}
+    if shared_chart_cache is not None:
+        stats["shared_cache"] = shared_chart_cache.stats()
+    if brand_store is not None:
+        stats["store"] = {"hits": brand_store.hits, "misses": brand_store.misses, "writes": brand_store.writes,
+                          "write_errors": brand_store.write_errors,
+                          "last_write_error": brand_store.last_write_error}
+    return stats
+
+def _run_in_worker(name: str, args: tuple, kwargs: dict, profile_memory: bool = None) -> tuple:
+    """Process-pool entry point: (result, worker pid, the worker's cache counters, profile sample).
+
+    The parent's profiler decides sampling: profile_memory is None for an
+    unsampled call, else whether to trace memory too.
+    """
+    sample = None
+    if profile_memory is None:
+        result = SYNC_TOOLS[name](*args, **kwargs)
+    else:
+        result, sample = profile_call(SYNC_TOOLS[name], args, kwargs, profile_memory)
+    return result, os.getpid(), _process_stats(), sample
+
+# Counters kept per process, so summed over the parent and every worker;
+# everything else in a section (limits, paths, table-wide figures) is shared
+_PER_PROCESS_COUNTERS = {
+    "cache": ("size", "hits", "misses", "evictions", "expirations"),
+    "gazetteer": ("cache_size", "hits", "misses"),
+    "assets": ("hits", "renders", "evictions"),
+    "shared_cache": ("hits", "misses", "stores"),
+    "store": ("hits", "misses", "writes", "write_errors")
 }
 
+def _cache_stats() -> dict:
+    """Cache sections for get_cache_stats and server_metrics.
+
+    With BRAND_EXECUTOR=process the tool bodies, and so the caches that do
+    the work, live in the pool's workers: their counters are summed with the
+    parent's, each as of that worker's latest completed call.
+    """
+    stats = _process_stats()
+    if brand_store is not None:
+        stats["store"] = brand_store.stats()
+    if EXECUTOR_KIND != "process":
+        return stats
+    snapshots = [stats] + list(_worker_stats.values())
+    for section, counters in _PER_PROCESS_COUNTERS.items():
+        if section not in stats:
+            continue
+        merged = stats[section]
+        for counter in counters:
+            merged[counter] = sum(snapshot[section][counter] for snapshot in snapshots if section in snapshot)
+        misses = merged["misses"] if "misses" in merged else merged["renders"]
+        lookups = merged["hits"] + misses
+        merged["hit_rate"] = round(merged["hits"] / lookups, 4) if lookups else 0.0
+        if section == "store":
+            merged["last_write_error"] = next((snapshot["store"]["last_write_error"] for snapshot in reversed(snapshots)
+                                               if snapshot["store"]["last_write_error"]), None)
+    stats["executor"] = {"kind": "process", "workers_reporting": len(_worker_stats)}
+    return stats
+
+# Request header naming the caller for per-client limits over HTTP, e.g. set by a trusted proxy
+CLIENT_ID_HEADER = os.environ.get("BRAND_CLIENT_ID_HEADER", "").lower()
+
+def _client_id() -> str:
+    """Identify the calling MCP client for per-client limits ("local" outside a request).
+
+    Over HTTP this is the CLIENT_ID_HEADER value when configured, else the
+    remote address: serve.py runs stateless HTTP, where every request gets a
+    fresh session, so a session id would never accumulate calls. Over stdio
+    it is the MCP session.
+    """
+    try:
+        from fastmcp.server.dependencies import get_context, get_http_request
+    except ImportError:
+        return "local"
+    try:
+        request = get_http_request()
+    except RuntimeError:
+        request = None
+    if request is not None:
+        client_id = request.headers.get(CLIENT_ID_HEADER) if CLIENT_ID_HEADER else None
+        if client_id:
+            return f"header:{client_id}"
+        if request.client is not None:
+            return f"address:{request.client.host}"
+    try:
+        context = get_context()
+    except RuntimeError:
+        return "local"
+    return getattr(context, "client_id", None) or getattr(context, "session_id", None) or "anonymous"
+
+def offloaded(fn):
+    """Turn a sync tool body into an async tool that runs it on the executor.
+
+    The call first passes admission control; when the queues are full it
+    returns an "overloaded" error without running anything.
+    """
+    name = fn.__name__
+    SYNC_TOOLS[name] = fn
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        client_id = _client_id()
+        try:
+            await admission.acquire(client_id)
+        except ServerOverloaded as e:
+            return {"status": "error", "error": str(e), "error_code": e.code, "scope": e.scope}
+        try:
+            loop = asyncio.get_running_loop()
+            if EXECUTOR_KIND == "process":
+                profile_memory = tool_profiler.memory if tool_profiler.sampled(name) else None
+                result, pid, stats, sample = await loop.run_in_executor(
+                    _get_executor(), functools.partial(_run_in_worker, name, args, kwargs, profile_memory))
+                _worker_stats[pid] = stats
+                if sample is not None:
+                    tool_profiler.record(name, sample)
+                return result
+            return await loop.run_in_executor(
+                _get_executor(), functools.partial(_run_sync_tool, name, args, kwargs))
+        finally:
+            admission.release(client_id)
+
+    return wrapper
+
 # ============================================================================
-# CALCULATION FUNCTIONS
+# PROFILING - sampled cProfile/tracemalloc captures of live tool calls
 # ============================================================================
 
-def calculate_zodiac_sign(day: int, month: int) -> str:
-    """Calculate zodiac sign from day and month"""
-    if (month == 3 and day >= 21) or (month == 4 and day <= 19): return "Aries"
-    if (month == 4 and day >= 20) or (month == 5 and day <= 20): return "Taurus"
-    if (month == 5 and day >= 21) or (month == 6 and day <= 20): return "Gemini"
-    if (month == 6 and day >= 21) or (month == 7 and day <= 22): return "Cancer"
-    if (month == 7 and day >= 23) or (month == 8 and day <= 22): return "Leo"
-    if (month == 8 and day >= 23) or (month == 9 and day <= 22): return "Virgo"
-    if (month == 9 and day >= 23) or (month == 10 and day <= 22): return "Libra"
-    if (month == 10 and day >= 23) or (month == 11 and day <= 21): return "Scorpio"
-    if (month == 11 and day >= 22) or (month == 12 and day <= 21): return "Sagittarius"
-    if (month == 12 and day >= 22) or (month == 1 and day <= 19): return "Capricorn"
-    if (month == 1 and day >= 20) or (month == 2 and day <= 18): return "Aquarius"
-    return "Pisces"
-
-def calculate_rising_sign(birth_hour: int, birth_minute: int) -> str:
-    """Calculate rising sign from birth time (simplified)"""
-    total_minutes = birth_hour * 60 + birth_minute
-    sign_index = (total_minutes // 120) % 12
-    signs = ["Aries", "Taurus", "Gemini", "Cancer", "Leo", "Virgo",
-             "Libra", "Scorpio", "Sagittarius", "Capricorn", "Aquarius", "Pisces"]
-    return signs[sign_index]
-
-def calculate_moon_sign(day: int, month: int, year: int) -> str:
-    """Calculate moon sign (simplified lunar calculation)"""
-    days_since_epoch = (year - 2000) * 365.25 + month * 30.44 + day
-    lunar_position = (days_since_epoch * 13.176) % 360
-    sign_index = int(lunar_position // 30)
-    signs = ["Aries", "Taurus", "Gemini", "Cancer", "Leo", "Virgo",
-             "Libra", "Scorpio", "Sagittarius", "Capricorn", "Aquarius", "Pisces"]
-    return signs[sign_index]
-
-def calculate_human_design_type(day: int, month: int, hour: int) -> str:
-    """Calculate Human Design type (simplified)"""
-    value = (day + month * 3 + hour * 5) % 100
-    if value < 9: return "Manifestor"
-    if value < 46: return "Generator"
-    if value < 79: return "Manifesting Generator"
-    if value < 99: return "Projector"
-    return "Reflector"
-
-def calculate_human_design_authority(hd_type: str, day: int) -> str:
-    """Calculate Human Design authority"""
-    if hd_type == "Manifestor":
-        return "Splenic" if day % 2 == 0 else "Emotional"
-    elif hd_type in ["Generator", "Manifesting Generator"]:
-        return "Sacral" if day % 3 == 0 else "Emotional"
-    elif hd_type == "Projector":
-        authorities = ["Splenic", "Ego", "Self-Projected", "Environmental", "Emotional"]
-        return authorities[day % len(authorities)]
-    return "Lunar"
-
-def calculate_human_design_profile(day: int, month: int) -> str:
-    """Calculate Human Design profile"""
-    profiles = ["1/3", "1/4", "2/4", "2/5", "3/5", "3/6", "4/6", "4/1", "5/1", "5/2", "6/2", "6/3"]
-    return profiles[(day + month) % len(profiles)]
-
-def determine_brand_archetype(sun_sign: str, moon_sign: str, rising_sign: str, hd_type: str) -> str:
-    """Determine primary brand archetype"""
-    mapping = {
-        "Aries": "Hero", "Taurus": "Everyperson", "Gemini": "Jester",
-        "Cancer": "Caregiver", "Leo": "Ruler", "Virgo": "Sage",
-        "Libra": "Lover", "Scorpio": "Magician", "Sagittarius": "Explorer",
-        "Capricorn": "Ruler", "Aquarius": "Creator", "Pisces": "Innocent"
-    }
-    
-    hd_archetypes = {
-        "Manifestor": "Outlaw", "Generator": "Everyperson",
-        "Manifesting Generator": "Creator", "Projector": "Sage", "Reflector": "Magician"
-    }
-    
-    primary = mapping.get(sun_sign, "Sage")
-    
-    if hd_type in hd_archetypes:
-        hd_influence = hd_archetypes[hd_type]
-        if hd_influence != primary and hash(sun_sign + hd_type) % 10 < 3:
-            return hd_influence
-    
-    return primary
-
-def hex_to_rgb(hex_color: str) -> str:
-    """Convert hex to RGB"""
-    hex_color = hex_color.lstrip('#')
-    r, g, b = tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
-    return f"{r}, {g}, {b}"
+def _configure_profiling(sample_rate: float, tools: list = None, memory: bool = None) -> None:
+    if isinstance(sample_rate, bool) or not isinstance(sample_rate, (int, float)) or not 0 <= sample_rate <= 1:
+        raise ChartInputError("invalid_sample_rate", "sample_rate", "sample_rate must be a number from 0 to 1")
+    if tools is not None:
+        for tool in tools:
+            if tool not in TOOL_NAMES:
+                raise ChartInputError("unknown_value", "tools", f"unknown tool '{tool}'")
+    if memory is not None and not isinstance(memory, bool):
+        raise ChartInputError("invalid_type", "memory", "memory must be true or false")
+    tool_profiler.configure(float(sample_rate), tools, memory)
+
+def _dump_profiles_response(file_name: str, output_format: str, reset: bool) -> dict:
+    if output_format not in PROFILE_FORMATS:
+        raise ChartInputError("invalid_output_format", "output_format",
+                              f"output_format must be one of {list(PROFILE_FORMATS)}")
+    # A bare name only: the files always land in the profile directory
+    if (not isinstance(file_name, str) or not file_name or file_name.startswith(".")
+            or os.path.basename(file_name) != file_name or os.sep in file_name):
+        raise ChartInputError("invalid_file_name", "file_name", "file_name must be a plain file name")
+    summary = tool_profiler.summary()
+    if not summary["tools"]:
+        raise ChartInputError("no_profiles", "file_name",
+                              "no calls have been profiled yet; turn sampling on with configure_profiling")
+    paths = tool_profiler.dump(file_name, output_format)
+    if reset:
+        tool_profiler.reset()
+    return {"status": "success", "output_format": output_format, "paths": paths, **summary}
 
 # ============================================================================
 # MCP TOOLS
 # ============================================================================
 
 @mcp.tool()
+@instrumented
+@offloaded
 def generate_brand_identity(
     birth_date: str,
     birth_time: str,
     birth_location: str,
-    business_name: str = None
+    business_name: str = None,
+    sections: list[str] = None,
+    output_format: str = "markdown"
 ) -> dict:
     """
     Generate complete brand identity guidelines based on birth data.
@@ -333,185 +586,46 @@ def generate_brand_identity(
         birth_time: Birth time in HH:MM format, 24-hour (e.g., "14:30")
         birth_location: Birth location (e.g., "Buenos Aires, Argentina")
         business_name: Optional business name
+        sections: Optional subset of guideline sections to return: "core", "palette",
+            "typography", "logo", "visual", "voice", "quick_reference" (default: all)
+        output_format: "markdown" for a guidelines document, or "json" for
+            structured section data without the markdown
     
     Returns:
         Complete Canva-style brand guidelines
     
     Example:
         generate_brand_identity("1987-10-28", "14:30", "Buenos Aires, Argentina")
+        generate_brand_identity("1987-10-28", "14:30", "Buenos Aires, Argentina",
+                                sections=["palette", "typography"], output_format="json")
     """
     try:
-        # Parse date and time
-        date_obj = datetime.strptime(birth_date, "%Y-%m-%d")
-        time_obj = datetime.strptime(birth_time, "%H:%M")
-        
-        day, month, year = date_obj.day, date_obj.month, date_obj.year
-        hour, minute = time_obj.hour, time_obj.minute
-        
-        # Calculate astrology
-        sun_sign = calculate_zodiac_sign(day, month)
-        moon_sign = calculate_moon_sign(day, month, year)
-        rising_sign = calculate_rising_sign(hour, minute)
-        
-        # Calculate Human Design
-        hd_type = calculate_human_design_type(day, month, hour)
-        hd_authority = calculate_human_design_authority(hd_type, day)
-        hd_profile = calculate_human_design_profile(day, month)
-        
-        # Determine archetype
-        archetype = determine_brand_archetype(sun_sign, moon_sign, rising_sign, hd_type)
-        
-        # Get brand elements
-        colors = ARCHETYPE_COLORS[archetype]
-        fonts = ARCHETYPE_FONTS[archetype]
-        voice = ARCHETYPE_VOICE[archetype]
-        visual = VISUAL_STYLES[archetype]
-        
-        # Format guidelines
-        guidelines = f"""# BRAND IDENTITY GUIDELINES
-
-**Generated for:** {birth_date} at {birth_time} in {birth_location}
-
----
-
-## Core Brand Identity
-
-**Primary Archetype:** {archetype}
-**Astrological Foundation:** {sun_sign} Sun • {moon_sign} Moon • {rising_sign} Rising
-**Human Design:** {hd_type} • {hd_authority} Authority • {hd_profile} Profile
-
-{BRAND_ARCHETYPES[archetype]['desire']} is at the heart of this brand.
-This core identity shapes every visual and verbal element of your brand presence.
-
----
-
-## Color Palette
-
-**Primary Brand Color**
-Primary Color • {colors['primary']} • RGB {hex_to_rgb(colors['primary'])}
-Use for: Main brand elements, headers, key CTAs
-
-**Secondary Color**
-Secondary Color • {colors['secondary']} • RGB {hex_to_rgb(colors['secondary'])}
-Use for: Supporting elements, subheadings, backgrounds
-
-**Accent Color**
-Accent Color • {colors['accent']} • RGB {hex_to_rgb(colors['accent'])}
-Use for: Highlights, buttons, important details
-
-**Neutral Colors**
-Dark Neutral • #2C3E50 • RGB 44, 62, 80
-Medium Neutral • #95A5A6 • RGB 149, 165, 166
-Light Neutral • #ECF0F1 • RGB 236, 240, 241
-
----
-
-## Typography
-
-**Heading Font:** {fonts['heading']}
-Use for: Main headlines, section headers, hero text
-Sizes: H1 48-60px, H2 36-42px, H3 24-30px
-
-**Body Font:** {fonts['body']}
-Use for: Paragraphs, descriptions, general content
-Sizes: Body 16-18px, Caption 14px
-
-**Font Style:** {fonts['style']}
-Line height: 1.5-1.8
-Letter spacing: Normal (0) for body, tight (-0.5px) for headings
-
----
-
-## Logo Guidelines
-
-**Style:** {archetype} brand aesthetic
-
-**Primary Logo**
-Font: Primary heading font
-Color: Primary brand color
-Format: Full color on white background
-
-**Required Variations**
-• Full color
-• Single color (black)
-• Single color (white)
-• Horizontal version
-• Stacked version
-• Icon only
-
-**Sizing & Spacing**
-Minimum size: 24px height for digital, 0.5 inch for print
-Clear space: Equal to height of logo on all sides
-Formats: SVG, PNG, PDF
-
----
-
-## Visual Style
-
-**Overall Aesthetic:** {visual['aesthetic']}
-
-**Imagery Style:** {visual['imagery']}
-
-**Photography Direction**
-Style: Images should feel {visual['aesthetic']}
-Subjects: {visual['imagery']}
-
----
-
-## Brand Voice
-
-**Personality:** {voice['personality']}
-**Tone:** {voice['tone']}
-
-**Communication Style**
-Speak with {voice['tone']} to connect authentically with your audience.
-Embody {voice['personality']} in every message.
-
----
-
-## Quick Reference
-
-**One-Line Brand Essence:** {archetype} brand with {sun_sign} energy, {hd_type} approach
-
-**Color Snapshot:** {colors['primary']} • {colors['secondary']} • {colors['accent']}
-
-**Font Pairing:** {fonts['heading']} + {fonts['body']}
-
-**Visual Mood:** {visual['aesthetic']}
-
-**Voice:** {voice['personality']}
-
----
-
-*These guidelines provide a complete foundation for your brand identity. Use them to maintain consistency across all brand touchpoints, from website to social media to print materials.*
-"""
-        
-        return {
-            "status": "success",
-            "birth_data": {
-                "date": birth_date,
-                "time": birth_time,
-                "location": birth_location
-            },
-            "astrology": {
-                "sun_sign": sun_sign,
-                "moon_sign": moon_sign,
-                "rising_sign": rising_sign
-            },
-            "human_design": {
-                "type": hd_type,
-                "authority": hd_authority,
-                "profile": hd_profile
-            },
-            "archetype": archetype,
-            "guidelines": guidelines
-        }
-        
+        with span("validate"):
+            selected = _select_sections(sections)
+            _check_output_format(output_format)
+            _optional_text(business_name, "business_name")
+        if brand_store is not None:
+            variant = variant_key(selected, output_format)
+            # Checked before the chart is built, so a hit costs one indexed read
+            with span("store_get"):
+                response = brand_store.get(birth_date, birth_time, birth_location, business_name, variant)
+            if response is not None:
+                return response
+        with span("chart_context"):
+            context = get_chart_context(birth_date, birth_time, birth_location)
+        with span("render"):
+            response = _brand_identity_response(context, selected, output_format)
+        if brand_store is not None:
+            with span("store_put"):
+                brand_store.put(context, business_name, variant, response)
+        return response
     except Exception as e:
-        return {"status": "error", "error": str(e)}
+        return _error_response(e)
 
 
 @mcp.tool()
+@instrumented
+@offloaded
 def get_color_palette_only(
     birth_date: str,
     birth_time: str,
@@ -532,34 +646,14 @@ def get_color_palette_only(
         get_color_palette_only("1987-10-28", "14:30", "Buenos Aires, Argentina")
     """
     try:
-        date_obj = datetime.strptime(birth_date, "%Y-%m-%d")
-        time_obj = datetime.strptime(birth_time, "%H:%M")
-        
-        day, month, year = date_obj.day, date_obj.month, date_obj.year
-        hour = time_obj.hour
-        
-        sun_sign = calculate_zodiac_sign(day, month)
-        moon_sign = calculate_moon_sign(day, month, year)
-        rising_sign = calculate_rising_sign(hour, time_obj.minute)
-        hd_type = calculate_human_design_type(day, month, hour)
-        
-        archetype = determine_brand_archetype(sun_sign, moon_sign, rising_sign, hd_type)
-        colors = ARCHETYPE_COLORS[archetype]
-        
-        return {
-            "status": "success",
-            "archetype": archetype,
-            "colors": {
-                "primary": {"hex": colors['primary'], "rgb": hex_to_rgb(colors['primary'])},
-                "secondary": {"hex": colors['secondary'], "rgb": hex_to_rgb(colors['secondary'])},
-                "accent": {"hex": colors['accent'], "rgb": hex_to_rgb(colors['accent'])}
-            }
-        }
+        return _color_palette_response(get_chart_context(birth_date, birth_time, birth_location))
     except Exception as e:
-        return {"status": "error", "error": str(e)}
+        return _error_response(e)
 
 
 @mcp.tool()
+@instrumented
+@offloaded
 def get_typography_only(
     birth_date: str,
     birth_time: str,
@@ -580,34 +674,19 @@ def get_typography_only(
         get_typography_only("1987-10-28", "14:30", "Buenos Aires, Argentina")
     """
     try:
-        date_obj = datetime.strptime(birth_date, "%Y-%m-%d")
-        time_obj = datetime.strptime(birth_time, "%H:%M")
-        
-        day, month, year = date_obj.day, date_obj.month, date_obj.year
-        hour = time_obj.hour
-        
-        sun_sign = calculate_zodiac_sign(day, month)
-        moon_sign = calculate_moon_sign(day, month, year)
-        rising_sign = calculate_rising_sign(hour, time_obj.minute)
-        hd_type = calculate_human_design_type(day, month, hour)
-        
-        archetype = determine_brand_archetype(sun_sign, moon_sign, rising_sign, hd_type)
-        fonts = ARCHETYPE_FONTS[archetype]
-        
-        return {
-            "status": "success",
-            "archetype": archetype,
-            "typography": fonts
-        }
+        return _typography_response(get_chart_context(birth_date, birth_time, birth_location))
     except Exception as e:
-        return {"status": "error", "error": str(e)}
+        return _error_response(e)
 
 
 @mcp.tool()
+@instrumented
+@offloaded
 def calculate_birth_chart(
     birth_date: str,
     birth_time: str,
-    birth_location: str
+    birth_location: str,
+    lean: bool = False
 ) -> dict:
     """
     Calculate astrological birth chart (Sun, Moon, Rising signs).
@@ -616,6 +695,8 @@ def calculate_birth_chart(
         birth_date: Birth date in YYYY-MM-DD format
         birth_time: Birth time in HH:MM format
         birth_location: Birth location
+        lean: Return only identifiers plus brand:// resource URIs for the
+            static descriptions, instead of embedding them
     
     Returns:
         Birth chart with all three signs
@@ -624,36 +705,19 @@ def calculate_birth_chart(
         calculate_birth_chart("1987-10-28", "14:30", "Buenos Aires, Argentina")
     """
     try:
-        date_obj = datetime.strptime(birth_date, "%Y-%m-%d")
-        time_obj = datetime.strptime(birth_time, "%H:%M")
-        
-        day, month, year = date_obj.day, date_obj.month, date_obj.year
-        hour, minute = time_obj.hour, time_obj.minute
-        
-        sun_sign = calculate_zodiac_sign(day, month)
-        moon_sign = calculate_moon_sign(day, month, year)
-        rising_sign = calculate_rising_sign(hour, minute)
-        
-        return {
-            "status": "success",
-            "birth_chart": {
-                "sun_sign": sun_sign,
-                "sun_traits": ZODIAC_SIGNS[sun_sign],
-                "moon_sign": moon_sign,
-                "moon_traits": ZODIAC_SIGNS[moon_sign],
-                "rising_sign": rising_sign,
-                "rising_traits": ZODIAC_SIGNS[rising_sign]
-            }
-        }
+        return _birth_chart_response(get_chart_context(birth_date, birth_time, birth_location), lean)
     except Exception as e:
-        return {"status": "error", "error": str(e)}
+        return _error_response(e)
 
 
 @mcp.tool()
+@instrumented
+@offloaded
 def calculate_human_design(
     birth_date: str,
     birth_time: str,
-    birth_location: str
+    birth_location: str,
+    lean: bool = False
 ) -> dict:
     """
     Calculate Human Design chart (Type, Authority, Profile).
@@ -662,6 +726,8 @@ def calculate_human_design(
         birth_date: Birth date in YYYY-MM-DD format
         birth_time: Birth time in HH:MM format
         birth_location: Birth location
+        lean: Return only identifiers plus brand:// resource URIs for the
+            static descriptions, instead of embedding them
     
     Returns:
         Human Design chart
@@ -670,30 +736,578 @@ def calculate_human_design(
         calculate_human_design("1987-10-28", "14:30", "Buenos Aires, Argentina")
     """
     try:
-        date_obj = datetime.strptime(birth_date, "%Y-%m-%d")
-        time_obj = datetime.strptime(birth_time, "%H:%M")
-        
-        day, month = date_obj.day, date_obj.month
-        hour = time_obj.hour
-        
-        hd_type = calculate_human_design_type(day, month, hour)
-        hd_authority = calculate_human_design_authority(hd_type, day)
-        hd_profile = calculate_human_design_profile(day, month)
-        
-        return {
-            "status": "success",
-            "human_design": {
-                "type": hd_type,
-                "type_details": HUMAN_DESIGN_TYPES[hd_type],
-                "authority": hd_authority,
-                "authority_description": HUMAN_DESIGN_AUTHORITIES[hd_authority],
-                "profile": hd_profile,
-                "profile_details": HUMAN_DESIGN_PROFILES[hd_profile]
-            }
-        }
+        return _human_design_response(get_chart_context(birth_date, birth_time, birth_location), lean)
+    except Exception as e:
+        return _error_response(e)
+
+
+@mcp.tool()
+@instrumented
+@offloaded
+def generate_brand_identity_batch(
+    records: list[dict],
+    sections: list[str] = None,
+    output_format: str = "markdown"
+) -> dict:
+    """
+    Generate brand identity guidelines for many birth records in one call.
+    
+    Args:
+        records: List of objects with birth_date (YYYY-MM-DD), birth_time (HH:MM),
+            birth_location and optional business_name
+        sections: Optional subset of guideline sections, as for generate_brand_identity
+        output_format: "markdown" or "json", as for generate_brand_identity
+    
+    Returns:
+        Per-record results in input order; a record with bad data gets its own
+        error entry without failing the rest of the batch
+    
+    Example:
+        generate_brand_identity_batch([
+            {"birth_date": "1987-10-28", "birth_time": "14:30", "birth_location": "Buenos Aires, Argentina"}
+        ])
+    """
+    try:
+        selected = _select_sections(sections)
+        _check_output_format(output_format)
+        batch = _run_batch(records, lambda context: _brand_identity_response(context, selected, output_format),
+                           optional_fields=("business_name",))
+        if brand_store is not None and batch["status"] == "success":
+            brand_store.put_batch(records, batch["results"], variant_key(selected, output_format))
+        return batch
+    except Exception as e:
+        return _error_response(e)
+
+
+@mcp.tool()
+@instrumented
+@offloaded
+def calculate_birth_chart_batch(records: list[dict], lean: bool = False) -> dict:
+    """
+    Calculate astrological birth charts for many birth records in one call.
+    
+    Args:
+        records: List of objects with birth_date, birth_time and birth_location
+        lean: Return identifiers and resource URIs only, as for the single-record tool
+    
+    Returns:
+        Per-record birth charts (or errors) in input order
+    
+    Example:
+        calculate_birth_chart_batch([
+            {"birth_date": "1987-10-28", "birth_time": "14:30", "birth_location": "Buenos Aires, Argentina"}
+        ])
+    """
+    try:
+        return _run_batch(records, lambda context: _birth_chart_response(context, lean))
+    except Exception as e:
+        return _error_response(e)
+
+
+@mcp.tool()
+@instrumented
+@offloaded
+def calculate_human_design_batch(records: list[dict], lean: bool = False) -> dict:
+    """
+    Calculate Human Design charts for many birth records in one call.
+    
+    Args:
+        records: List of objects with birth_date, birth_time and birth_location
+        lean: Return identifiers and resource URIs only, as for the single-record tool
+    
+    Returns:
+        Per-record Human Design charts (or errors) in input order
+    
+    Example:
+        calculate_human_design_batch([
+            {"birth_date": "1987-10-28", "birth_time": "14:30", "birth_location": "Buenos Aires, Argentina"}
+        ])
+    """
+    try:
+        return _run_batch(records, lambda context: _human_design_response(context, lean))
+    except Exception as e:
+        return _error_response(e)
+
+
+@mcp.tool()
+@instrumented
+@offloaded
+def analyze_palettes(palettes: list[dict], include_neutrals: bool = False) -> dict:
+    """
+    Check custom palettes for accessibility and suggest tints, shades and harmonies.
+    
+    Args:
+        palettes: List of palettes, each an object mapping color names to hex
+            values (e.g. {"primary": "#4B0082", "background": "#FFFFFF"})
+        include_neutrals: Also analyze each palette alongside the standard
+            dark, medium and light neutrals
+    
+    Returns:
+        Per-palette results in input order: the pairwise WCAG contrast matrix,
+        pairings that pass AAA / AA / AA Large, and per-color tint and shade
+        ramps, hue harmonies and the more legible text color; a palette with an
+        invalid color gets its own error entry
+    
+    Example:
+        analyze_palettes([{"primary": "#4B0082", "background": "#FFFFFF"}])
+    """
+    try:
+        return _palette_analysis_response(palettes, include_neutrals)
+    except Exception as e:
+        return _error_response(e)
+
+
+@mcp.tool()
+@instrumented
+@offloaded
+def render_brand_assets(
+    birth_date: str,
+    birth_time: str,
+    birth_location: str,
+    assets: list[str] = None,
+    business_name: str = None,
+    include_svg: bool = True
+) -> dict:
+    """
+    Render SVG brand assets: a palette swatch sheet, a type specimen and a one-page brand board.
+    
+    Args:
+        birth_date: Birth date in YYYY-MM-DD format
+        birth_time: Birth time in HH:MM format
+        birth_location: Birth location
+        assets: Optional subset of "swatches", "type_specimen", "brand_board"
+            (default: all three)
+        business_name: Optional business name shown on the brand board
+        include_svg: Include the SVG markup; otherwise only keys and
+            brand://asset/{key} URIs are returned
+    
+    Returns:
+        Each asset's content key, resource URI and whether it came from the
+        cache; identical inputs are never rendered twice
+    
+    Example:
+        render_brand_assets("1987-10-28", "14:30", "Buenos Aires, Argentina", business_name="Acme")
+    """
+    try:
+        kinds = _select_assets(assets)
+        return _assets_response(get_chart_context(birth_date, birth_time, birth_location), kinds,
+                                business_name, include_svg)
+    except Exception as e:
+        return _error_response(e)
+
+
+@mcp.tool()
+@instrumented
+@offloaded
+def render_brand_assets_batch(records: list[dict], assets: list[str] = None) -> dict:
+    """
+    Render SVG brand assets for many birth records, in parallel worker processes.
+    
+    Args:
+        records: List of objects with birth_date, birth_time, birth_location and
+            optional business_name
+        assets: Optional subset of asset kinds, as for render_brand_assets
+    
+    Returns:
+        Per-record asset keys and brand://asset/{key} URIs (or errors) in
+        input order, plus how many assets had to be rendered; assets shared by
+        several records are rendered once
+    
+    Example:
+        render_brand_assets_batch([
+            {"birth_date": "1987-10-28", "birth_time": "14:30", "birth_location": "Buenos Aires, Argentina"}
+        ])
+    """
+    try:
+        return _assets_batch_response(records, _select_assets(assets))
+    except Exception as e:
+        return _error_response(e)
+
+
+@mcp.tool()
+@instrumented
+@offloaded
+def resolve_location(birth_location: str) -> dict:
+    """
+    Resolve a birth location to coordinates and an IANA timezone, offline.
+    
+    Args:
+        birth_location: Free-text place, optionally narrowed by country or US state
+            (e.g. "Buenos Aires, Argentina", "Austin, TX", "Tokyo")
+    
+    Returns:
+        Place name, country code, latitude/longitude, timezone and how it
+        matched ("exact", "alternate", "prefix", "fuzzy", or "region" when only
+        the country or state was recognized)
+    
+    Example:
+        resolve_location("Buenos Aires, Argentina")
+    """
+    try:
+        return _location_response(birth_location)
+    except Exception as e:
+        return _error_response(e)
+
+
+@mcp.tool()
+@instrumented
+@offloaded
+def archetype_distribution(
+    start_date: str,
+    end_date: str,
+    time_resolution: str = "hour"
+) -> dict:
+    """
+    Count archetypes, Human Design types and signs across everyone born in a date range.
+    
+    Args:
+        start_date: First birth date in YYYY-MM-DD format
+        end_date: Last birth date (inclusive) in YYYY-MM-DD format
+        time_resolution: Birth times sampled on each day: "day" (noon only),
+            "hour" (every hour) or "minute" (every minute)
+    
+    Returns:
+        Total charts sampled and a histogram per chart field (sun_sign,
+        moon_sign, rising_sign, hd_type, hd_authority, hd_profile, archetype)
+        plus sun/moon sign combinations; charts are location-free, with birth
+        times taken as UT
+    
+    Example:
+        archetype_distribution("1960-01-01", "2005-12-31", "hour")
+    """
+    try:
+        return _distribution_response(start_date, end_date, time_resolution)
+    except Exception as e:
+        return _error_response(e)
+
+
+@mcp.tool()
+@instrumented
+@offloaded
+def find_birth_windows(
+    archetype: str = None,
+    sun_sign: str = None,
+    rising_sign: str = None,
+    hd_type: str = None,
+    hd_authority: str = None,
+    hd_profile: str = None,
+    limit: int = 100
+) -> dict:
+    """
+    Find the birth dates and times that produce a given archetype, sign or Human Design combination.
+    
+    Args:
+        archetype: Brand archetype, e.g. "Magician"
+        sun_sign: Sun sign, e.g. "Scorpio"
+        rising_sign: Rising sign as computed without a birth location, e.g. "Leo"
+        hd_type: Human Design type, e.g. "Generator"
+        hd_authority: Human Design authority, e.g. "Sacral"
+        hd_profile: Human Design profile, e.g. "2/4"
+        limit: Maximum number of windows to return
+    
+    Returns:
+        Windows of "MM-DD HH:MM" start/end times that recur every year, where
+        every given criterion holds, plus hours per year covered and an example
+        birth date and time for test fixtures
+    
+    Example:
+        find_birth_windows(archetype="Magician", hd_authority="Sacral")
+    """
+    try:
+        return _birth_windows_response({
+            "archetype": archetype, "sun_sign": sun_sign, "rising_sign": rising_sign,
+            "hd_type": hd_type, "hd_authority": hd_authority, "hd_profile": hd_profile
+        }, limit)
+    except Exception as e:
+        return _error_response(e)
+
+
+@mcp.tool()
+@instrumented
+@offloaded
+def team_compatibility(records: list[dict], include_matrix: bool = True) -> dict:
+    """
+    Score how well every pair in a team or founding group fits together, and blend a team brand.
+    
+    Args:
+        records: List of {"birth_date", "birth_time", "birth_location"} objects,
+            with an optional "name", one per person (2 to 2000)
+        include_matrix: Include the full N x N score matrix (leave off for large
+            teams when the per-member summaries are enough)
+    
+    Returns:
+        A 0-100 compatibility matrix (sun/moon/rising element and modality harmony,
+        Human Design type pairing and archetype affinity), each member's chart,
+        average score and best match, the team's leading archetypes and a
+        blended team palette with its contrast analysis
+    
+    Example:
+        team_compatibility([
+            {"name": "Ana", "birth_date": "1987-10-28", "birth_time": "14:30", "birth_location": "Buenos Aires"},
+            {"name": "Ben", "birth_date": "1990-03-15", "birth_time": "08:00", "birth_location": "London, UK"}
+        ])
+    """
+    try:
+        return _team_compatibility_response(records, include_matrix)
+    except Exception as e:
+        return _error_response(e)
+
+
+@mcp.tool()
+@instrumented
+@offloaded
+def sweep_birth_time(
+    birth_date: str,
+    birth_location: str,
+    start: str = "00:00",
+    end: str = "23:59",
+    fields: list[str] = None
+) -> dict:
+    """
+    Show how the chart changes across every possible birth time on one date, for unknown birth times.
+    
+    Args:
+        birth_date: Birth date in YYYY-MM-DD format
+        birth_location: City, Country format
+        start: First birth time to consider, HH:MM (24-hour)
+        end: Last birth time to consider, HH:MM (inclusive)
+        fields: Only split intervals on these of moon_sign, rising_sign, hd_type,
+            hd_authority and archetype (default: all of them)
+    
+    Returns:
+        The date's fixed sun_sign and hd_profile, plus the consecutive time
+        intervals over which every selected field stays constant, each with
+        its values; one call replaces a generate call per minute
+    
+    Example:
+        sweep_birth_time("1987-10-28", "Buenos Aires, Argentina", fields=["archetype"])
+    """
+    try:
+        return _birth_time_sweep_response(birth_date, birth_location, start, end, fields)
+    except Exception as e:
+        return _error_response(e)
+
+
+@mcp.tool()
+@instrumented
+@offloaded
+def lookup_brand_identity(
+    business_name: str = None,
+    birth_date: str = None,
+    birth_time: str = None,
+    birth_location: str = None,
+    limit: int = 10
+) -> dict:
+    """
+    Find previously generated brand identities by business name and/or birth data.
+    
+    Args:
+        business_name: Business name given when the identity was generated
+            (matched ignoring case, accents and punctuation)
+        birth_date: Birth date in YYYY-MM-DD format (with birth_time and birth_location)
+        birth_time: Birth time in HH:MM format
+        birth_location: Birth location
+        limit: Maximum identities to return, newest first (1-200)
+    
+    Returns:
+        Stored identities with their birth data, sections, output format and
+        the full generate_brand_identity response; requires BRAND_STORE_PATH
+    
+    Example:
+        lookup_brand_identity(business_name="Acme Studio")
+    """
+    try:
+        return _lookup_response(brand_store, business_name, birth_date, birth_time, birth_location, limit)
+    except Exception as e:
+        return _error_response(e)
+
+
+@mcp.tool()
+@instrumented
+@offloaded
+def list_brand_identities(
+    archetype: str = None,
+    business_name: str = None,
+    limit: int = 50,
+    cursor: str = None
+) -> dict:
+    """
+    Page through stored brand identities, newest first.
+    
+    Args:
+        archetype: Only identities with this archetype, e.g. "Magician"
+        business_name: Only identities for this business name
+        limit: Page size (1-200)
+        cursor: next_cursor from the previous page; omit for the first page
+    
+    Returns:
+        Identity summaries (without the full responses) and next_cursor, which
+        is null on the last page; requires BRAND_STORE_PATH
+    
+    Example:
+        list_brand_identities(archetype="Magician", limit=20)
+    """
+    try:
+        return _list_response(brand_store, archetype, business_name, limit, cursor)
     except Exception as e:
-        return {"status": "error", "error": str(e)}
+        return _error_response(e)
+
+
+@mcp.tool()
+@instrumented
+def get_cache_stats() -> dict:
+    """
+    Report the shared chart cache's size, limits and hit/miss/eviction counters.
+    
+    Returns:
+        Cache statistics for sizing BRAND_CACHE_MAX_ENTRIES / BRAND_CACHE_TTL_SECONDS,
+        the location resolver's and rendered-asset caches, plus this server
+        process's view of the shared cache and the identity store when
+        configured; with BRAND_EXECUTOR=process, counters are summed over the
+        executor's workers
+    """
+    return {"status": "success", **_cache_stats()}
+
+
+@mcp.tool()
+@instrumented
+def server_metrics(output_format: str = "json") -> dict:
+    """
+    Report per-tool call counts, latency histograms, error counts and concurrency.
+    
+    Args:
+        output_format: "json" for structured metrics, or "prometheus" for the
+            Prometheus text exposition format
+    
+    Returns:
+        Tool metrics plus chart cache statistics
+    """
+    if output_format == "prometheus":
+        return {"status": "success", "prometheus": tool_metrics.prometheus(_cache_stats()["cache"], admission.stats())}
+    if output_format != "json":
+        return _error_response(ChartInputError("invalid_output_format", "output_format",
+                                               "output_format must be 'json' or 'prometheus'"))
+    return {"status": "success", **tool_metrics.snapshot(), "cache": _cache_stats()["cache"],
+            "admission": admission.stats()}
+
+
+@mcp.tool()
+@instrumented
+def configure_profiling(sample_rate: float, tools: list[str] = None, memory: bool = None) -> dict:
+    """
+    Turn sampled cProfile (and optionally tracemalloc) capture of live tool calls on or off.
+    
+    Args:
+        sample_rate: Fraction of calls to profile, 0 (off) to 1 (every call)
+        tools: Only change these tools' rates (default: set the rate for all tools)
+        memory: Also measure allocations with tracemalloc (default: unchanged)
+    
+    Returns:
+        The profiling configuration now in effect
+    
+    Example:
+        configure_profiling(0.05, tools=["generate_brand_identity"], memory=True)
+    """
+    try:
+        _configure_profiling(sample_rate, tools, memory)
+    except Exception as e:
+        return _error_response(e)
+    return {"status": "success", **tool_profiler.config()}
+
+
+@mcp.tool()
+@instrumented
+def dump_profiles(file_name: str = "profiles", output_format: str = "collapsed", reset: bool = False) -> dict:
+    """
+    Write the profiles collected so far to a local file for flame graphs.
+    
+    Args:
+        file_name: Base name of the file(s), written under BRAND_PROFILE_DIR
+        output_format: "collapsed" for one folded-stack file (flamegraph.pl,
+            inferno, speedscope), or "pstats" for one .prof file per tool
+        reset: Discard the collected profiles after writing them
+    
+    Returns:
+        The paths written plus, per tool, the sample count, mean stage timings
+        of generate_brand_identity and other spanned tools, memory figures and
+        the hottest functions
+    
+    Example:
+        dump_profiles("slow-generate", reset=True)
+    """
+    try:
+        return _dump_profiles_response(file_name, output_format, reset)
+    except Exception as e:
+        return _error_response(e)
+
+
+@mcp.resource("metrics://server", mime_type="application/json")
+def server_metrics_resource() -> str:
+    """Per-tool metrics and chart cache statistics as JSON"""
+    return json.dumps({**tool_metrics.snapshot(), "cache": _cache_stats()["cache"], "admission": admission.stats()})
+
+
+def _reference(kind: str, slug: str) -> str:
+    try:
+        return reference_resource(kind, slug)
+    except ChartInputError as e:
+        raise ResourceError(str(e)) from None
+
+
+@mcp.resource("brand://catalog", mime_type="application/json")
+def reference_catalog_resource() -> str:
+    """Every static reference resource URI with its content hash, plus the data version"""
+    return json.dumps(reference_catalog())
+
+
+@mcp.resource("brand://zodiac/{sign}", mime_type="application/json")
+def zodiac_resource(sign: str) -> str:
+    """Traits of one zodiac sign, e.g. brand://zodiac/scorpio"""
+    return _reference("zodiac", sign)
+
+
+@mcp.resource("brand://hd/type/{hd_type}", mime_type="application/json")
+def human_design_type_resource(hd_type: str) -> str:
+    """Details of one Human Design type, e.g. brand://hd/type/manifesting-generator"""
+    return _reference("hd/type", hd_type)
+
+
+@mcp.resource("brand://hd/authority/{authority}", mime_type="application/json")
+def human_design_authority_resource(authority: str) -> str:
+    """Description of one Human Design authority, e.g. brand://hd/authority/sacral"""
+    return _reference("hd/authority", authority)
+
+
+@mcp.resource("brand://hd/profile/{profile}", mime_type="application/json")
+def human_design_profile_resource(profile: str) -> str:
+    """Details of one Human Design profile, e.g. brand://hd/profile/1-3"""
+    return _reference("hd/profile", profile)
+
+
+@mcp.resource("brand://archetype/{name}", mime_type="application/json")
+def archetype_resource(name: str) -> str:
+    """Desire, palette, fonts, voice and visual style of one archetype, e.g. brand://archetype/sage"""
+    return _reference("archetype", name)
+
+
+@mcp.resource("brand://asset/{key}", mime_type="image/svg+xml")
+def brand_asset_resource(key: str) -> str:
+    """A rendered SVG asset by the content key render_brand_assets returned"""
+    svg = asset_cache.read(key)
+    if svg is None:
+        raise ResourceError(f"no rendered asset brand://asset/{key}")
+    return svg
+
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def prometheus_metrics(request):
+    """Prometheus scrape endpoint, served when running over the HTTP transport"""
+    from starlette.responses import PlainTextResponse
+    return PlainTextResponse(tool_metrics.prometheus(_cache_stats()["cache"], admission.stats()),
+                             media_type="text/plain; version=0.0.4")
+
 
+tool_metrics.startup_seconds = round(time.perf_counter() - _IMPORT_STARTED, 4)
 
 # FastMCP Cloud will automatically run this server!
 
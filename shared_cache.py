@@ -0,0 +1,195 @@
+"""
+Cross-process chart cache backed by a memory-mapped file.
+
+Every worker process maps the same file (ideally on tmpfs, e.g. /dev/shm), so
+a chart computed by one worker is a hit in all the others. The file is a
+fixed-size open-addressing hash table of 128-byte slots; each slot holds one
+normalized (birth_date, birth_time, birth_location) key and its chart as
+small integer codes.
+
+Concurrency: writers take an fcntl byte-range lock on the slot they update
+and bump the slot's sequence number to odd before writing and to even after.
+Readers take no lock; they check the sequence number before and after
+copying the slot and treat an odd or changed value as a miss.
+
+The header also keeps table-wide counters of occupied slots and evictions.
+Writers update them under an fcntl lock on the counter bytes, so stats()
+reads two integers instead of walking the table.
+"""
+
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import threading
+
+MAGIC = b"BRANDCC2"
+# magic, slot count, engine fingerprint
+_FILE_HEADER = struct.Struct("<8sQQ")
+_FILE_HEADER_SIZE = 64
+# used slots, evictions; right after the fixed header fields
+_COUNTERS = struct.Struct("<QQ")
+_COUNTERS_OFFSET = _FILE_HEADER.size
+
+SLOT_SIZE = 128
+# seq, key hash, key length, then the chart: day, month, year, hour, minute,
+# sun, moon, rising, HD type, authority, profile, archetype
+_SLOT_HEADER = struct.Struct("<IQHBBHBBBBBBBBB")
+_KEY_OFFSET = 32
+MAX_KEY_BYTES = SLOT_SIZE - _KEY_OFFSET
+PROBE_LIMIT = 4
+
+
+def key_bytes(key: tuple) -> bytes:
+    return "\x1f".join(key).encode("utf-8")
+
+
+def key_hash(encoded_key: bytes) -> int:
+    # 0 marks an empty slot, so never return it
+    return int.from_bytes(hashlib.blake2b(encoded_key, digest_size=8).digest(), "little") or 1
+
+
+class SharedChartCache:
+    """Fixed-size chart cache in a file shared (via mmap) by every worker process.
+
+    Values are 12-tuples of small ints: (day, month, year, hour, minute, sun,
+    moon, rising, hd_type, hd_authority, hd_profile, archetype). The engine
+    fingerprint is stored in the file header; a file written by a different
+    chart engine is wiped on open instead of serving stale charts.
+    """
+
+    def __init__(self, path: str, slots: int = 65536, fingerprint: int = 0):
+        self.path = path
+        self.slots = slots
+        self.fingerprint = fingerprint
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self._stats_lock = threading.Lock()
+        # fcntl locks are per process; this serializes this process's own writer threads
+        self._write_lock = threading.Lock()
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        size = _FILE_HEADER_SIZE + slots * SLOT_SIZE
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, _FILE_HEADER_SIZE, 0)
+        try:
+            if os.fstat(self._fd).st_size != size or not self._header_matches():
+                os.ftruncate(self._fd, 0)
+                os.ftruncate(self._fd, size)
+                os.pwrite(self._fd, _FILE_HEADER.pack(MAGIC, slots, fingerprint), 0)
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, _FILE_HEADER_SIZE, 0)
+        self._map = mmap.mmap(self._fd, size)
+
+    def _header_matches(self) -> bool:
+        header = os.pread(self._fd, _FILE_HEADER.size, 0)
+        return header == _FILE_HEADER.pack(MAGIC, self.slots, self.fingerprint)
+
+    def _offset(self, slot: int) -> int:
+        return _FILE_HEADER_SIZE + slot * SLOT_SIZE
+
+    def _read_slot(self, slot: int):
+        """Consistent (hash, key, values) copy of a slot, or None if empty or mid-write"""
+        offset = self._offset(slot)
+        # Seqlock read: the sequence number before the copy, inside it and after it must all agree
+        before = struct.unpack_from("<I", self._map, offset)[0]
+        if before & 1:
+            return None
+        raw = self._map[offset:offset + SLOT_SIZE]
+        after = struct.unpack_from("<I", self._map, offset)[0]
+        fields = _SLOT_HEADER.unpack_from(raw)
+        seq, slot_hash, key_length = fields[0], fields[1], fields[2]
+        if slot_hash == 0 or not before == seq == after:
+            return None
+        return slot_hash, raw[_KEY_OFFSET:_KEY_OFFSET + key_length], fields[3:]
+
+    def get(self, key: tuple):
+        encoded = key_bytes(key)
+        hashed = key_hash(encoded)
+        for probe in range(PROBE_LIMIT):
+            entry = self._read_slot((hashed + probe) % self.slots)
+            if entry is not None and entry[0] == hashed and entry[1] == encoded:
+                with self._stats_lock:
+                    self.hits += 1
+                return entry[2]
+        with self._stats_lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: tuple, values: tuple) -> bool:
+        """Store a chart; returns False if the key is too long to fit a slot"""
+        encoded = key_bytes(key)
+        if len(encoded) > MAX_KEY_BYTES:
+            return False
+        hashed = key_hash(encoded)
+        # Reuse this key's slot or an empty one; otherwise replace the first probe
+        target = hashed % self.slots
+        for probe in range(PROBE_LIMIT):
+            slot = (hashed + probe) % self.slots
+            entry = self._read_slot(slot)
+            if entry is None or entry[0] == hashed and entry[1] == encoded:
+                target = slot
+                break
+        offset = self._offset(target)
+        with self._write_lock:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, SLOT_SIZE, offset)
+            try:
+                # What the slot held, read under its lock: empty, this key, or another key
+                previous_hash = struct.unpack_from("<Q", self._map, offset + 4)[0]
+                replaced = previous_hash != 0 and (
+                    previous_hash != hashed
+                    or self._map[offset + _KEY_OFFSET:offset + _KEY_OFFSET + MAX_KEY_BYTES].rstrip(b"\0") != encoded
+                )
+                # Odd sequence number = write in progress; readers skip the slot
+                seq = struct.unpack_from("<I", self._map, offset)[0] | 1
+                struct.pack_into("<I", self._map, offset, seq)
+                self._map[offset + _KEY_OFFSET:offset + SLOT_SIZE] = encoded.ljust(MAX_KEY_BYTES, b"\0")
+                _SLOT_HEADER.pack_into(self._map, offset, seq, hashed, len(encoded), *values)
+                # Publish last, on its own: the even sequence number only lands after every value has
+                struct.pack_into("<I", self._map, offset, (seq + 1) & 0xFFFFFFFF)
+                if previous_hash == 0:
+                    self._add_counters(1, 0)
+                elif replaced:
+                    self._add_counters(0, 1)
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, SLOT_SIZE, offset)
+        with self._stats_lock:
+            self.stores += 1
+        return True
+
+    def _add_counters(self, used: int, evictions: int) -> None:
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, _COUNTERS.size, _COUNTERS_OFFSET)
+        try:
+            current_used, current_evictions = _COUNTERS.unpack_from(self._map, _COUNTERS_OFFSET)
+            _COUNTERS.pack_into(self._map, _COUNTERS_OFFSET, current_used + used, current_evictions + evictions)
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, _COUNTERS.size, _COUNTERS_OFFSET)
+
+    def clear(self) -> None:
+        with self._write_lock:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX)
+            try:
+                self._map[_FILE_HEADER_SIZE:] = bytes(self.slots * SLOT_SIZE)
+                _COUNTERS.pack_into(self._map, _COUNTERS_OFFSET, 0, 0)
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN)
+
+    def stats(self) -> dict:
+        """This process's hit/miss/store counts plus the table's fill and evictions, from the header"""
+        used, evictions = _COUNTERS.unpack_from(self._map, _COUNTERS_OFFSET)
+        with self._stats_lock:
+            lookups = self.hits + self.misses
+            return {
+                "path": self.path,
+                "slots": self.slots,
+                "used_slots": used,
+                "evictions": evictions,
+                "hits": self.hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+    def close(self) -> None:
+        self._map.close()
+        os.close(self._fd)